@@ -14,6 +14,7 @@ import errors
 from cogs.economy.helper_classes import Wallet
 from helpers.bot_base import BaseDuck, col, get_or_fail
 from helpers.context import CustomContext
+from helpers.queries import registry as query_registry
 
 logging.basicConfig(
     level=logging.INFO,
@@ -130,15 +131,15 @@ if __name__ == "__main__":
         environment=os.getenv("SENTRY_ENV") or 'development',
     )
 
-    async def user_blacklisted(ctx: CustomContext):
-        if not ctx.bot.blacklist.get(ctx.author.id, None) or await ctx.bot.is_owner(ctx.author):
+    def user_blacklisted(ctx: CustomContext, is_owner: bool):
+        if not ctx.bot.blacklist.get(ctx.author.id, None):
             return True
         if ctx.command and ctx.command.root_parent and ctx.command.root_parent.name == "pit":
             return True
         raise errors.UserBlacklisted
 
-    async def maintenance_mode(ctx: CustomContext):
-        if not ctx.bot.maintenance or await ctx.bot.is_owner(ctx.author):
+    def maintenance_mode(ctx: CustomContext, is_owner: bool):
+        if not ctx.bot.maintenance:
             return True
         else:
             raise errors.BotUnderMaintenance
@@ -152,11 +153,10 @@ if __name__ == "__main__":
     }
 
     async def runner():
-        async with asyncpg.create_pool(**credentials) as pool, aiohttp.ClientSession() as session, DuckBot(
-            pool, session
-        ) as bot:
-            bot.add_check(user_blacklisted)
-            bot.add_check(maintenance_mode)
+        pool = asyncpg.create_pool(**credentials, init=query_registry.prepare_connection)
+        async with pool, aiohttp.ClientSession() as session, DuckBot(pool, session) as bot:
+            bot.prechecks.add_stage("blacklist", user_blacklisted, order=10)
+            bot.prechecks.add_stage("maintenance", maintenance_mode, order=20)
             await bot.start(TOKEN)
 
     asyncio.run(runner())
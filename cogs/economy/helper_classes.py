@@ -27,6 +27,7 @@ from errors import (
     AccountAlreadyExists,
     WalletInUse,
 )
+from helpers import queries
 
 if TYPE_CHECKING:
     from bot import DuckBot
@@ -565,14 +566,14 @@ class Wallet:
 
     @classmethod
     async def from_context(cls, ctx: CustomContext):
-        account = await ctx.bot.db.fetchrow("SELECT * FROM economy WHERE user_id = $1", ctx.author.id)
+        account = await queries.ECONOMY_ACCOUNT.fetchrow(ctx.bot.db, ctx.author.id)
         if not account or account.get('deleted'):
             raise AccountNotFound(ctx.author)
         return cls(ctx.bot, ctx.author, account)
 
     @classmethod
     async def from_user(cls, bot: DuckBot, user: discord.User):
-        account = await bot.db.fetchrow("SELECT * FROM economy WHERE user_id = $1", user.id)
+        account = await queries.ECONOMY_ACCOUNT.fetchrow(bot.db, user.id)
         if not account or account.get('deleted'):
             raise AccountNotFound(user)
         return cls(bot, user, account)
@@ -583,7 +584,7 @@ class Wallet:
             try:
                 account = await conn.fetchrow("INSERT INTO economy (user_id) VALUES ($1) RETURNING *", user.id)
             except asyncpg.UniqueViolationError:
-                account = await conn.fetchrow("SELECT * FROM economy WHERE user_id = $1", user.id) or {}
+                account = await queries.ECONOMY_ACCOUNT.fetchrow(conn, user.id) or {}
                 if account.get('deleted'):
                     account = await conn.fetchrow(
                         "UPDATE economy SET deleted = FALSE WHERE user_id = $1 RETURNING *", user.id
@@ -19,6 +19,8 @@ else:
 
 # noinspection SqlResolve
 class UseItems(EconomyBase):
+    __intents__ = {'voice_states': 'playing sounds in voice channels'}
+
     async def play_in_voice(self, ctx, file: str):
         user = ctx.author
         voice_channel = user.voice.channel if user.voice else None
@@ -1,20 +1,18 @@
 import contextlib
 
 import discord
-from discord.ext import commands
 from jishaku.paginators import WrappedPaginator
 
-from helpers import time_inputs
+from helpers import queries, time_inputs
+from helpers.message_router import message_route
+from helpers.ordered_executor import ordered
 from ._base import EventsBase
 
 
 class AfkHandler(EventsBase):
-    @commands.Cog.listener('on_message')
+    @message_route(guild_only=True, ignore_bots=True, afk_author=True)
+    @ordered('afk', key=lambda message: message.author.id, maxsize=5)
     async def on_afk_user_message(self, message: discord.Message):
-        if not message.guild:
-            return
-        if message.author.bot:
-            return
         if message.author.id in self.bot.afk_users:
             try:
                 if self.bot.auto_un_afk[message.author.id] is False:
@@ -24,7 +22,7 @@ class AfkHandler(EventsBase):
 
             self.bot.afk_users.pop(message.author.id)
 
-            info = await self.bot.db.fetchrow('SELECT * FROM afk WHERE user_id = $1', message.author.id)
+            info = await queries.AFK_BY_USER.fetchrow(self.bot.db, message.author.id)
             await self.bot.db.execute(
                 'INSERT INTO afk (user_id, start_time, reason) VALUES ($1, null, null) '
                 'ON CONFLICT (user_id) DO UPDATE SET start_time = null, reason = null',
@@ -39,19 +37,15 @@ class AfkHandler(EventsBase):
 
             await message.add_reaction('👋')
 
-    @commands.Cog.listener('on_message')
+    @message_route(guild_only=True, ignore_bots=True, mentions=True)
     async def on_afk_user_mention(self, message: discord.Message):
-        if not message.guild:
-            return
-        if message.author.bot:
-            return
         if message.mentions:
             pinged_afk_user_ids = list(set([u.id for u in message.mentions]).intersection(self.bot.afk_users))
             paginator = WrappedPaginator(prefix='', suffix='')
             for user_id in pinged_afk_user_ids:
                 member = message.guild.get_member(user_id)
                 if member and member.id != message.author.id:
-                    info = await self.bot.db.fetchrow('SELECT * FROM afk WHERE user_id = $1', user_id)
+                    info = await queries.AFK_BY_USER.fetchrow(self.bot.db, user_id)
                     paginator.add_line(
                         f'**woah there, {message.author.mention}, it seems like {member.mention} has been afk '
                         f'for {time_inputs.human_timedelta(info["start_time"], accuracy=3, brief=True)}!**'
@@ -31,6 +31,7 @@ class ArrivalAndCleanup(EventsBase):
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild):
         await self.bot.db.execute('DELETE FROM guilds WHERE guild_id = $1', guild.id)
+        self.bot.guild_config.update(guild.id, welcome_channel=None, snipe_enabled=False, modlog=None, muted_id=None)
         await self.bot.db.execute('DELETE FROM temporary_mutes WHERE guild_id = $1', guild.id)
         for channel in guild.text_channels:
             await self.bot.db.execute('DELETE FROM suggestions WHERE channel_id = $1', channel.id)
@@ -38,6 +39,7 @@ class ArrivalAndCleanup(EventsBase):
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
         await self.bot.db.execute('DELETE FROM guilds WHERE guild_id = $1', guild.id)
+        self.bot.guild_config.update(guild.id, welcome_channel=None, snipe_enabled=False, modlog=None, muted_id=None)
         await self.bot.db.execute('DELETE FROM temporary_mutes WHERE guild_id = $1', guild.id)
         for channel in guild.text_channels:
             await self.bot.db.execute('DELETE FROM suggestions WHERE channel_id = $1', channel.id)
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import discord
@@ -8,10 +9,14 @@ from ._base import EventsBase
 
 
 class AutoBlacklist(EventsBase):
+    def cog_unload(self):
+        # The buffer belongs to the bot and survives reloads, this only writes it out sooner.
+        asyncio.create_task(self.bot.command_usage.flush())
+        super().cog_unload()
+
     @commands.Cog.listener('on_command')
     async def on_command(self, ctx: CustomContext):
-        await self.bot.db.execute(
-            "INSERT INTO commands (guild_id, user_id, command, timestamp) VALUES ($1, $2, $3, $4)",
+        self.bot.command_usage.add(
             getattr(ctx.guild, 'id', None),
             ctx.author.id,
             ctx.command.qualified_name,
@@ -22,7 +27,7 @@ class AutoBlacklist(EventsBase):
         current = ctx.message.created_at.timestamp()
         retry_after = bucket.update_rate_limit(current)
         author_id = ctx.author.id
-        if retry_after and not await self.bot.is_owner(ctx.author):
+        if retry_after and not await ctx.author_is_owner():
             self._auto_spam_count[author_id] += 1
             if self._auto_spam_count[author_id] >= 5:
                 await self.add_to_blacklist(author_id)
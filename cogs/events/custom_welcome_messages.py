@@ -1,19 +1,21 @@
 import discord
 from discord.ext import commands
 
+from helpers import queries
+from helpers.message_router import message_route
+from helpers.ordered_executor import ordered
 from ._base import EventsBase
 
 
 class WelcomeMessages(EventsBase):
-    @commands.Cog.listener('on_message')
+    @message_route(guilds='counting_channels', ignore_bots=True)
     async def on_count_receive(self, message: discord.Message):
-        if (
-            message.author.bot
-            or not message.guild
-            or message.guild.id not in self.bot.counting_channels
-            or message.channel.id != self.bot.counting_channels[message.guild.id]['channel']
-        ):
-            return
+        # Checked before queueing, so the rest of the guild's chat can't fill the counting queue.
+        if message.channel.id == self.bot.counting_channels[message.guild.id]['channel']:
+            await self.process_count(message)
+
+    @ordered('counting', key=lambda message: message.guild.id)
+    async def process_count(self, message: discord.Message):
         if not message.content.isdigit() or message.content != str(
             self.bot.counting_channels[message.guild.id]['number'] + 1
         ):
@@ -24,9 +26,7 @@ class WelcomeMessages(EventsBase):
             elif self.bot.counting_channels[message.guild.id]['reset'] is True:
                 self.bot.counting_channels[message.guild.id]['number'] = 0
                 await message.reply(f'{message.author.mention} just put the **wrong number**! Start again from **0**')
-                await self.bot.db.execute(
-                    'UPDATE count_settings SET current_number = $2 WHERE guild_id = $1', message.guild.id, 0
-                )
+                await queries.SET_COUNT_NUMBER.execute(self.bot.db, message.guild.id, 0)
                 return
         if message.author.id == self.bot.counting_channels[message.guild.id]['last_counter']:
             return await message.delete(delay=0)
@@ -34,8 +34,8 @@ class WelcomeMessages(EventsBase):
         self.bot.counting_channels[message.guild.id]['last_counter'] = message.author.id
         self.bot.counting_channels[message.guild.id]['last_message_id'] = message.id
         self.bot.counting_channels[message.guild.id]['messages'].append(message)
-        await self.bot.db.execute(
-            'UPDATE count_settings SET current_number = $2 WHERE guild_id = $1',
+        await queries.SET_COUNT_NUMBER.execute(
+            self.bot.db,
             message.guild.id,
             self.bot.counting_channels[message.guild.id]['number'],
         )
@@ -77,6 +77,7 @@ class WelcomeMessages(EventsBase):
                 pass
 
     @commands.Cog.listener('on_raw_message_delete')
+    @ordered('counting', key=lambda payload: payload.guild_id)
     async def on_counting_message_delete(self, payload: discord.RawMessageDeleteEvent):
         if not payload.guild_id or payload.guild_id not in self.bot.counting_channels:
             return
@@ -91,8 +92,8 @@ class WelcomeMessages(EventsBase):
             except (KeyError, IndexError):
                 self.bot.counting_channels[payload.guild_id]['last_message_id'] = None
                 self.bot.counting_channels[payload.guild_id]['last_counter'] = None
-            await self.bot.db.execute(
-                'UPDATE count_settings SET current_number = $2 WHERE guild_id = $1',
+            await queries.SET_COUNT_NUMBER.execute(
+                self.bot.db,
                 payload.guild_id,
                 self.bot.counting_channels[payload.guild_id]['number'],
             )
@@ -177,7 +177,7 @@ class ErrorHandler(EventsBase):
             return await ctx.send(f"`{error.argument}` is not a valid Custom Emoji")
 
         if isinstance(error, commands.errors.CommandOnCooldown):
-            if error.type in (commands.BucketType.user, commands.BucketType.member) and await self.bot.is_owner(ctx.author):
+            if error.type in (commands.BucketType.user, commands.BucketType.member) and await ctx.author_is_owner():
                 if ctx.command:
                     ctx.command.reset_cooldown(ctx)
                 return await self.bot.process_commands(ctx.message)
@@ -12,7 +12,7 @@ class MutedMembers(EventsBase):
         ):
             return
         await self.bot.db.execute("DELETE FROM muted WHERE user_id = $1 AND guild_id = $2", member.id, member.guild.id)
-        if not (role := await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', member.guild.id)):
+        if not (role := (await self.bot.guild_config.get(member.guild.id)).muted_id):
             return
         if not (role := member.guild.get_role(role)):
             return
@@ -22,7 +22,7 @@ class MutedMembers(EventsBase):
 
     @commands.Cog.listener('on_member_remove')
     async def remove_previously_muted(self, member: discord.Member):
-        if not (role := await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', member.guild.id)):
+        if not (role := (await self.bot.guild_config.get(member.guild.id)).muted_id):
             return
         if not (role := member.guild.get_role(role)):
             return
@@ -3,13 +3,16 @@ import re
 import discord
 from discord.ext import commands
 
+from helpers.message_router import message_route
 from ._base import EventsBase
 
 
 class PrivateEvents(EventsBase):
-    @commands.Cog.listener('on_message')
+    __intents__ = {'members': 'chunking newly joined guilds'}
+
+    @message_route(owner_only=True)
     async def emoji_sender(self, message: discord.Message):
-        if not await self.bot.is_owner(message.author) or self.bot.user.id != 788278464474120202:
+        if self.bot.user.id != 788278464474120202:
             return
         ic = '\u200b'
         content = message.content
@@ -25,6 +28,7 @@ class PrivateEvents(EventsBase):
     @commands.Cog.listener('on_guild_join')
     async def server_join_message(self, guild: discord.Guild):
         channel = self.bot.get_channel(904797860841812050)
+        await self.bot.member_residency.ensure(guild)
         embed = discord.Embed(
             title='Joined Server',
             colour=discord.Colour.green(),
@@ -54,12 +58,10 @@ class PrivateEvents(EventsBase):
         )
         await channel.send(embed=embed)
 
-    @commands.Cog.listener('on_message')
+    @message_route(channels={939677888809140294}, ignore_bots=True)
     async def nsfw_protector(self, message: discord.Message):
         if self.bot.user.id != 788278464474120202:
             return
-        if message.channel.id != 939677888809140294 or message.author.bot:
-            return
         if not all([a.is_spoiler() for a in message.attachments]):
             await message.reply(
                 'Please mark **all** your images as spoiler.',
@@ -2,16 +2,13 @@ import discord
 from discord.ext import commands
 
 from helpers import constants
+from helpers.message_router import message_route
 from ._base import EventsBase
 
 
 class SuggestionChannels(EventsBase):
-    @commands.Cog.listener('on_message')
+    @message_route(channels='suggestion_channels', ignore_bots=True)
     async def on_suggestion_receive(self, message: discord.Message):
-        if message.author.bot:
-            return
-        if message.channel.id not in self.bot.suggestion_channels:
-            return
         if (
             self.bot.suggestion_channels[message.channel.id] is True
             and not message.attachments
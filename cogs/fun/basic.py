@@ -96,9 +96,7 @@ class BasicFun(FunBase):
     async def catch(self, ctx: CustomContext, member: typing.Optional[discord.Member]):
         """Catches someone. 😂"""
         upper_hand = await ctx.send(constants.CAG_UP, reply=False, reminders=False)
-        message: discord.Message = await self.bot.wait_for(
-            'message', check=lambda m: m.channel == ctx.channel and m.author != ctx.me
-        )
+        message: discord.Message = await self.bot.wait_for_message(ctx.channel, check=lambda m: m.author != ctx.me)
         if (member and message.author != member) or message.author == ctx.author:
             await ctx.message.add_reaction(random.choice(constants.DONE))
             return await upper_hand.delete()
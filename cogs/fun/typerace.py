@@ -19,12 +19,12 @@ class TypeRace(FunBase):
         self, channel: discord.TextChannel, content: str, timeout: int
     ) -> typing.AsyncIterable[discord.Message]:
         def check(m: discord.Message):
-            return m.channel == channel and m.content.lower() == content.lower() and not m.author.bot
+            return m.content.lower() == content.lower() and not m.author.bot
 
         try:
             async with async_timeout.timeout(timeout):
                 while True:
-                    message = await self.bot.wait_for('message', timeout=timeout, check=check)
+                    message = await self.bot.wait_for_message(channel, timeout=timeout, check=check)
                     yield message
         except asyncio.TimeoutError:
             return
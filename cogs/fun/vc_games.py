@@ -143,6 +143,8 @@ class YoutubeDropdown(discord.ui.View):
 
 
 class DiscordActivities(FunBase):
+    __intents__ = {'voice_states': "finding the author's voice channel"}
+
     @commands.cooldown(1, 5, commands.BucketType.guild)
     @commands.command()
     async def activity(self, ctx: CustomContext):
@@ -186,49 +186,66 @@ class CommandConfigs(ConfigBase):
     def display_emoji(self) -> discord.PartialEmoji:
         return discord.PartialEmoji(name='\N{GEAR}\ufe0f')
 
-    @cache.cache(strategy=cache.Strategy.lru, maxsize=1024, ignore_kwargs=True)
-    async def is_plonked(
+    async def cog_load(self) -> None:
+        self.bot.prechecks.add_stage('plonks', self.plonk_precheck, order=30, once=True)
+        self.bot.prechecks.add_stage('command permissions', self.command_permissions_precheck, order=40)
+        self.bot.invalidation.on('command_config', self._on_command_config_changed)
+        self.bot.invalidation.on_resync(self._clear_command_permissions)
+
+    def cog_unload(self):
+        self.bot.prechecks.remove_stage('plonks')
+        self.bot.prechecks.remove_stage('command permissions')
+        self.bot.invalidation.remove('command_config', self._on_command_config_changed)
+        self.bot.invalidation.remove_resync(self._clear_command_permissions)
+        super().cog_unload()
+
+    def _on_command_config_changed(self, guild_id: str) -> None:
+        self.get_command_permissions.invalidate(self, int(guild_id))
+
+    async def _clear_command_permissions(self) -> None:
+        self.get_command_permissions.clear()
+
+    def _is_plonked(
         self,
         guild_id: int,
         member_id: int,
         channel: Optional[discord.VoiceChannel | discord.TextChannel | discord.Thread] = None,
-        *,
-        connection: Optional[Connection | Pool] = None,
-        check_bypass: bool = True,
     ) -> bool:
         if member_id in self.bot.blacklist or guild_id in self.bot.blacklist:
             return True
 
-        if check_bypass:
+        plonked = self.bot.plonks.get(guild_id)
+        if not plonked:
+            return False
+        if member_id in plonked:
+            return True
+        if channel is None:
+            return False
+        if channel.id in plonked:
+            return True
+        return isinstance(channel, discord.Thread) and channel.parent_id in plonked
+
+    async def is_plonked(
+        self,
+        guild_id: int,
+        member_id: int,
+        channel: Optional[discord.VoiceChannel | discord.TextChannel | discord.Thread] = None,
+        *,
+        check_bypass: bool = True,
+    ) -> bool:
+        if check_bypass and not (member_id in self.bot.blacklist or guild_id in self.bot.blacklist):
             guild = self.bot.get_guild(guild_id)
             if guild is not None:
                 member = await self.bot.get_or_fetch_member(guild, member_id)
                 if member is not None and member.guild_permissions.manage_guild:
                     return False
 
-        connection = connection or self.bot.db
-
-        if channel is None:
-            query = "SELECT 1 FROM plonks WHERE guild_id=$1 AND entity_id=$2;"
-            row = await connection.fetchrow(query, guild_id, member_id)
-        else:
-            if isinstance(channel, discord.Thread):
-                query = "SELECT 1 FROM plonks WHERE guild_id=$1 AND entity_id IN ($2, $3, $4);"
-                row = await connection.fetchrow(query, guild_id, member_id, channel.id, channel.parent_id)
-            else:
-                query = "SELECT 1 FROM plonks WHERE guild_id=$1 AND entity_id IN ($2, $3);"
-                row = await connection.fetchrow(query, guild_id, member_id, channel.id)
-
-        return row is not None
+        return self._is_plonked(guild_id, member_id, channel)
 
-    async def bot_check_once(self, ctx: CustomContext) -> bool:
+    def plonk_precheck(self, ctx: CustomContext, is_owner: bool) -> bool:
         if ctx.guild is None:
             return True
 
-        is_owner = await ctx.bot.is_owner(ctx.author)
-        if is_owner:
-            return True
-
         # see if they can bypass:
         if isinstance(ctx.author, discord.Member):
             bypass = ctx.author.guild_permissions.manage_guild
@@ -236,15 +253,12 @@ class CommandConfigs(ConfigBase):
                 return True
 
         # check if we're plonked
-        is_plonked = await self.is_plonked(
-            ctx.guild.id, ctx.author.id, channel=ctx.channel, check_bypass=False
-        )
-
-        if not is_plonked:
+        if not self._is_plonked(ctx.guild.id, ctx.author.id, ctx.channel):
             return True
         raise errors.NoHideout # A silently-ignored error.
 
-    @cache.cache()
+    # Toggling a command invalidates its guild, the background refresh only catches changes made elsewhere.
+    @cache.cache(evict_failures=True, stale_while_revalidate=600)
     async def get_command_permissions(
         self, guild_id: int, *, connection: Optional[Connection | Pool] = None
     ) -> ResolvedCommandPermissions:
@@ -254,18 +268,14 @@ class CommandConfigs(ConfigBase):
         records = await connection.fetch(query, guild_id)
         return ResolvedCommandPermissions(guild_id, records)
 
-    async def bot_check(self, ctx: CustomContext) -> bool:
+    async def command_permissions_precheck(self, ctx: CustomContext, is_owner: bool) -> bool:
         if ctx.guild is None:
             return True
 
-        is_owner = await ctx.bot.is_owner(ctx.author)
-        if is_owner:
-            return True
-
         resolved = await self.get_command_permissions(ctx.guild.id)
         if not resolved.is_blocked(ctx):
             return True
-        raise errors.NoHideout  # A silently-ignored error. 
+        raise errors.NoHideout  # A silently-ignored error.
 
     async def _bulk_ignore_entries(self, ctx: CustomContext, entries: Iterable[discord.abc.Snowflake]) -> None:
         async with ctx.db.acquire() as con:
@@ -281,8 +291,7 @@ class CommandConfigs(ConfigBase):
                 # do a bulk COPY
                 await con.copy_records_to_table('plonks', columns=('guild_id', 'entity_id'), records=to_insert)
 
-                # invalidate the cache for this guild
-                self.is_plonked.invalidate_containing(f'{ctx.guild.id!r}:')
+        self.bot.plonks.setdefault(guild_id, set()).update(e for _, e in to_insert)
 
     async def cog_command_error(self, ctx: CustomContext, error: commands.CommandError):
         if isinstance(error, commands.BadArgument):
@@ -311,9 +320,7 @@ class CommandConfigs(ConfigBase):
             # shortcut for a single insert
             query = "INSERT INTO plonks (guild_id, entity_id) VALUES ($1, $2) ON CONFLICT DO NOTHING;"
             await ctx.db.execute(query, ctx.guild.id, ctx.channel.id)
-
-            # invalidate the cache for this guild
-            self.is_plonked.invalidate_containing(f'{ctx.guild.id!r}:')
+            self.bot.plonks.setdefault(ctx.guild.id, set()).add(ctx.channel.id)
         else:
             await self._bulk_ignore_entries(ctx, entities)
 
@@ -364,7 +371,7 @@ class CommandConfigs(ConfigBase):
 
         query = "DELETE FROM plonks WHERE guild_id=$1;"
         await ctx.db.execute(query, ctx.guild.id)
-        self.is_plonked.invalidate_containing(f'{ctx.guild.id!r}:')
+        self.bot.plonks.pop(ctx.guild.id, None)
         await ctx.send('Successfully cleared all ignores.')
 
     @config.group(pass_context=True, invoke_without_command=True, aliases=['unplonk'])
@@ -379,13 +386,16 @@ class CommandConfigs(ConfigBase):
 
         if len(entities) == 0:
             query = "DELETE FROM plonks WHERE guild_id=$1 AND entity_id=$2;"
+            entity_ids = [ctx.channel.id]
             await ctx.db.execute(query, ctx.guild.id, ctx.channel.id)
         else:
             query = "DELETE FROM plonks WHERE guild_id=$1 AND entity_id = ANY($2::bigint[]);"
             entity_ids = [c.id for c in entities]
             await ctx.db.execute(query, ctx.guild.id, entity_ids)
 
-        self.is_plonked.invalidate_containing(f'{ctx.guild.id!r}:')
+        plonked = self.bot.plonks.get(ctx.guild.id)
+        if plonked is not None:
+            plonked.difference_update(entity_ids)
         await ctx.send(ctx.tick(True))
 
     @unignore.command(name='all')
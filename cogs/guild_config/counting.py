@@ -1,4 +1,5 @@
 import asyncio
+import typing
 from collections import deque
 
 import asyncpg.exceptions
@@ -7,6 +8,7 @@ from discord.ext import commands
 
 from bot import CustomContext
 from cogs.management import UnicodeEmoji
+from helpers import queries
 from ._base import ConfigBase
 
 
@@ -165,21 +167,18 @@ class Counting(ConfigBase):
     async def ct_add_reward(self, ctx: CustomContext):
         """An interactive way to add a reward to the counting game."""
 
-        def check(m: discord.Message):
-            return m.channel == ctx.channel and m.author == ctx.author
-
-        def int_check(m: discord.Message):
-            return m.channel == ctx.channel and m.author == ctx.author and m.content.isdigit()
+        def wait_for_answer(check=None) -> typing.Awaitable[discord.Message]:
+            return self.bot.wait_for_message(ctx.channel, author=ctx.author, check=check, timeout=120)
 
         try:
             await ctx.send('1️⃣ **|** What **number** would this reward be assigned to?')
-            number = int((await self.bot.wait_for('message', check=int_check, timeout=120)).content)
+            number = int((await wait_for_answer(lambda m: m.content.isdigit())).content)
 
             await ctx.send(
                 '2️⃣ **|** What **message** would you want to be sent to the channel when this number is reached?'
                 '\nℹ **|** Type `skip` to skip, and `cancel` to cancel'
             )
-            message = (await self.bot.wait_for('message', check=check, timeout=120)).content
+            message = (await wait_for_answer()).content
             if message.lower() == 'cancel':
                 return
             message = message if message.lower() != 'skip' else None
@@ -190,7 +189,7 @@ class Counting(ConfigBase):
             )
             role = False
             while role is False:
-                role = (await self.bot.wait_for('message', check=check, timeout=120)).content
+                role = (await wait_for_answer()).content
                 if role.lower() == 'cancel':
                     return
                 try:
@@ -204,7 +203,7 @@ class Counting(ConfigBase):
             )
             emoji = False
             while emoji is False:
-                emoji = (await self.bot.wait_for('message', check=check, timeout=120)).content
+                emoji = (await wait_for_answer()).content
                 if emoji.lower() == 'cancel':
                     return
                 try:
@@ -293,9 +292,7 @@ class Counting(ConfigBase):
             )
             if confirm[0] is True:
                 self.bot.counting_channels[ctx.guild.id]['number'] = number
-                await self.bot.db.execute(
-                    'UPDATE count_settings SET current_number = $2 WHERE guild_id = $1', ctx.guild.id, number
-                )
+                await queries.SET_COUNT_NUMBER.execute(self.bot.db, ctx.guild.id, number)
                 await confirm[1].edit(
                     content=f'✅ **|** Updated the **counting number** to **{number}**. '
                     f'\nℹ **|** The next number will be **{number + 1}**',
@@ -55,14 +55,9 @@ class ChannelsView(discord.ui.View):
             m = await self.ctx.send("Please send a channel to change the **Message Events Channel**")
             to_delete.append(m)
 
-            def check(msg: discord.Message):
-                if msg.channel == self.ctx.channel and msg.author == self.ctx.author:
-                    to_delete.append(msg)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
@@ -114,14 +109,9 @@ class ChannelsView(discord.ui.View):
             m = await self.ctx.send("Please send a channel to change the **Message Events Channel**")
             to_delete.append(m)
 
-            def check(message: discord.Message):
-                if message.channel == self.ctx.channel and message.author == self.ctx.author:
-                    to_delete.append(message)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
@@ -173,14 +163,9 @@ class ChannelsView(discord.ui.View):
             m = await self.ctx.send("Please send a channel to change the **Join and Leave Events Channel**")
             to_delete.append(m)
 
-            def check(message: discord.Message):
-                if message.channel == self.ctx.channel and message.author == self.ctx.author:
-                    to_delete.append(message)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
@@ -232,14 +217,9 @@ class ChannelsView(discord.ui.View):
             m = await self.ctx.send('Please send a channel to change the **Member Events Channel**\nSend "cancel" to cancel')
             to_delete.append(m)
 
-            def check(message: discord.Message):
-                if message.channel == self.ctx.channel and message.author == self.ctx.author:
-                    to_delete.append(message)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
@@ -291,14 +271,9 @@ class ChannelsView(discord.ui.View):
             m = await self.ctx.send("Please send a channel to change the **Server Events Channel**")
             to_delete.append(m)
 
-            def check(message: discord.Message):
-                if message.channel == self.ctx.channel and message.author == self.ctx.author:
-                    to_delete.append(message)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
@@ -352,14 +327,9 @@ class ChannelsView(discord.ui.View):
             )
             to_delete.append(m)
 
-            def check(message: discord.Message):
-                if message.channel == self.ctx.channel and message.author == self.ctx.author:
-                    to_delete.append(message)
-                    return True
-                return False
-
             while True:
-                message: discord.Message = await self.bot.wait_for("message", check=check)
+                message: discord.Message = await self.bot.wait_for_message(self.ctx.channel, author=self.ctx.author)
+                to_delete.append(message)
                 if message.content == "cancel":
                     break
                 else:
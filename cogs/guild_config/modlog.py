@@ -6,6 +6,7 @@ from discord.ext import commands
 
 from ._base import ConfigBase
 from ..logs import LoggingBackend
+from helpers import queries
 from helpers.context import CustomContext
 
 
@@ -16,7 +17,7 @@ class ModLogs(ConfigBase):
     async def modlogs(self, ctx: CustomContext, channel: discord.TextChannel = None):  # type: ignore
         """Enables mod-logs"""
         if channel:
-            confirm = bool(await ctx.bot.db.fetchval('SELECT modlog FROM guilds WHERE guild_id = $1', ctx.guild.id))
+            confirm = bool(await queries.GUILD_MODLOG.fetchval(ctx.bot.db, ctx.guild.id))
             if confirm:
                 r = await ctx.confirm(
                     f'Mod-logs are already enabled in {channel.mention}. Do you want to overwrite it?\n'
@@ -30,9 +31,10 @@ class ModLogs(ConfigBase):
                 ctx.guild.id,
                 channel.id,
             )
+            self.bot.guild_config.update(ctx.guild.id, modlog=channel.id)
             await ctx.send(f'✅ | **ModLogs** will now be delivered in #{channel.mention}')
         else:
-            modlog: int = await self.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", ctx.guild.id)  # type: ignore
+            modlog: int = await queries.GUILD_MODLOG.fetchval(self.bot.db, ctx.guild.id)  # type: ignore
             if modlog:
                 await ctx.send(f"ℹ | **ModLogs** are currently enabled in #{self.bot.get_channel(modlog) or modlog}")
             else:
@@ -42,11 +44,12 @@ class ModLogs(ConfigBase):
     @commands.guild_only()
     @commands.has_permissions(administrator=True)
     async def modlogs_disable(self, ctx: CustomContext):
-        modlog = await self.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", ctx.guild.id)
+        modlog = await queries.GUILD_MODLOG.fetchval(self.bot.db, ctx.guild.id)
         if not modlog:
             await ctx.send('ℹ | **ModLogs** are already disabled')
         else:
             await self.bot.db.execute("UPDATE guilds SET modlog = null WHERE guild_id = $1", ctx.guild.id)
+            self.bot.guild_config.update(ctx.guild.id, modlog=None)
             await self.bot.db.execute("DROP TABLE IF EXISTS modlogs.modlogs_{}".format(ctx.guild.id))
             await ctx.send('✅ | **ModLogs** have been disabled')
 
@@ -119,7 +122,7 @@ class ModLogs(ConfigBase):
     @modlogs.command(name='addrole')
     async def addrole(self, ctx: CustomContext, role: discord.Role):
         """Adds a role to the mod-log entry"""
-        if not await ctx.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", ctx.guild.id):
+        if not await queries.GUILD_MODLOG.fetchval(ctx.bot.db, ctx.guild.id):
             raise commands.BadArgument('This guild does not have a mod-log enabled!')
         await ctx.bot.db.execute(
             """
@@ -138,7 +141,7 @@ class ModLogs(ConfigBase):
     @modlogs.command(name='removerole')
     async def removerole(self, ctx: CustomContext, role: discord.Role):
         """Removes a role from the mod-log entry"""
-        if not await ctx.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", ctx.guild.id):
+        if not await queries.GUILD_MODLOG.fetchval(ctx.bot.db, ctx.guild.id):
             raise commands.BadArgument('This guild does not have a mod-log enabled!')
         await ctx.bot.db.fetchrow(
             "UPDATE guilds SET special_roles = ARRAY_REMOVE(special_roles, $1) WHERE guild_id = $2 RETURNING *",
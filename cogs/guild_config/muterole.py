@@ -6,6 +6,7 @@ from discord.ext import commands
 
 import errors
 from bot import CustomContext
+from helpers import queries
 from ._base import ConfigBase
 
 
@@ -25,12 +26,13 @@ class MuteRole(ConfigBase):
                     ctx.guild.id,
                     new_role.id,
                 )
+                self.bot.guild_config.update(ctx.guild.id, muted_id=new_role.id)
 
                 return await ctx.send(
                     f"Updated the muted role to {new_role.mention}!", allowed_mentions=discord.AllowedMentions().none()
                 )
 
-            mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)
+            mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, ctx.guild.id)
 
             if not mute_role:
                 raise errors.MuteRoleNotFound
@@ -58,6 +60,7 @@ class MuteRole(ConfigBase):
             ctx.guild.id,
             None,
         )
+        self.bot.guild_config.update(ctx.guild.id, muted_id=None)
 
         return await ctx.send(f"Removed this server's mute role!", allowed_mentions=discord.AllowedMentions().none())
 
@@ -67,7 +70,7 @@ class MuteRole(ConfigBase):
     async def muterole_create(self, ctx: CustomContext):
         starting_time = time.monotonic()
 
-        mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)
+        mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, ctx.guild.id)
 
         if mute_role:
             mute_role = ctx.guild.get_role(mute_role)
@@ -93,6 +96,7 @@ class MuteRole(ConfigBase):
                 ctx.guild.id,
                 role.id,
             )
+            self.bot.guild_config.update(ctx.guild.id, muted_id=role.id)
 
             modified = 0
             for channel in ctx.guild.channels:
@@ -125,7 +129,7 @@ class MuteRole(ConfigBase):
         Deletes the server's mute role if it exists.
         # If you want to keep the role but not
         """
-        mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)
+        mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, ctx.guild.id)
         if not mute_role:
             raise errors.MuteRoleNotFound
 
@@ -137,6 +141,7 @@ class MuteRole(ConfigBase):
                 ctx.guild.id,
                 None,
             )
+            self.bot.guild_config.update(ctx.guild.id, muted_id=None)
 
             return await ctx.send(
                 "It seems like the muted role was already deleted, or I can't find it right now!"
@@ -160,6 +165,7 @@ class MuteRole(ConfigBase):
             ctx.guild.id,
             None,
         )
+        self.bot.guild_config.update(ctx.guild.id, muted_id=None)
         await ctx.send("🚮")
 
     @muterole.command(name="fix")
@@ -168,7 +174,7 @@ class MuteRole(ConfigBase):
     async def muterole_fix(self, ctx: CustomContext):
         async with ctx.typing():
             starting_time = time.monotonic()
-            mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)
+            mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, ctx.guild.id)
 
             if not mute_role:
                 raise errors.MuteRoleNotFound
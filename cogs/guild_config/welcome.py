@@ -10,6 +10,7 @@ from discord.ext import commands
 
 import errors
 from bot import CustomContext
+from helpers import queries
 from ._base import ConfigBase
 
 if TYPE_CHECKING:
@@ -141,7 +142,7 @@ class Welcome(ConfigBase):
                 raise commands.BadArgument("You can't send messages in that channel!")
             await self.bot.db.execute(query, ctx.guild.id, channel.id)
             self.bot.welcome_channels[ctx.guild.id] = channel.id
-            message = await self.bot.db.fetchval("SELECT welcome_message FROM guilds WHERE guild_id = $1", ctx.guild.id)
+            message = await queries.GUILD_WELCOME_MESSAGE.fetchval(self.bot.db, ctx.guild.id)
             await ctx.send(
                 f"Done! Welcome channel updated to {channel.mention} \n"
                 f"{'also, you can customize the welcome message with the `welcome message` command.' if not message else ''}"
@@ -224,7 +225,7 @@ class Welcome(ConfigBase):
     async def welcome_message_test(self, ctx: CustomContext):
         """Sends a fake welcome message to test the one set using the `welcome message` command."""
         member = ctx.author
-        message = await self.bot.db.fetchval("SELECT welcome_message FROM guilds WHERE guild_id = $1", member.guild.id)
+        message = await queries.GUILD_WELCOME_MESSAGE.fetchval(self.bot.db, member.guild.id)
         message = message or default_message
         invite = SimpleNamespace(
             url='https://discord.gg/TdRfGKg8Wh', code='discord-api', inviter=random.choice(ctx.guild.members)
@@ -257,7 +258,7 @@ class Welcome(ConfigBase):
             channel = await self.bot.get_welcome_channel(member)
         except errors.NoWelcomeChannel:
             return
-        message: str = await self.bot.db.fetchval("SELECT welcome_message FROM guilds WHERE guild_id = $1", member.guild.id)
+        message: str = await queries.GUILD_WELCOME_MESSAGE.fetchval(self.bot.db, member.guild.id)
         message = message or default_message
 
         to_format = {
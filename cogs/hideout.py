@@ -11,6 +11,7 @@ from discord.ext import commands, tasks
 import errors
 from bot import DuckBot
 from cogs.management import get_webhook
+from helpers.cache_registry import registry as cache_registry
 from helpers.context import CustomContext
 from jishaku.paginators import WrappedPaginator
 
@@ -111,9 +112,11 @@ class Hideout(commands.Cog, name="DuckBot Hideout"):
 
     async def cog_load(self):
         self.pleeease.start()
+        cache_registry.register("rtfm", lambda: getattr(self, "_rtfm_cache", {}), owner=self.qualified_name)
 
     async def cog_unload(self) -> None:
         self.pleeease.cancel()
+        cache_registry.unregister_owner(self.qualified_name)
 
     async def build_rtfm_lookup_table(self, page_types):
         cache = {}
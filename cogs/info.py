@@ -1116,54 +1116,28 @@ class About(commands.Cog):
             "\N{SPORTS MEDAL}",
         )
         embed = discord.Embed(title="Server Command Stats", colour=discord.Colour.blurple())
+        stats = await ctx.bot.command_rollups.guild_stats(ctx.guild.id)
         # total command uses
-        query = "SELECT COUNT(*), MIN(timestamp) FROM commands WHERE guild_id=$1;"
-        count = await ctx.bot.db.fetchrow(query, ctx.guild.id)
-        embed.description = f"{count[0]} commands used."
-        if count[1]:
-            timestamp = count[1].replace(tzinfo=datetime.timezone.utc)
+        embed.description = f"{stats.total} commands used."
+        if stats.since:
+            timestamp = stats.since.replace(tzinfo=datetime.timezone.utc)
         else:
             timestamp = discord.utils.utcnow()
         embed.set_footer(text="Tracking command usage since").timestamp = timestamp
-        query = """SELECT command,
-                          COUNT(*) as "uses"
-                   FROM commands
-                   WHERE guild_id=$1
-                   GROUP BY command
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-        records = await ctx.bot.db.fetch(query, ctx.guild.id)
+        records = stats.top.get("commands", [])
         value = (
             "\n".join(f"{lookup[index]}: {command} ({uses} uses)" for (index, (command, uses)) in enumerate(records))
             or "No Commands"
         )
         embed.add_field(name="Top Commands", value=value, inline=True)
-        query = """SELECT command,
-                          COUNT(*) as "uses"
-                   FROM commands
-                   WHERE guild_id=$1
-                   AND timestamp > (CURRENT_TIMESTAMP - INTERVAL '1 day')
-                   GROUP BY command
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-        records = await ctx.bot.db.fetch(query, ctx.guild.id)
+        records = stats.top.get("commands_today", [])
         value = (
             "\n".join(f"{lookup[index]}: {command} ({uses} uses)" for (index, (command, uses)) in enumerate(records))
             or "No Commands."
         )
         embed.add_field(name="Top Commands Today", value=value, inline=True)
         embed.add_field(name="\u200b", value="\u200b", inline=True)
-        query = """SELECT user_id,
-                          COUNT(*) AS "uses"
-                   FROM commands
-                   WHERE guild_id=$1
-                   GROUP BY user_id
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-        records = await ctx.bot.db.fetch(query, ctx.guild.id)
+        records = stats.top.get("users", [])
         value = (
             "\n".join(
                 f"{lookup[index]}: <@!{author_id}> ({uses} bot uses)" for (index, (author_id, uses)) in enumerate(records)
@@ -1171,16 +1145,7 @@ class About(commands.Cog):
             or "No bot users."
         )
         embed.add_field(name="Top Command Users", value=value, inline=True)
-        query = """SELECT user_id,
-                          COUNT(*) AS "uses"
-                   FROM commands
-                   WHERE guild_id=$1
-                   AND timestamp > (CURRENT_TIMESTAMP - INTERVAL '1 day')
-                   GROUP BY user_id
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-        records = await ctx.bot.db.fetch(query, ctx.guild.id)
+        records = stats.top.get("users_today", [])
         value = (
             "\n".join(
                 f"{lookup[index]}: <@!{author_id}> ({uses} bot uses)" for (index, (author_id, uses)) in enumerate(records)
@@ -1203,28 +1168,18 @@ class About(commands.Cog):
         embed = discord.Embed(title="Command Stats", colour=member.colour)
         embed.set_author(name=str(member), icon_url=member.display_avatar.url)
 
-        # total command uses
-        query = "SELECT COUNT(*), MIN(timestamp) FROM commands WHERE guild_id=$1 AND user_id=$2;"
-        count = await ctx.bot.db.fetchrow(query, ctx.guild.id, member.id)
+        stats = await ctx.bot.command_rollups.member_stats(ctx.guild.id, member.id)
 
-        embed.description = f"{count[0]} commands used."
-        if count[1]:
-            timestamp = count[1].replace(tzinfo=datetime.timezone.utc)
+        # total command uses
+        embed.description = f"{stats.total} commands used."
+        if stats.since:
+            timestamp = stats.since.replace(tzinfo=datetime.timezone.utc)
         else:
             timestamp = discord.utils.utcnow()
 
         embed.set_footer(text="First command used").timestamp = timestamp
 
-        query = """SELECT command,
-                          COUNT(*) as "uses"
-                   FROM commands
-                   WHERE guild_id=$1 AND user_id=$2
-                   GROUP BY command
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-
-        records = await ctx.bot.db.fetch(query, ctx.guild.id, member.id)
+        records = stats.top.get("commands", [])
 
         value = (
             "\n".join(f"{lookup[index]}: {command} ({uses} uses)" for (index, (command, uses)) in enumerate(records))
@@ -1233,18 +1188,7 @@ class About(commands.Cog):
 
         embed.add_field(name="Most Used Commands", value=value, inline=False)
 
-        query = """SELECT command,
-                          COUNT(*) as "uses"
-                   FROM commands
-                   WHERE guild_id=$1
-                   AND user_id=$2
-                   AND timestamp > (CURRENT_TIMESTAMP - INTERVAL '1 day')
-                   GROUP BY command
-                   ORDER BY "uses" DESC
-                   LIMIT 5;
-                """
-
-        records = await ctx.bot.db.fetch(query, ctx.guild.id, member.id)
+        records = stats.top.get("commands_today", [])
 
         value = (
             "\n".join(f"{lookup[index]}: {command} ({uses} uses)" for (index, (command, uses)) in enumerate(records))
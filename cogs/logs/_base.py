@@ -1,10 +1,8 @@
-import asyncio
-import logging
 from collections import namedtuple
 
 import discord
 import typing
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from bot import DuckBot
 
@@ -14,13 +12,12 @@ guild_channels = typing.Union[
     discord.CategoryChannel,
     discord.TextChannel,
 ]
-invalidated_webhook = "https://canary.discord.com/api/webhooks/000000000000000000/_LQ1qItzrwhNj47TZEagmEgnjBJhCeLIIAE48M61S3XojN5bQuq8JM_kjv4cwCglYJlp"
 
 
 class LoggingBase(commands.Cog):
     def __init__(self, bot):
         self.bot: DuckBot = bot
-        self.deliver_logs.start()
+        self.bot.log_delivery.on_not_found = self.create_and_deliver
         _nt_send_to = namedtuple("send_to", ["default", "message", "member", "join_leave", "voice", "server"])
         self.send_to = _nt_send_to(
             default="default",
@@ -32,7 +29,7 @@ class LoggingBase(commands.Cog):
         )
 
     def cog_unload(self) -> None:
-        self.deliver_logs.cancel()
+        self.bot.log_delivery.on_not_found = None
 
     def log(
         self,
@@ -43,71 +40,7 @@ class LoggingBase(commands.Cog):
     ):
         guild_id = getattr(guild, "id", guild)
         if guild_id in self.bot.log_channels:
-            self.bot.log_cache[guild_id][send_to].append(embed)
-
-    @tasks.loop(seconds=3)
-    async def deliver_logs(self):
-        try:
-            for guild_id, webhooks in self.bot.log_channels.items():
-                for deliver_type, cache in self.bot.log_cache[guild_id].items():
-
-                    embeds = self.bot.log_cache[guild_id][deliver_type][:10]
-                    self.bot.log_cache[guild_id][deliver_type] = self.bot.log_cache[guild_id][deliver_type][10:]
-                    webhook_url = getattr(webhooks, deliver_type, None)
-                    if embeds:
-                        if webhook_url:
-                            webhook = discord.Webhook.from_url(
-                                webhook_url or invalidated_webhook,
-                                bot_token=self.bot.http.token,
-                                session=self.bot.session,
-                            )
-                            try:
-                                await webhook.send(embeds=embeds)
-                            except discord.NotFound:
-                                self.bot.loop.create_task(
-                                    self.create_and_deliver(
-                                        embeds=embeds,
-                                        deliver_type=deliver_type,
-                                        guild_id=guild_id,
-                                    )
-                                )
-                                await asyncio.sleep(1)
-                            except Exception as e:
-                                print("Error during task!")
-                                print(e)
-                        else:
-                            deliver_type = self.send_to.default
-                            webhook_url = webhooks.default
-                            webhook = discord.Webhook.from_url(
-                                webhook_url or invalidated_webhook,
-                                bot_token=self.bot.http.token,
-                                session=self.bot.session,
-                            )
-                            try:
-                                await webhook.send(embeds=embeds)
-                            except discord.NotFound:
-                                self.bot.loop.create_task(
-                                    self.create_and_deliver(
-                                        embeds=embeds,
-                                        deliver_type=deliver_type,
-                                        guild_id=guild_id,
-                                    )
-                                )
-                                await asyncio.sleep(1)
-                            except Exception as e:
-                                print("Error during task!")
-                                print(e)
-        except Exception as e:  # noqa
-            if isinstance(e, RuntimeError) and str(e) == str(RuntimeError('dictionary changed size during iteration')):
-                return
-            try:
-                await self.bot.on_error("channel_logs")
-            except Exception as e:
-                logging.error("something happened while task was running", exc_info=e)
-
-    @deliver_logs.before_loop
-    async def wait(self):
-        await self.bot.wait_until_ready()
+            self.bot.log_delivery.log(guild_id, send_to, embed)
 
     # noinspection PyProtectedMember
     async def create_and_deliver(self, embeds: typing.List[discord.Embed], deliver_type: str, guild_id: int):
@@ -0,0 +1,296 @@
+import typing
+
+import discord
+
+from helpers import constants
+from helpers.log_delivery import LogRecord
+
+Change = typing.Tuple[typing.Any, typing.Any]
+
+
+def _combine(older: typing.Optional[Change], newer: typing.Optional[Change]) -> typing.Optional[Change]:
+    """The net change of two successive ones, None if they cancel out."""
+    if older is None or newer is None:
+        return older or newer
+    return (older[0], newer[1]) if older[0] != newer[1] else None
+
+
+def _permission_names(permissions: discord.Permissions, value: bool) -> typing.Set[str]:
+    return {str(name).replace('guild', 'server').replace('_', ' ').title() for name, v in permissions if v is value}
+
+
+class UserRecord(LogRecord):
+    """A log about one user or member, shown as the embed's author."""
+
+    __slots__ = ('user',)
+
+    def __init__(self, user: typing.Union[discord.User, discord.Member]):
+        super().__init__()
+        self.user = user
+
+    def _embed(self, colour: discord.Colour, footer: str = 'User ID', **kwargs) -> discord.Embed:
+        embed = discord.Embed(title=self.kind, colour=colour, timestamp=self.created_at, **kwargs)
+        embed.set_author(name=str(self.user), icon_url=self.user.display_avatar.url)
+        embed.set_footer(text=f'{footer}: {self.user.id}')
+        return embed
+
+
+class MessageDeleted(UserRecord):
+    __slots__ = ('channel', 'content', 'attachments', 'stickers')
+
+    kind = 'Message deleted'
+
+    def __init__(self, message: discord.Message):
+        super().__init__(message.author)
+        self.channel = message.channel
+        self.content: str = message.content
+        self.attachments = message.attachments
+        self.stickers = message.stickers
+
+    def to_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f'Message deleted in #{self.channel}',
+            description=(self.content or '\u200b')[0:4000],
+            colour=discord.Colour.red(),
+            timestamp=self.created_at,
+        )
+        embed.set_author(name=str(self.user), icon_url=self.user.display_avatar.url)
+        embed.set_footer(text=f"Channel: {self.channel.id}")
+        if self.attachments:
+            embed.add_field(name='Attachments:', value='\n'.join([a.filename for a in self.attachments]), inline=False)
+        if self.stickers:
+            embed.add_field(name='Stickers:', value='\n'.join([a.name for a in self.stickers]), inline=False)
+        return embed
+
+
+class MessageEdited(UserRecord):
+    __slots__ = ('channel', 'message_id', 'before', 'after', 'attachments')
+
+    kind = 'Message edited'
+
+    def __init__(self, before: discord.Message, after: discord.Message):
+        super().__init__(before.author)
+        self.channel = before.channel
+        self.message_id: int = after.id
+        self.before: str = before.content
+        self.after: str = after.content
+        # Only kept when some were removed, as (before, after).
+        self.attachments: typing.Optional[Change] = None
+        if before.attachments and before.attachments != after.attachments:
+            self.attachments = (before.attachments, after.attachments)
+
+    def to_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f'Message edited in #{self.channel}', colour=discord.Colour.blurple(), timestamp=self.created_at
+        )
+        embed.set_author(name=str(self.user), icon_url=self.user.display_avatar.url)
+        embed.set_footer(text=f"Channel: {self.channel.id}")
+
+        embed.add_field(name='**__Before:__**', value=self.before[0:1024], inline=False)
+        embed.add_field(name='**__After:__**', value=self.after[0:1024], inline=False)
+        if self.attachments:
+            before, after = self.attachments
+            attachments = [a.filename if a in after else f"[Removed] ~~{a.filename}~~" for a in before]
+            embed.add_field(name='Attachments:', value='\n'.join(attachments), inline=False)
+        jump_url = f'https://discord.com/channels/{self.channel.guild.id}/{self.channel.id}/{self.message_id}'
+        embed.add_field(name='Jump:', value=f'[[Jump to message]]({jump_url})', inline=False)
+        return embed
+
+
+class MemberUpdated(UserRecord):
+    """Each change is kept as a (before, after) pair, or None if it didn't change."""
+
+    __slots__ = ('avatar', 'thumbnail', 'roles', 'nick')
+
+    kind = 'Member Updated'
+
+    def __init__(self, before: discord.Member, after: discord.Member):
+        super().__init__(after)
+        self.avatar: typing.Optional[Change] = None
+        self.thumbnail: typing.Optional[discord.Asset] = None
+        self.roles: typing.Optional[Change] = None
+        self.nick: typing.Optional[Change] = None
+        if before.avatar != after.avatar:
+            self.avatar = (before.avatar, after.avatar)
+            self.thumbnail = (after.guild_avatar or after.display_avatar) if after.avatar else after.default_avatar
+        if before.roles != after.roles:
+            roles = (frozenset(r.id for r in before.roles), frozenset(r.id for r in after.roles))
+            self.roles = roles if roles[0] != roles[1] else None
+        if before.nick != after.nick:
+            self.nick = (before.nick, after.nick)
+
+    def __bool__(self) -> bool:
+        return bool(self.avatar or self.roles or self.nick)
+
+    @property
+    def key(self) -> typing.Hashable:
+        return 'member', self.user.id
+
+    def merge(self, newer: 'MemberUpdated') -> None:
+        self.user = newer.user
+        self.avatar = _combine(self.avatar, newer.avatar)
+        self.thumbnail = newer.thumbnail or self.thumbnail
+        self.roles = _combine(self.roles, newer.roles)
+        self.nick = _combine(self.nick, newer.nick)
+
+    def to_embed(self) -> discord.Embed:
+        embed = self._embed(discord.Colour.blurple())
+        if self.avatar:
+            before, after = self.avatar
+            if after is not None:
+                embed.add_field(
+                    name='Server Avatar updated:',
+                    inline=False,
+                    value=f'Member {"updated" if before else "set"} their avatar.',
+                )
+            else:
+                embed.add_field(name='Server Avatar updated:', inline=False, value='Member removed their avatar.')
+            embed.set_thumbnail(url=self.thumbnail.url)
+        if self.roles:
+            before, after = self.roles
+            added = f"**Added:**" + ', '.join([f'<@&{r}>' for r in after - before]) if after - before else ''
+            removed = f"**Removed:**" + ', '.join([f'<@&{r}>' for r in before - after]) if before - after else ''
+            embed.add_field(name='Roles updated:', inline=False, value=f"{added}\n{removed}")
+        if self.nick:
+            before, after = self.nick
+            embed.add_field(
+                name='Nickname updated:',
+                inline=False,
+                value=f"**Before:** {discord.utils.escape_markdown(str(before))}"
+                f"\n**After:** {discord.utils.escape_markdown(str(after))}",
+            )
+        return embed
+
+
+class VoiceChannelChanged(UserRecord):
+    """A member joining, leaving or moving between voice channels. The channels are IDs, None when not connected."""
+
+    __slots__ = ('before', 'after')
+
+    def __init__(self, member: discord.Member, before: typing.Optional[int], after: typing.Optional[int]):
+        super().__init__(member)
+        self.before: typing.Optional[int] = before
+        self.after: typing.Optional[int] = after
+
+    def __bool__(self) -> bool:
+        return self.before != self.after
+
+    @property
+    def key(self) -> typing.Hashable:
+        return 'voice', self.user.id
+
+    def merge(self, newer: 'VoiceChannelChanged') -> None:
+        self.user = newer.user
+        self.after = newer.after
+
+    @property
+    def kind(self) -> str:  # type: ignore
+        if self.before is None:
+            return 'Member joined a voice channel:'
+        if self.after is None:
+            return 'Member left a voice channel:'
+        return 'Member moved voice channels:'
+
+    def to_embed(self) -> discord.Embed:
+        if self.before is None:
+            return self._embed(
+                discord.Colour.green(), 'Member ID', description=f"**Joined:** <#{self.after}> ({self.after})"
+            )
+        if self.after is None:
+            return self._embed(discord.Colour.red(), 'Member ID', description=f"**Left:** <#{self.before}> ({self.before})")
+        return self._embed(
+            discord.Colour.blurple(),
+            'Member ID',
+            description=f"**From:** <#{self.before}> ({self.before})\n**To:** <#{self.after}> ({self.after})",
+        )
+
+
+class VoiceModerated(UserRecord):
+    __slots__ = ('action',)
+
+    ACTIONS = {
+        'deafen': ('Member Deafened by a Moderator', discord.Colour.dark_gold),
+        'undeafen': ('Member Un-deafened by a Moderator', discord.Colour.yellow),
+        'mute': ('Member Muted by a Moderator', discord.Colour.dark_gold),
+        'unmute': ('Member Un-muted by a Moderator', discord.Colour.yellow),
+    }
+
+    def __init__(self, member: discord.Member, action: str):
+        super().__init__(member)
+        self.action: str = action
+
+    @property
+    def kind(self) -> str:  # type: ignore
+        return self.ACTIONS[self.action][0]
+
+    def to_embed(self) -> discord.Embed:
+        return self._embed(self.ACTIONS[self.action][1](), 'Member ID')
+
+
+class RoleSnapshot(typing.NamedTuple):
+    name: str
+    permissions: discord.Permissions
+    hoist: bool
+    mentionable: bool
+    colour: discord.Colour
+    position: int
+
+    @classmethod
+    def of(cls, role: discord.Role) -> 'RoleSnapshot':
+        return cls(role.name, role.permissions, role.hoist, role.mentionable, role.colour, role.position)
+
+
+class RoleUpdated(LogRecord):
+    __slots__ = ('role_id', 'before', 'after')
+
+    kind = 'Role Updated'
+
+    def __init__(self, before: discord.Role, after: discord.Role):
+        super().__init__()
+        self.role_id: int = after.id
+        self.before: RoleSnapshot = RoleSnapshot.of(before)
+        self.after: RoleSnapshot = RoleSnapshot.of(after)
+
+    def __bool__(self) -> bool:
+        # A new position alone isn't worth a log, it is only shown along with other changes.
+        return self.before._replace(position=0) != self.after._replace(position=0)
+
+    @property
+    def key(self) -> typing.Hashable:
+        return 'role', self.role_id
+
+    def merge(self, newer: 'RoleUpdated') -> None:
+        self.after = newer.after
+
+    def to_embed(self) -> discord.Embed:
+        before, after = self.before, self.after
+        embed = discord.Embed(title=self.kind, timestamp=self.created_at, colour=discord.Colour.blurple())
+
+        if before.permissions != after.permissions:
+            added = _permission_names(after.permissions, True) - _permission_names(before.permissions, True)
+            removed = _permission_names(after.permissions, False) - _permission_names(before.permissions, False)
+            added = f"**Added:** {', '.join(added)}\n" if added else ''
+            removed = f"**Removed:** {', '.join(removed)}" if removed else ''
+            embed.add_field(name='Permissions Updated:', value=added + removed, inline=False)
+
+        description = f'**Name:** {after.name}'
+        if before.name != after.name:
+            description = (
+                f"**Name:**\n**Before:** {discord.utils.remove_markdown(before.name)}"
+                f"\n**After:** {discord.utils.remove_markdown(after.name)}"
+            )
+        if before.hoist != after.hoist:
+            description += (
+                f"\n**Show Separately:** {constants.DEFAULT_TICKS[before.hoist]} ➜ {constants.DEFAULT_TICKS[after.hoist]}"
+            )
+        if before.mentionable != after.mentionable:
+            description += (
+                f"\n**Mentionable:** {constants.DEFAULT_TICKS[before.mentionable]}"
+                f" ➜ {constants.DEFAULT_TICKS[after.mentionable]}"
+            )
+        if before.colour != after.colour:
+            description += f"\n**Updated Color:** `{before.colour}` ➜ `{after.colour}`"
+        if before.position != after.position:
+            description += f"\n**Updated Position:** `{before.position}` ➜ `{after.position}`"
+        embed.description = description
+        return embed
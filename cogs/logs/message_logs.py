@@ -8,6 +8,7 @@ from discord.ext import commands, tasks
 from bot import DuckBot
 
 from ._base import LoggingBase
+from ._records import MessageDeleted, MessageEdited
 
 
 class MessageLogs(LoggingBase):
@@ -21,21 +22,7 @@ class MessageLogs(LoggingBase):
         ):
             return
         if message.guild.id in self.bot.log_channels:
-            embed = discord.Embed(
-                title=f'Message deleted in #{message.channel}',
-                description=(message.content or '\u200b')[0:4000],
-                colour=discord.Colour.red(),
-                timestamp=discord.utils.utcnow(),
-            )
-            embed.set_author(name=str(message.author), icon_url=message.author.display_avatar.url)
-            embed.set_footer(text=f"Channel: {message.channel.id}")
-            if message.attachments:
-                embed.add_field(
-                    name='Attachments:', value='\n'.join([a.filename for a in message.attachments]), inline=False
-                )
-            if message.stickers:
-                embed.add_field(name='Stickers:', value='\n'.join([a.name for a in message.stickers]), inline=False)
-            self.log(embed, guild=message.guild, send_to=self.send_to.message)
+            self.log(MessageDeleted(message), guild=message.guild, send_to=self.send_to.message)
 
     @commands.Cog.listener('on_raw_bulk_message_delete')
     async def logger_on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
@@ -89,24 +76,4 @@ class MessageLogs(LoggingBase):
                 and before.stickers == after.stickers
             ):
                 return
-            embed = discord.Embed(
-                title=f'Message edited in #{before.channel}',
-                colour=discord.Colour.blurple(),
-                timestamp=discord.utils.utcnow(),
-            )
-            embed.set_author(name=str(before.author), icon_url=before.author.display_avatar.url)
-            embed.set_footer(text=f"Channel: {before.channel.id}")
-
-            embed.add_field(name='**__Before:__**', value=before.content[0:1024], inline=False)
-            embed.add_field(name='**__After:__**', value=after.content[0:1024], inline=False)
-            if before.attachments and before.attachments != after.attachments:
-                af = after.attachments
-                attachments = []
-                for a in before.attachments:
-                    if a in af:
-                        attachments.append(a.filename)
-                    else:
-                        attachments.append(f"[Removed] ~~{a.filename}~~")
-                embed.add_field(name='Attachments:', value='\n'.join(attachments), inline=False)
-            embed.add_field(name='Jump:', value=f'[[Jump to message]]({after.jump_url})', inline=False)
-            self.log(embed, guild=before.guild, send_to=self.send_to.message)
+            self.log(MessageEdited(before, after), guild=before.guild, send_to=self.send_to.message)
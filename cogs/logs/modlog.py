@@ -53,13 +53,13 @@ class ModLogs(LoggingBase):
         """
         Checks if a guild is logged
         """
-        return await self.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", guild.id) is not None
+        return (await self.bot.guild_config.get(guild.id)).modlog is not None
 
     async def get_modlog(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
         """
         Gets the modlog channel for a guild
         """
-        ch_id = await self.bot.db.fetchval("SELECT modlog FROM guilds WHERE guild_id = $1", guild.id)
+        ch_id = (await self.bot.guild_config.get(guild.id)).modlog
         if ch_id is None:
             return None
         return guild.get_channel(ch_id)  # type: ignore
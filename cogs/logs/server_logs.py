@@ -5,6 +5,7 @@ from discord.ext import commands
 
 from helpers import constants
 from ._base import LoggingBase, guild_channels
+from ._records import RoleUpdated
 
 
 class ServerLogs(LoggingBase):
@@ -199,81 +200,9 @@ class ServerLogs(LoggingBase):
     async def logger_on_guild_role_update(self, before: discord.Role, after: discord.Role):
         if before.guild.id not in self.bot.log_channels or not self.bot.guild_loggings[after.guild.id].role_edit:
             return
-        embed = discord.Embed(title='Role Updated', timestamp=discord.utils.utcnow(), colour=discord.Colour.blurple())
-        deliver = False
-
-        if before.permissions != after.permissions:
-            before_true = [
-                str(name).replace('guild', 'server').replace('_', ' ').title()
-                for name, value in set(before.permissions)
-                if value is True
-            ]
-            before_false = [
-                str(name).replace('guild', 'server').replace('_', ' ').title()
-                for name, value in set(before.permissions)
-                if value is False
-            ]
-            after_true = [
-                str(name).replace('guild', 'server').replace('_', ' ').title()
-                for name, value in set(after.permissions)
-                if value is True
-            ]
-            after_false = [
-                str(name).replace('guild', 'server').replace('_', ' ').title()
-                for name, value in set(after.permissions)
-                if value is False
-            ]
-            added = ''
-            if before_true != after_true:
-                added = set(after_true) - set(before_true)
-                if added:
-                    added = f"**Added:** {', '.join(added)}\n"
-                else:
-                    added = ''
-            removed = ''
-            if after_false != before_false:
-                removed = set(after_false) - set(before_false)
-                if removed:
-                    removed = f"**Removed:** {', '.join(removed)}"
-                else:
-                    removed = ''
-            embed.add_field(name='Permissions Updated:', value=added + removed, inline=False)
-            deliver = True
-
-        hoist_update = ''
-        if before.hoist != after.hoist:
-            hoist_update = (
-                f"\n**Show Separately:** {constants.DEFAULT_TICKS[before.hoist]} ➜ {constants.DEFAULT_TICKS[after.hoist]}"
-            )
-            deliver = True
-
-        ping_update = ''
-        if before.mentionable != after.mentionable:
-            ping_update = f"\n**Mentionable:** {constants.DEFAULT_TICKS[before.mentionable]} ➜ {constants.DEFAULT_TICKS[after.mentionable]}"
-            deliver = True
-
-        role_update = f'**Name:** {after.name}'
-        if before.name != after.name:
-            role_update = (
-                f"**Name:**\n**Before:** {discord.utils.remove_markdown(before.name)}"
-                f"\n**After:** {discord.utils.remove_markdown(after.name)}"
-            )
-            deliver = True
-
-        color_update = ''
-        if before.color != after.color:
-            color_update = f"\n**Updated Color:** `{before.color}` ➜ `{after.color}`"
-            deliver = True
-
-        position_update = ''
-        if before.position != after.position:
-            position_update = f"\n**Updated Position:** `{before.position}` ➜ `{after.position}`"
-            # Added just in case, but we don't set deliver to True, so it will only
-            # be sent to the logs if other attributes of the role have changed
-
-        embed.description = role_update + hoist_update + ping_update + color_update + position_update
-        if deliver:
-            self.log(embed, guild=after.guild, send_to=self.send_to.server)
+        record = RoleUpdated(before, after)
+        if record:
+            self.log(record, guild=after.guild, send_to=self.send_to.server)
 
     @commands.Cog.listener('on_guild_emojis_update')
     async def logger_on_guild_emojis_update(
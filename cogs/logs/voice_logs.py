@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 
 from ._base import LoggingBase
+from ._records import VoiceChannelChanged, VoiceModerated
 from helpers import constants
 
 
@@ -12,78 +13,22 @@ class VoiceLogs(LoggingBase):
     ):
         if member.guild.id not in self.bot.log_channels:
             return
-        if (
-            before.channel
-            and after.channel
-            and before.channel != after.channel
-            and self.bot.guild_loggings[member.guild.id].voice_move
+        loggings = self.bot.guild_loggings[member.guild.id]
+        if before.channel != after.channel and (
+            (before.channel and after.channel and loggings.voice_move)
+            or (not before.channel and loggings.voice_join)
+            or (not after.channel and loggings.voice_leave)
         ):
-            embed = discord.Embed(
-                title='Member moved voice channels:',
-                colour=discord.Colour.blurple(),
-                timestamp=discord.utils.utcnow(),
-                description=f"**From:** {before.channel.mention} ({after.channel.id})"
-                f"\n**To:** {after.channel.mention} ({after.channel.id})",
-            )
-            embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-            embed.set_footer(text=f"Member ID: {member.id}")
-            self.log(embed, guild=member.guild, send_to=self.send_to.voice)
-        if not before.channel and after.channel and self.bot.guild_loggings[member.guild.id].voice_join:
-            embed = discord.Embed(
-                title='Member joined a voice channel:',
-                colour=discord.Colour.green(),
-                timestamp=discord.utils.utcnow(),
-                description=f"**Joined:** {after.channel.mention} ({after.channel.id})",
-            )
-            embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-            embed.set_footer(text=f"Member ID: {member.id}")
-            self.log(embed, guild=member.guild, send_to=self.send_to.voice)
-        if before.channel and not after.channel and self.bot.guild_loggings[member.guild.id].voice_leave:
-            embed = discord.Embed(
-                title='Member left a voice channel:',
-                colour=discord.Colour.red(),
-                timestamp=discord.utils.utcnow(),
-                description=f"**Left:** {before.channel.mention} ({before.channel.id})",
-            )
-            embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-            embed.set_footer(text=f"Member ID: {member.id}")
-            self.log(embed, guild=member.guild, send_to=self.send_to.voice)
-        if not self.bot.guild_loggings[member.guild.id].voice_mod:
+            record = VoiceChannelChanged(member, getattr(before.channel, 'id', None), getattr(after.channel, 'id', None))
+            self.log(record, guild=member.guild, send_to=self.send_to.voice)
+        if not loggings.voice_mod:
             return
         if before.deaf != after.deaf:
-            if after.deaf:
-                embed = discord.Embed(
-                    title='Member Deafened by a Moderator',
-                    colour=discord.Colour.dark_gold(),
-                    timestamp=discord.utils.utcnow(),
-                )
-                embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-                embed.set_footer(text=f"Member ID: {member.id}")
-                self.log(embed, guild=member.guild, send_to=self.send_to.voice)
-            if before.deaf:
-                embed = discord.Embed(
-                    title='Member Un-deafened by a Moderator',
-                    colour=discord.Colour.yellow(),
-                    timestamp=discord.utils.utcnow(),
-                )
-                embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-                embed.set_footer(text=f"Member ID: {member.id}")
-                self.log(embed, guild=member.guild, send_to=self.send_to.voice)
+            record = VoiceModerated(member, 'deafen' if after.deaf else 'undeafen')
+            self.log(record, guild=member.guild, send_to=self.send_to.voice)
         if before.mute != after.mute:
-            if after.mute:
-                embed = discord.Embed(
-                    title='Member Muted by a Moderator', colour=discord.Colour.dark_gold(), timestamp=discord.utils.utcnow()
-                )
-                embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-                embed.set_footer(text=f"Member ID: {member.id}")
-                self.log(embed, guild=member.guild, send_to=self.send_to.voice)
-            if before.mute:
-                embed = discord.Embed(
-                    title='Member Un-muted by a Moderator', colour=discord.Colour.yellow(), timestamp=discord.utils.utcnow()
-                )
-                embed.set_author(name=str(member), icon_url=member.display_avatar.url)
-                embed.set_footer(text=f"Member ID: {member.id}")
-                self.log(embed, guild=member.guild, send_to=self.send_to.voice)
+            record = VoiceModerated(member, 'mute' if after.mute else 'unmute')
+            self.log(record, guild=member.guild, send_to=self.send_to.voice)
 
     @commands.Cog.listener('on_stage_instance_create')
     async def logger_on_stage_instance_create(self, stage_instance: discord.StageInstance):
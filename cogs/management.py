@@ -10,6 +10,7 @@ import os
 import random
 import re
 import textwrap
+import time
 import traceback
 import typing
 from collections import defaultdict
@@ -26,7 +27,10 @@ from jishaku.paginators import WrappedPaginator
 from jishaku.shim.paginator_200 import PaginatorInterface
 
 from bot import DuckBot, CustomContext
-from helpers import paginator, constants
+from helpers import benchmarks, paginator, constants
+from helpers.cache_registry import registry as cache_registry
+from helpers.db_usage import usage as db_usage
+from helpers.queries import registry as query_registry
 
 RebootArg = typing.Optional[typing.Union[bool, typing.Literal["reboot", "restart", "r"]]]
 
@@ -420,11 +424,11 @@ class Management(commands.Cog, name="Bot Management"):
         await ctx.send("Enter code to execute or evaluate. `exit()` or `quit` to exit.")
 
         def check(m):
-            return m.author.id == ctx.author.id and m.channel.id == ctx.channel.id and m.content.startswith("`")
+            return m.content.startswith("`")
 
         while True:
             try:
-                response = await self.bot.wait_for("message", check=check, timeout=10.0 * 60.0)
+                response = await self.bot.wait_for_message(ctx.channel, author=ctx.author, check=check, timeout=10.0 * 60.0)
             except asyncio.TimeoutError:
                 await ctx.send("Exiting REPL session.")
                 self.sessions.remove(ctx.channel.id)
@@ -645,8 +649,8 @@ class Management(commands.Cog, name="Bot Management"):
 
         @dev_all_history.command(name="clear")
         async def dev_all_history_clear(self, ctx: CustomContext):
-            """Clears all command history"""
-            await self.bot.db.execute("DELETE FROM commands")
+            """Clears all command history, including the hourly stats rollups"""
+            await self.bot.command_rollups.clear()
             await ctx.message.add_reaction("✅")
 
         @dev.group(
@@ -715,6 +719,261 @@ class Management(commands.Cog, name="Bot Management"):
             menu = paginator.ViewPaginator(source=source, ctx=ctx)
             await menu.start()
 
+        async def send_table(self, ctx: CustomContext, table: typing.List[typing.Sequence], headers: typing.List[str], title: str):
+            """Sends a tabulated table in a paginator, like the other dev listings"""
+            table = tabulate.tabulate(table, headers=headers, tablefmt="presto")
+            lines = table.split("\n")
+            lines, headers = lines[2:], "\n".join(lines[0:2])
+            header = title.center(len(lines[0]) if lines else len(title))
+            pages = jishaku.paginators.WrappedPaginator(prefix=f"```\n{header}\n{headers}", max_size=1950)
+            [pages.add_line(line) for line in lines]
+            interface = jishaku.paginators.PaginatorInterface(self.bot, pages)
+            await interface.send_to(ctx)
+
+        @dev.command(name="message-routes", aliases=["routes", "mr"])
+        async def dev_message_routes(self, ctx: CustomContext):
+            """Shows how many messages each routed on_message handler received, and the pending message waiters"""
+            router = self.bot.router
+            table = [
+                (route.name, route.describe(), route.received)
+                for route in sorted(router.routes.values(), key=lambda r: r.received, reverse=True)
+            ]
+            waiters = self.bot.message_waiters
+            title = f"{router.dispatched} messages routed, {waiters.pending} waiters pending in {waiters.channels} channels"
+            await self.send_table(ctx, table, ["Handler", "Filters", "Received"], title)
+
+        @dev.command(name="executors", aliases=["queues"])
+        async def dev_executors(self, ctx: CustomContext):
+            """Shows the ordered event executors' queue depth and wait times"""
+            table = [
+                (
+                    executor.name,
+                    executor.active_keys,
+                    executor.depth,
+                    executor.max_depth,
+                    executor.processed,
+                    executor.dropped,
+                    f"{executor.average_wait * 1000:.2f}",
+                    f"{executor.max_wait * 1000:.2f}",
+                )
+                for executor in self.bot.executors.values()
+            ]
+            headers = ["Executor", "Keys", "Depth", "Max depth", "Processed", "Dropped", "Avg wait (ms)", "Max wait (ms)"]
+            await self.send_table(ctx, table, headers, "Ordered event executors")
+
+        @dev.command(name="prechecks", aliases=["checks"])
+        async def dev_prechecks(self, ctx: CustomContext):
+            """Shows how often each global command check ran, rejected, and how long it took"""
+            pipeline = self.bot.prechecks
+            table = [
+                (
+                    stage.name,
+                    stage.once,
+                    stage.calls,
+                    stage.rejected,
+                    f"{stage.average_time * 1_000_000:.1f}",
+                    f"{stage.max_time * 1_000_000:.1f}",
+                )
+                for stage in pipeline.stages
+            ]
+            headers = ["Stage", "Once", "Calls", "Rejected", "Avg (µs)", "Max (µs)"]
+            await self.send_table(ctx, table, headers, f"Command prechecks, last rejected by: {pipeline.last_rejection}")
+
+        @dev.command(name="caches")
+        async def dev_caches(self, ctx: CustomContext):
+            """Shows every registered cache, its approximate size and hit rate, biggest first"""
+            table = []
+            total = 0
+            for name, owner, entries, size, stats in cache_registry.report():
+                total += size
+                table.append(
+                    (
+                        name,
+                        owner,
+                        entries,
+                        f"{size / 1024:.1f}",
+                        stats.get("hits", "-"),
+                        stats.get("misses", "-"),
+                        stats.get("evictions", "-"),
+                    )
+                )
+            headers = ["Cache", "Owner", "Entries", "~KiB", "Hits", "Misses", "Evictions"]
+            await self.send_table(ctx, table, headers, f"{len(table)} caches, ~{total / 1024 / 1024:.2f} MiB")
+
+        @dev.command(name="queries", aliases=["slow-queries"])
+        async def dev_queries(self, ctx: CustomContext, limit: int = 25):
+            """Shows the slowest named queries by p95 latency, with how many rows they return per call"""
+            table = []
+            for query in query_registry.slowest(limit):
+                histogram = query.histogram
+                table.append(
+                    (
+                        query.name,
+                        histogram.count,
+                        f"{histogram.rows / histogram.count:.1f}",
+                        f"{histogram.percentile(0.50) * 1000:.2f}",
+                        f"{histogram.percentile(0.95) * 1000:.2f}",
+                        f"{histogram.percentile(0.99) * 1000:.2f}",
+                        f"{histogram.total * 1000:.0f}",
+                    )
+                )
+            headers = ["Query", "Calls", "Rows/call", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Total (ms)"]
+            await self.send_table(ctx, table, headers, f"{len(query_registry.queries)} named queries, slowest first")
+
+        @dev.command(name="db-usage", aliases=["db-time", "dbu"])
+        async def dev_db_usage(self, ctx: CustomContext, limit: typing.Optional[int] = 25, reset: bool = False):
+            """Shows the database time each command and listener used, per hour since the last reset"""
+            hours = max((time.monotonic() - db_usage.since) / 3600, 1 / 60)
+            table = [
+                (
+                    consumer.name[:45],
+                    consumer.calls,
+                    consumer.queries,
+                    consumer.rows,
+                    f"{consumer.query_time:.2f}",
+                    f"{consumer.wait_time:.2f}",
+                    f"{consumer.max_wait * 1000:.1f}",
+                    f"{consumer.total_time / hours:.2f}",
+                )
+                for consumer in db_usage.report()[:limit]
+            ]
+            headers = ["Consumer", "Calls", "Queries", "Rows", "Query (s)", "Wait (s)", "Max wait (ms)", "DB s/hour"]
+            await self.send_table(ctx, table, headers, f"Database time over the last {hours:.1f} hours")
+            if reset:
+                db_usage.reset()
+
+        @dev.command(name="rollup-backfill", aliases=["backfill-stats"])
+        async def dev_rollup_backfill(self, ctx: CustomContext):
+            """Rebuilds the hourly command stats rollups from the raw rows still in the commands table"""
+            async with ctx.typing():
+                start = time.perf_counter()
+                buckets = await self.bot.command_rollups.backfill()
+                elapsed = time.perf_counter() - start
+            rolled_up_to = self.bot.command_rollups.rolled_up_to.replace(tzinfo=datetime.timezone.utc)
+            await ctx.send(
+                f"Rolled up the command history into {buckets} hourly buckets in {elapsed:.2f}s, "
+                f"up to {discord.utils.format_dt(rolled_up_to)}"
+            )
+
+        @dev.group(name="partitions", aliases=["cmd-partitions"], invoke_without_command=True)
+        async def dev_partitions(self, ctx: CustomContext):
+            """Shows the command history partitions and their sizes"""
+            partitions = self.bot.command_partitions
+            table = [
+                (name, bound.replace("FOR VALUES ", ""), max(rows, 0), f"{size / 1024 / 1024:.1f}")
+                for name, bound, rows, size in await partitions.info()
+            ]
+            retention = f"{partitions.retention_months} months" if partitions.retention_months else "forever"
+            title = f"Command history partitions, kept for {retention}"
+            if not table:
+                hint = f"`{ctx.clean_prefix}dev partitions migrate`"
+                return await ctx.send(f"The commands table isn't partitioned yet, see {hint}")
+            await self.send_table(ctx, table, ["Partition", "Range", "~Rows", "MiB"], title)
+
+        @dev_partitions.command(name="migrate")
+        async def dev_partitions_migrate(self, ctx: CustomContext):
+            """Converts the commands table into monthly partitions, keeping the current table as the first one"""
+            if not await ctx.confirm("This locks the commands table while indexes are built on it. Continue?"):
+                return
+            async with ctx.typing():
+                migrated = await self.bot.command_partitions.migrate()
+            await ctx.send("Partitioned the commands table." if migrated else "The commands table is already partitioned.")
+
+        @dev_partitions.command(name="maintain")
+        async def dev_partitions_maintain(self, ctx: CustomContext):
+            """Creates upcoming partitions and expires old ones right away"""
+            await self.bot.command_partitions.maintain()
+            await ctx.message.add_reaction("✅")
+
+        @dev.command(name="log-delivery", aliases=["webhooks"])
+        async def dev_log_delivery(self, ctx: CustomContext):
+            """Shows the log delivery workers' throughput, and the guilds and log types waiting on them"""
+            delivery = self.bot.log_delivery
+            pending = sorted(
+                (
+                    (guild_id, sum(map(len, caches.values())), sum(q.dropped for q in caches.values()))
+                    for guild_id, caches in self.bot.log_cache.items()
+                ),
+                key=lambda p: p[1:],
+                reverse=True,
+            )
+            table = [
+                (self.bot.get_guild(guild_id) or guild_id, queued, dropped)
+                for guild_id, queued, dropped in pending[:25]
+                if queued or dropped
+            ]
+            table += [(f"[{t}]", queued, dropped) for t, (queued, dropped) in sorted(delivery.queue_stats().items())]
+            title = (
+                f"{delivery.workers} workers, {delivery.sent} embeds sent, {delivery.failed} failed, "
+                f"{delivery.deferred} deferred by rate limits, {delivery.cached_webhooks} cached webhooks, "
+                f"{delivery.coalesced} merged into {delivery.held} held"
+            )
+            await self.send_table(ctx, table, ["Guild / [type]", "Queued", "Dropped"], title)
+
+        async def send_benchmark(self, ctx: CustomContext, results: typing.List[benchmarks.Result], title: str):
+            """Sends benchmark results, with the speedup over the old code path where there is one"""
+            table = [
+                (
+                    case,
+                    "-" if before is None else f"{before * 1_000_000:.2f}",
+                    f"{after * 1_000_000:.2f}",
+                    "-" if before is None else f"{before / after:.1f}x",
+                    f"{1 / after:,.0f}",
+                )
+                for case, before, after in results
+            ]
+            await self.send_table(ctx, table, ["Case", "Before (µs)", "After (µs)", "Speedup", "Calls/s"], title)
+
+        @dev.group(name="bench", aliases=["benchmark"], invoke_without_command=True)
+        async def dev_bench(self, ctx: CustomContext):
+            """Micro-benchmarks for the per-message and per-command hot paths"""
+            await ctx.send_help(ctx.command)
+
+        @dev_bench.command(name="prefix", aliases=["prefixes"])
+        async def dev_bench_prefix(self, ctx: CustomContext, number: int = 10_000):
+            """Times prefix matching per message in this server, before and after the precompiled prefix matcher"""
+            async with ctx.typing():
+                results = await benchmarks.bench_prefixes(self.bot, ctx.message, number)
+            await self.send_benchmark(ctx, results, f"Prefix matching, {number:,} messages per case")
+
+        @dev_bench.command(name="ttl-cache", aliases=["timed-cache"])
+        async def dev_bench_ttl_cache(self, ctx: CustomContext, *sizes: int):
+            """Times the timed cache at each size, e.g. `dev bench ttl-cache 10000 1000000`"""
+            async with ctx.typing():
+                for size in sizes or (10_000,):
+                    results = await self.bot.loop.run_in_executor(None, benchmarks.bench_ttl_cache, size)
+                    await self.send_benchmark(ctx, results, f"Timed cache with {size:,} entries")
+
+        @dev_bench.command(name="cache-keys", aliases=["keys"])
+        async def dev_bench_cache_keys(self, ctx: CustomContext, number: int = 100_000):
+            """Times the cache decorator's key building and per-guild invalidation, before and after tuple keys"""
+            async with ctx.typing():
+                results = await benchmarks.bench_cache_keys(number)
+            await self.send_benchmark(ctx, results, f"Cache keys, {number:,} keys built")
+
+        @dev.command(name="members", aliases=["residency"])
+        async def dev_members(self, ctx: CustomContext, limit: int = 25):
+            """Shows the guilds with the most cached members, and when they were last needed"""
+            residency = self.bot.member_residency
+            guilds = sorted(self.bot.guilds, key=residency.resident, reverse=True)[:limit]
+            table = []
+            for guild in guilds:
+                idle = residency.idle_for(guild)
+                table.append(
+                    (
+                        guild.name[:30],
+                        residency.resident(guild),
+                        guild.member_count,
+                        guild.chunked,
+                        "never" if idle is None else f"{idle / 60:.1f}",
+                    )
+                )
+            title = (
+                f"{residency.total_resident} resident members (limit: {residency.max_members}), "
+                f"{residency.chunks} chunks, {residency.evicted_members} evicted"
+            )
+            await self.send_table(ctx, table, ["Guild", "Resident", "Members", "Chunked", "Idle (min)"], title)
+
         @dev.command(aliases=["pull"], name="update")
         async def dev_git_pull(self, ctx: CustomContext, reload_everything: RebootArg = True):
             """
@@ -881,13 +1140,7 @@ class Management(commands.Cog, name="Bot Management"):
             while True:
                 done, pending = await asyncio.wait(
                     [
-                        bot.loop.create_task(
-                            bot.wait_for(
-                                "message",
-                                check=lambda m: m.author == ctx.author and m.channel == ctx.channel,
-                                timeout=None,
-                            )
-                        ),
+                        bot.loop.create_task(bot.wait_for_message(ctx.channel, author=ctx.author)),
                         bot.loop.create_task(
                             bot.wait_for(
                                 "message_edit",
@@ -7,6 +7,7 @@ from ._base import ModerationBase
 from discord.ext import commands
 from discord.ext.tasks import loop
 
+from helpers import queries
 from helpers.context import CustomContext
 from helpers.time_inputs import ShortTime, human_timedelta
 import discord
@@ -18,7 +19,7 @@ def ensure_muterole(*, required: bool = True):
             raise commands.BadArgument('Only servers can have mute roles')
         if not required:
             return True
-        if not (role := await ctx.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)):
+        if not (role := await queries.GUILD_MUTED_ROLE.fetchval(ctx.bot.db, ctx.guild.id)):
             raise commands.BadArgument('This server has no mute role set')
         if not (role := ctx.guild.get_role(role)):
             raise commands.BadArgument("It seems like I could not find this server's mute role. Was it deleted?")
@@ -32,7 +33,7 @@ def ensure_muterole(*, required: bool = True):
 async def muterole(ctx) -> discord.Role:
     if not ctx.guild:
         raise commands.BadArgument('Only servers can have mute roles')
-    if not (role := await ctx.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', ctx.guild.id)):
+    if not (role := await queries.GUILD_MUTED_ROLE.fetchval(ctx.bot.db, ctx.guild.id)):
         raise commands.BadArgument('This server has no mute role set')
     if not (role := ctx.guild.get_role(role)):
         raise commands.BadArgument("It seems like I could not find this server's mute role. Was it deleted?")
@@ -61,7 +62,7 @@ class MuteCommands(ModerationBase):
         guild: discord.Guild = self.bot.get_guild(next_task['guild_id'])
 
         if guild:
-            mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', next_task['guild_id'])
+            mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, next_task['guild_id'])
             if mute_role:
                 role = guild.get_role(int(mute_role))
                 if isinstance(role, discord.Role):
@@ -75,8 +76,8 @@ class MuteCommands(ModerationBase):
                         except discord.HTTPException:
                             pass
 
-        await self.bot.db.execute(
-            'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)',
+        await queries.DELETE_TEMPORARY_MUTE.execute(
+            self.bot.db,
             next_task['guild_id'],
             next_task['member_id'],
         )
@@ -113,9 +114,7 @@ class MuteCommands(ModerationBase):
         except discord.Forbidden:
             raise commands.BadArgument(f"I don't seem to have permissions to add the `{role.name}` role")
 
-        await self.bot.db.execute(
-            'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)', ctx.guild.id, member.id
-        )
+        await queries.DELETE_TEMPORARY_MUTE.execute(self.bot.db, ctx.guild.id, member.id)
 
         self.mute_task()
 
@@ -171,9 +170,7 @@ class MuteCommands(ModerationBase):
                 failed_internal.append(member)
                 continue
 
-            await self.bot.db.execute(
-                'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)', ctx.guild.id, member.id
-            )
+            await queries.DELETE_TEMPORARY_MUTE.execute(self.bot.db, ctx.guild.id, member.id)
 
         failed = ""
 
@@ -213,9 +210,7 @@ class MuteCommands(ModerationBase):
         except discord.Forbidden:
             return await ctx.send(f"I don't seem to have permissions to add the `{role.name}` role")
 
-        await self.bot.db.execute(
-            'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)', ctx.guild.id, member.id
-        )
+        await queries.DELETE_TEMPORARY_MUTE.execute(self.bot.db, ctx.guild.id, member.id)
 
         self.mute_task()
 
@@ -254,9 +249,7 @@ class MuteCommands(ModerationBase):
         except discord.Forbidden:
             return await ctx.send(f"I don't seem to have permissions to remove the `{role.name}` role")
 
-        await self.bot.db.execute(
-            'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)', ctx.guild.id, member.id
-        )
+        await queries.DELETE_TEMPORARY_MUTE.execute(self.bot.db, ctx.guild.id, member.id)
 
         self.mute_task()
 
@@ -302,9 +295,7 @@ class MuteCommands(ModerationBase):
                 failed_internal.append(member)
                 continue
 
-            await self.bot.db.execute(
-                'DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)', ctx.guild.id, member.id
-            )
+            await queries.DELETE_TEMPORARY_MUTE.execute(self.bot.db, ctx.guild.id, member.id)
 
         await ctx.send(
             f"**Successfully unmuted {len(successful)}/{len(members)}**:"
@@ -414,7 +405,7 @@ class MuteCommands(ModerationBase):
         """
         if not channel.permissions_for(channel.guild.me).manage_channels:
             return
-        mute_role = await self.bot.db.fetchval('SELECT muted_id FROM guilds WHERE guild_id = $1', channel.guild.id)
+        mute_role = await queries.GUILD_MUTED_ROLE.fetchval(self.bot.db, channel.guild.id)
         if not mute_role:
             return
         role = channel.guild.get_role(int(mute_role))
@@ -6,6 +6,8 @@ from discord.ext import commands
 
 from ._base import ModerationBase
 from bot import CustomContext
+from helpers.intents import command_intents
+from helpers.members import needs_members
 
 
 class RoleManagementCommands(ModerationBase):
@@ -41,9 +43,11 @@ class RoleManagementCommands(ModerationBase):
             reply=False,
         )
 
+    @needs_members()
     @commands.has_permissions(manage_roles=True)
     @commands.bot_has_permissions(manage_roles=True)
     @role_group.command(name='all')
+    @command_intents(members='chunking the guild to add the role to everyone')
     async def role_all(self, ctx: CustomContext, *, role: discord.Role):
         """Adds a role to all users."""
         if role >= ctx.author.top_role and not ctx.guild.owner == ctx.author:
@@ -68,9 +72,11 @@ class RoleManagementCommands(ModerationBase):
             f'✅ **|** Added role **{role}** to all users!', allowed_mentions=discord.AllowedMentions.none(), reply=False
         )
 
+    @needs_members()
     @commands.has_permissions(manage_roles=True)
     @commands.bot_has_permissions(manage_roles=True)
     @role_remove.command(name='all')
+    @command_intents(members='chunking the guild to remove the role from everyone')
     async def role_remove_all(self, ctx: CustomContext, *, role: discord.Role):
         """Removes a role from all users."""
         if role >= ctx.author.top_role and not ctx.guild.owner == ctx.author:
@@ -92,6 +92,7 @@ class Snipe(ModerationBase):
             'INSERT INTO guilds (guild_id, snipe_enabled) VALUES ($1, TRUE) ON CONFLICT (guild_id) DO UPDATE SET snipe_enabled = TRUE',
             ctx.guild.id,
         )
+        self.bot.guild_config.update(ctx.guild.id, snipe_enabled=True)
         await ctx.send('✅ **snipe** has been enabled!')
 
     @require_snipe()
@@ -99,6 +100,7 @@ class Snipe(ModerationBase):
     @snipe.command(name='disable')
     async def snipe_disable(self, ctx):
         await self.bot.db.execute("UPDATE guilds SET snipe_enabled = FALSE WHERE guild_id = $1", ctx.guild.id)
+        self.bot.guild_config.update(ctx.guild.id, snipe_enabled=False)
         await ctx.send('❌ **snipe** has been disabled!')
         await self.snipe_guild_remove(ctx.guild)
 
@@ -106,7 +108,7 @@ class Snipe(ModerationBase):
     async def snipe_hook(self, message: discord.Message):
         if not message.guild:
             return
-        if await self.bot.db.fetchval('SELECT snipe_enabled FROM guilds WHERE guild_id = $1', message.guild.id):
+        if (await self.bot.guild_config.get(message.guild.id)).snipe_enabled:
             self.bot.snipes[message.guild.id][message.channel.id].append(SimpleMessage(message))
 
     @commands.Cog.listener('on_guild_channel_delete')
@@ -5,6 +5,7 @@ from discord.ext.commands.errors import UserNotFound
 
 from bot import DuckBot
 from helpers import constants
+from helpers.message_router import message_route
 
 
 async def setup(bot):
@@ -39,9 +40,9 @@ class ModMail(commands.Cog):
         self.bot.dm_webhooks[channel.id] = wh.url
         return wh
 
-    @commands.Cog.listener("on_message")
+    @message_route(dm_only=True)
     async def on_mail(self, message: discord.Message):
-        if message.guild or message.author == self.bot.user or self.bot.dev_mode is True:
+        if message.author == self.bot.user or self.bot.dev_mode is True:
             return
 
         if self.bot.blacklist.get(message.author.id, None):
@@ -88,10 +89,8 @@ class ModMail(commands.Cog):
         except (discord.Forbidden, discord.HTTPException):
             return await message.add_reaction("⚠")
 
-    @commands.Cog.listener("on_message")
+    @message_route(guilds={774561547930304536}, ignore_bots=True)
     async def on_mail_reply(self, message: discord.Message):
-        if not message.guild:
-            return
         if (
             message.author.bot
             or self.bot.dev_mode is True
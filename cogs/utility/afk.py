@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 
 from bot import CustomContext
-from helpers import constants
+from helpers import constants, queries
 from ._base import UtilityBase
 
 
@@ -28,7 +28,7 @@ class Afk(UtilityBase):
         else:
             self.bot.afk_users.pop(ctx.author.id)
 
-            info = await self.bot.db.fetchrow('SELECT * FROM afk WHERE user_id = $1', ctx.author.id)
+            info = await queries.AFK_BY_USER.fetchrow(self.bot.db, ctx.author.id)
             await self.bot.db.execute(
                 'INSERT INTO afk (user_id, start_time, reason) VALUES ($1, null, null) '
                 'ON CONFLICT (user_id) DO UPDATE SET start_time = null, reason = null',
@@ -13,6 +13,8 @@ from ._base import UtilityBase
 
 
 class EmojiUtils(UtilityBase):
+    __intents__ = {'emojis_and_stickers': 'up to date guild emoji lists'}
+
     @commands.group(invoke_without_command=True, aliases=['em'])
     @commands.bot_has_permissions(send_messages=True, embed_links=True)
     async def emoji(
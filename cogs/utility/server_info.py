@@ -12,6 +12,8 @@ from jishaku.paginators import WrappedPaginator
 from bot import DuckBot, CustomContext
 from helpers import constants, paginator
 from helpers import helper
+from helpers.intents import command_intents
+from helpers.members import needs_members
 from ._base import UtilityBase
 
 
@@ -477,6 +479,8 @@ class ServerInfoView(discord.ui.View):
 
 
 class ServerInfo(UtilityBase):
+    __intents__ = {'presences': 'status counts in server-info', 'members': 'member counts in server-info'}
+
     @commands.command(aliases=['si', 'serverinfo'], name='server-info', usage=None)
     @commands.guild_only()
     async def server_info(self, ctx: CustomContext, guild: typing.Optional[discord.Guild]):
@@ -485,10 +489,13 @@ class ServerInfo(UtilityBase):
         """
         await ctx.typing()
         guild = guild if guild and (await self.bot.is_owner(ctx.author)) else ctx.guild
+        await self.bot.member_residency.ensure(guild)
         view = ServerInfoView(ctx, guild=guild)
         await view.start()
 
     @commands.command()
+    @needs_members()
+    @command_intents(members='chunking the guild to list nicknamed members')
     async def hoisters(self, ctx: CustomContext):
         """Shows a sorted list of members that have a nicknname"""
         members = sorted([m for m in ctx.guild.members if m.nick], key=lambda mem: mem.display_name)
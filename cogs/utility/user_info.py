@@ -12,6 +12,8 @@ from discord.ext import commands
 from bot import CustomContext
 from helpers import constants
 from helpers import helper
+from helpers.intents import command_intents
+from helpers.members import needs_members
 from ._base import UtilityBase
 
 
@@ -60,9 +62,13 @@ class UserInfoView(discord.ui.View):
 
 
 class UserInfo(UtilityBase):
+    __intents__ = {'presences': 'status and activities in user-info'}
+
     @commands.command(aliases=['uinfo', 'ui', 'whois', 'userinfo'], name='user-info')
     @commands.bot_has_permissions(send_messages=True, embed_links=True)
     @commands.guild_only()
+    @needs_members()
+    @command_intents(members='chunking the guild to resolve members in user-info')
     async def userinfo(self, ctx: CustomContext, *, member: typing.Optional[discord.Member]):
         """
         Shows a user's information. If not specified, shows your own.
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("batch_writer")
+
+Row = Tuple[object, ...]
+
+# Worth retrying the same rows later: the connection or server had a problem, not the data.
+TRANSIENT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.OperatorInterventionError,
+    asyncpg.InsufficientResourcesError,
+    asyncpg.TransactionRollbackError,
+)
+# Caused by some of the rows, the batch is bisected to drop only those.
+ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+class BatchWriter:
+    """Buffers rows in memory and writes them with ``COPY`` in batches.
+
+    A flush happens every ``interval`` seconds, or as soon as
+    ``batch_size`` rows are waiting. At most ``max_rows`` rows are held:
+    past that, new rows are dropped and counted, so a database outage
+    can't grow the buffer without bound. Rows from a flush that failed
+    for a transient reason are put back and retried with the next one.
+    A batch the database rejects is bisected so only the offending rows
+    are dropped, and any other error drops the batch, so a poison batch
+    can't block everything queued behind it.
+    """
+
+    def __init__(
+        self,
+        bot: BaseDuck,
+        table: str,
+        columns: Sequence[str],
+        *,
+        batch_size: int = 500,
+        interval: float = 10.0,
+        max_rows: int = 10_000,
+    ):
+        self.bot: BaseDuck = bot
+        self.table: str = table
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.batch_size: int = batch_size
+        self.interval: float = interval
+        self.max_rows: int = max_rows
+        self._rows: List[Row] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._early_flush: Optional[asyncio.Task[int]] = None
+        # While the database is failing, only the periodic flush retries.
+        self._failing: bool = False
+
+        self.written: int = 0
+        self.dropped: int = 0
+        self.flushes: int = 0
+        self.failures: int = 0
+        self.rejected: int = 0
+
+    @classmethod
+    def from_env(cls, bot: BaseDuck, table: str, columns: Sequence[str], *, prefix: str) -> BatchWriter:
+        return cls(
+            bot,
+            table,
+            columns,
+            batch_size=int(os.getenv(f"{prefix}_BATCH_SIZE") or 500),
+            interval=float(os.getenv(f"{prefix}_FLUSH_SECONDS") or 10),
+            max_rows=int(os.getenv(f"{prefix}_MAX_ROWS") or 10_000),
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def add(self, *row: object) -> bool:
+        """Queues a row. Returns False if the buffer was full and the row was dropped."""
+        if len(self._rows) >= self.max_rows:
+            self.dropped += 1
+            return False
+        self._rows.append(row)
+        if self._failing or len(self._rows) < self.batch_size:
+            return True
+        if self._early_flush is None or self._early_flush.done():
+            self._early_flush = asyncio.create_task(self.flush(), name=f"batch-writer:{self.table}:flush")
+        return True
+
+    async def flush(self) -> int:
+        """Writes everything buffered so far. Returns how many rows were written."""
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                async with self.bot.db.acquire() as conn:
+                    written = await self._copy(conn, rows)
+            except TRANSIENT_ERRORS as e:
+                self.failures += 1
+                self._failing = True
+                # Keep the oldest rows, whatever arrived in the meantime goes after them.
+                keep = rows + self._rows
+                self.dropped += max(len(keep) - self.max_rows, 0)
+                self._rows = keep[: self.max_rows]
+                log.warning("Failed to write %s buffered rows to %s", len(rows), self.table, exc_info=e)
+                return 0
+            self._failing = False
+            self.flushes += 1
+            self.written += written
+            return written
+
+    async def _copy(self, conn: asyncpg.Connection, rows: List[Row]) -> int:
+        """Writes the rows, leaving out the ones the database rejects. Returns how many were written."""
+        try:
+            await conn.copy_records_to_table(self.table, records=rows, columns=self.columns)
+            return len(rows)
+        except TRANSIENT_ERRORS:
+            raise
+        except ROW_ERRORS as e:
+            if len(rows) > 1:
+                middle = len(rows) // 2
+                return await self._copy(conn, rows[:middle]) + await self._copy(conn, rows[middle:])
+            self.rejected += 1
+            log.warning("Dropped a row %r that %s rejected", rows[0], self.table, exc_info=e)
+            return 0
+        except asyncpg.PostgresError as e:
+            self.rejected += len(rows)
+            log.error("Dropped %s rows that could not be written to %s", len(rows), self.table, exc_info=e)
+            return 0
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error("Unexpected error while flushing %s", self.table, exc_info=e)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"batch-writer:{self.table}")
+
+    async def close(self) -> None:
+        """Stops the periodic flush and writes whatever is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
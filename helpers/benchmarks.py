@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+from lru import LRU
+
+from helpers.cache import ExpiringCache, _true_repr, cache
+from helpers.cache_registry import registry
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+# (case, seconds per call before, seconds per call after), "before" is None when there is nothing to compare to.
+Result = Tuple[str, Optional[float], float]
+
+
+def time_sync(func: Callable[[], Any], number: int) -> float:
+    """Seconds per call of ``func``, over ``number`` calls."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+async def time_async(func: Callable[[], Awaitable[Any]], number: int) -> float:
+    """Seconds per call of the coroutine function ``func``, over ``number`` calls."""
+    start = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return (time.perf_counter() - start) / number
+
+
+def _with_content(message: discord.Message, content: str) -> discord.Message:
+    sample = copy.copy(message)
+    sample.content = content
+    return sample
+
+
+async def _legacy_prefix(bot: BaseDuck, message: discord.Message) -> Optional[str]:
+    # What every message went through before the PrefixMatcher: get_pre built the when_mentioned_or
+    # list and awaited is_owner, then discord.py's get_context searched that list.
+    prefixes = await bot._resolve_prefixes(message)
+    if await bot.is_owner(message.author) and bot._should_noprefix(message):
+        prefixes = [*prefixes, ""]
+    candidates = commands.when_mentioned_or(*prefixes)(bot, message)
+    if not message.content.startswith(tuple(candidates)):
+        return None
+    return discord.utils.find(message.content.startswith, candidates)
+
+
+async def _matched_prefix(bot: BaseDuck, message: discord.Message) -> Optional[str]:
+    prefix = await bot.match_prefix(bot, message)
+    if isinstance(prefix, str):
+        return prefix
+    return discord.utils.find(message.content.startswith, prefix) if message.content.startswith(tuple(prefix)) else None
+
+
+async def bench_prefixes(bot: BaseDuck, message: discord.Message, number: int = 10_000) -> List[Result]:
+    """Times prefix resolution per message, as discord.py's get_context does it, before and after the PrefixMatcher.
+
+    ``message`` is only used as a template, its content is replaced with
+    a plain message, a prefixed command and a mention.
+    """
+    prefixes = await bot._resolve_prefixes(message)
+    prefix = next((p for p in prefixes if p), bot.PRE[0])
+    cases = {
+        "No prefix": "just chatting about something",
+        "Prefix": f"{prefix}ping",
+        "Mention": f"<@{bot.user.id}> ping",
+    }
+    results = []
+    for case, content in cases.items():
+        sample = _with_content(message, content)
+        before = await time_async(lambda: _legacy_prefix(bot, sample), number)
+        after = await time_async(lambda: _matched_prefix(bot, sample), number)
+        results.append((case, before, after))
+    return results
+
+
+def bench_ttl_cache(size: int, lookups: int = 100_000) -> List[Result]:
+    """Times the timed cache's operations with ``size`` entries in it.
+
+    Blocking, run it in an executor. A million entries take a few hundred MB while it runs.
+    """
+    lookups = min(lookups, size)
+    cache = ExpiringCache(3600, maxsize=size)
+    keys = iter(range(size))
+    results = [("set (filling)", None, time_sync(lambda: cache.set(next(keys), None), size))]
+
+    hits = iter(range(0, size, max(size // lookups, 1)))
+    results.append(("get (hit)", None, time_sync(lambda: cache[next(hits)], lookups)))
+    misses = iter(range(-1, -lookups - 1, -1))
+    results.append(("contains (miss)", None, time_sync(lambda: next(misses) in cache, lookups)))
+    # Every key past maxsize evicts the least recently used one.
+    keys = iter(range(size, size + lookups))
+    results.append(("set (evicting)", None, time_sync(lambda: cache.set(next(keys), None), lookups)))
+
+    # With no TTL, each set expires the entry set right before it, so both costs are measured together.
+    cache = ExpiringCache(3600, maxsize=size)
+    keys = iter(range(size))
+    results.append(("set (expiring)", None, time_sync(lambda: cache.set(next(keys), None, ttl=0), size)))
+    return results
+
+
+def _legacy_key(func: Callable[..., Any], args: Tuple[Any, ...]) -> str:
+    # How the cache decorator built its keys before they became tuples.
+    key = [f'{func.__module__}.{func.__name__}']
+    key.extend(_true_repr(o) for o in args)
+    return ':'.join(key)
+
+
+class _SampleCog:
+    # Stands in for the cog instance every cached method receives, it has object's repr like the real ones.
+    pass
+
+
+async def bench_cache_keys(number: int = 100_000, guilds: int = 64, members: int = 16, rounds: int = 10) -> List[Result]:
+    """Times building a cache key, and invalidating one guild's entries, before and after tuple keys.
+
+    The caches hold ``members`` entries for each of ``guilds`` guilds,
+    1024 by default like ``CommandConfigs``' caches, and are refilled
+    ``rounds`` times to invalidate every guild again.
+    """
+
+    @cache(maxsize=guilds * members)
+    async def lookup(self: _SampleCog, guild_id: int, member_id: int) -> None:
+        return None
+
+    cog = _SampleCog()
+    guild_ids = [336642139381301249 + i for i in range(guilds)]
+    entries = [(cog, g, 349373972103561218 + m) for g in guild_ids for m in range(members)]
+    results: List[Result] = [
+        (
+            "Build key",
+            time_sync(lambda: _legacy_key(lookup, entries[0]), number),
+            time_sync(lambda: lookup.get_key(*entries[0]), number),
+        )
+    ]
+
+    legacy = LRU(guilds * members)
+    legacy_time = 0.0
+    indexed_time = 0.0
+    try:
+        for _ in range(rounds):
+            for args in entries:
+                legacy[_legacy_key(lookup, args)] = None
+                lookup(*args)
+            await asyncio.sleep(0)
+            for guild_id in guild_ids:
+                # The old substring scan over every key, as invalidate_containing(f'{guild_id!r}:') did it.
+                start = time.perf_counter()
+                for k in [k for k in legacy.keys() if f'{guild_id!r}:' in k]:
+                    del legacy[k]
+                legacy_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                lookup.invalidate_containing(guild_id)
+                indexed_time += time.perf_counter() - start
+    finally:
+        lookup.clear()
+        registry.unregister(f'{lookup.__module__}.{lookup.__qualname__}')
+
+    results.append(("Invalidate a guild", legacy_time / (rounds * guilds), indexed_time / (rounds * guilds)))
+    return results
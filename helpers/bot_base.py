@@ -1,14 +1,15 @@
+import asyncio
 import contextlib
 import datetime
 import io
 import logging
 import os
-import re
 import sys
+import time
 import traceback
 import typing
 from collections import defaultdict, deque
-from typing import Dict, Iterable, List, Optional, Any, TYPE_CHECKING, Type
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Any, Set, TYPE_CHECKING, Type, Union
 
 import aiohttp
 import aiohttp.web
@@ -19,12 +20,39 @@ import topgg
 from asyncdagpi.client import Client as DagpiClient
 from discord.ext import commands
 from dotenv import load_dotenv
+from lru import LRU
 from discord.ext import commands
 
 from cogs.economy.helper_classes import Wallet
 from helpers import constants
+from helpers.batch_writer import BatchWriter
+from helpers.cache_registry import registry as cache_registry
+from helpers.command_rollups import CommandRollups
 from helpers.context import CustomContext
+from helpers.db_usage import AttributedPool, usage as db_usage
+from helpers.guild_store import GuildConfigStore, GuildConfigView, event_guild_id
 from helpers.helper import LoggingEventsFlags
+from helpers.intents import (
+    IntentRequirements,
+    build_intents,
+    cog_intents,
+    collect_requirements,
+    disabled_intents,
+    extension_cogs,
+    format_report,
+)
+from helpers.invalidation import InvalidationBus
+from helpers.log_delivery import LogDelivery, LogQueue
+from helpers.members import SWEEP_INTERVAL, MemberResidency
+from helpers.message_router import MessageRouter
+from helpers.metrics import MetricsServer
+from helpers.ordered_executor import KeyedExecutor
+from helpers.partitions import CommandPartitions
+from helpers.prechecks import PrecheckPipeline
+from helpers.prefixes import PrefixMatcher
+from helpers.queries import registry as query_registry
+from helpers.snapshot import SNAPSHOT_INTERVAL, CacheSnapshot
+from helpers.waiters import MessageWaiters
 
 if TYPE_CHECKING:
     from cogs.moderation.snipe import SimpleMessage
@@ -97,20 +125,20 @@ class BaseDuck(commands.AutoShardedBot):
     user: discord.ClientUser
 
     def __init__(self, pool: asyncpg.Pool, session: aiohttp.ClientSession) -> None:
-        intents = discord.Intents.all()
-        # noinspection PyDunderSlots,PyUnresolvedReferences
-        intents.typing = False
+        # Only what the cogs of the extensions loaded in setup_hook need, they are sent when identifying.
+        intent_requirements = collect_requirements(extension_cogs(initial_extensions + extensions))
+        intents = build_intents(intent_requirements, disabled_intents())
 
         super().__init__(
             intents=intents,
-            command_prefix=self.get_pre,
+            command_prefix=self.match_prefix,
             case_insensitive=True,
             activity=discord.Streaming(name="db.help", url="https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
             strip_after_prefix=True,
             chunk_guilds_at_startup=False,
         )
 
-        self.db = pool
+        self.db = AttributedPool(pool)
         self.session = session
 
         self.log_webhooks: Type[LoggingConfig] = LoggingConfig
@@ -146,35 +174,169 @@ class BaseDuck(commands.AutoShardedBot):
         self.constants = constants
 
         # Cache stuff
-        self.prefixes: Dict[int, Iterable[str]] = {}
+        self.guild_config = GuildConfigStore(self, maxsize=int(os.getenv("GUILD_CONFIG_CACHE_SIZE") or 0) or None)
+        self.prefixes: GuildConfigView = GuildConfigView(self.guild_config, "prefixes")
+        self._prefix_matchers: typing.MutableMapping[Optional[int], PrefixMatcher] = (
+            LRU(self.guild_config.maxsize) if self.guild_config.lazy else {}
+        )
         self.blacklist = {}
+        self.plonks: Dict[int, Set[int]] = {}
         self.afk_users = {}
         self.auto_un_afk = {}
-        self.welcome_channels = {}
+        self.welcome_channels: GuildConfigView = GuildConfigView(self.guild_config, "welcome_channel", keep_none=True)
         self.suggestion_channels = {}
         self.dm_webhooks = defaultdict(str)
         self.wallets: typing.Dict[str, Wallet] = {}
-        self.counting_channels = {}
+        self.counting_channels: GuildConfigView = GuildConfigView(self.guild_config, "counting")
         self.counting_rewards = {}
         self.saved_messages = {}
         self.common_discrims = []
-        self.log_channels: typing.Dict[int, LoggingConfig] = {}
-        self.log_cache = defaultdict(lambda: defaultdict(list))
-        self.guild_loggings: typing.Dict[int, LoggingEventsFlags] = {}
+        self.log_channels: GuildConfigView = GuildConfigView(self.guild_config, "log_channels")
+        self.log_cache: typing.DefaultDict[int, typing.DefaultDict[str, LogQueue]] = defaultdict(
+            lambda: defaultdict(LogQueue)
+        )
+        self.log_delivery = LogDelivery(self)
+        self.guild_loggings: GuildConfigView = GuildConfigView(self.guild_config, "loggings")
         self.snipes: typing.Dict[int, typing.Dict[int, typing.Deque[SimpleMessage]]] = defaultdict(
             lambda: defaultdict(lambda: deque(maxlen=50))
         )
 
         self.global_mapping = commands.CooldownMapping.from_cooldown(10, 12, commands.BucketType.user)
-
+        self.router = MessageRouter(self)
+        self.executors: Dict[str, KeyedExecutor] = {}
+        self.message_waiters = MessageWaiters()
+        self.prechecks = PrecheckPipeline()
+        self.add_check(self.prechecks.check)
+        self.add_check(self.prechecks.check_once, call_once=True)
+        self._mention_forms: typing.Tuple[str, ...] = ()
+        self.intent_requirements: IntentRequirements = intent_requirements
+
+        self.member_residency = MemberResidency.from_env(self)
         self.invites: Dict[int, Dict[str, discord.Invite]] = {}
+        self.snapshot = CacheSnapshot()
+        # Command usage analytics, written in batches instead of one INSERT per command.
+        self.command_usage = BatchWriter.from_env(
+            self, "commands", ("guild_id", "user_id", "command", "timestamp"), prefix="COMMAND_USAGE"
+        )
+        self.command_rollups = CommandRollups(self)
+        self.command_partitions = CommandPartitions(self)
+        self.metrics = MetricsServer()
+        self.invalidation = InvalidationBus(self)
+        self._setup_invalidation()
+        self.metrics.add_collector(cache_registry.collect_metrics)
+        self.metrics.add_collector(query_registry.collect_metrics)
+        self.metrics.add_collector(db_usage.collect_metrics)
+        self.metrics.add_collector(self.log_delivery.collect_metrics)
+        self._register_caches()
         if TYPE_CHECKING:
             self.expiring_invites = {}
             self.shortest_invite: int = 0
             self.last_update: int = 0
 
+    def _register_caches(self) -> None:
+        # Looked up by name on every report, since the loaders replace most of these wholesale.
+        for name in (
+            "blacklist",
+            "plonks",
+            "afk_users",
+            "auto_un_afk",
+            "suggestion_channels",
+            "dm_webhooks",
+            "wallets",
+            "counting_rewards",
+            "saved_messages",
+            "log_cache",
+            "snipes",
+            "invites",
+            "expiring_invites",
+            "_prefix_matchers",
+        ):
+            cache_registry.register(name.lstrip("_"), lambda name=name: getattr(self, name, {}))
+        # prefixes, welcome_channels, counting_channels, log_channels and guild_loggings are views over this one.
+        cache_registry.register("guild_config", lambda: self.guild_config._configs)
+        cache_registry.register("command_usage", lambda: self.command_usage._rows)
+
+    def _setup_invalidation(self) -> None:
+        bus = self.invalidation
+        for table in ("pre", "guilds", "count_settings", "log_channels", "logging_events"):
+            bus.on(table, self._refresh_guild_config)
+        bus.on("counting", self._refresh_counting_rewards)
+        bus.on("plonks", self._refresh_plonks)
+        bus.on("blacklist", self._refresh_blacklist)
+        bus.on("suggestions", self._refresh_suggestion_channel)
+        bus.on("afk", self._refresh_afk)
+        bus.on_resync(self.populate_cache)
+        bus.on_resync(self._resync_guild_config)
+
+    async def _refresh_guild_config(self, key: str) -> None:
+        if self.guild_config.lazy:
+            self.guild_config.invalidate(int(key))
+        else:
+            await self.guild_config.fetch(int(key))
+
+    async def _resync_guild_config(self) -> None:
+        # populate_cache reloads a resident store, but skips the lazy one.
+        if self.guild_config.lazy:
+            self.guild_config.mark_stale()
+
+    async def _refresh_counting_rewards(self, key: str) -> None:
+        guild_id = int(key)
+        rewards = await self.db.fetchval("SELECT array_agg(reward_number) FROM counting WHERE guild_id = $1", guild_id)
+        if rewards:
+            self.counting_rewards[guild_id] = set(rewards)
+        else:
+            self.counting_rewards.pop(guild_id, None)
+
+    async def _refresh_plonks(self, key: str) -> None:
+        guild_id = int(key)
+        entities = await self.db.fetchval("SELECT array_agg(entity_id) FROM plonks WHERE guild_id = $1", guild_id)
+        if entities:
+            self.plonks[guild_id] = set(entities)
+        else:
+            self.plonks.pop(guild_id, None)
+
+    async def _refresh_blacklist(self, key: str) -> None:
+        user_id = int(key)
+        record = await self.db.fetchrow("SELECT is_blacklisted FROM blacklist WHERE user_id = $1", user_id)
+        if record is None:
+            self.blacklist.pop(user_id, None)
+        else:
+            self.blacklist[user_id] = record["is_blacklisted"] or False
+
+    async def _refresh_suggestion_channel(self, key: str) -> None:
+        channel_id = int(key)
+        record = await self.db.fetchrow("SELECT image_only FROM suggestions WHERE channel_id = $1", channel_id)
+        if record is None:
+            self.suggestion_channels.pop(channel_id, None)
+        else:
+            self.suggestion_channels[channel_id] = record["image_only"]
+
+    async def _refresh_afk(self, key: str) -> None:
+        user_id = int(key)
+        record = await self.db.fetchrow("SELECT start_time, auto_un_afk FROM afk WHERE user_id = $1", user_id)
+        if record is not None and record["start_time"]:
+            self.afk_users[user_id] = True
+        else:
+            self.afk_users.pop(user_id, None)
+        if record is not None and record["auto_un_afk"] is not None:
+            self.auto_un_afk[user_id] = record["auto_un_afk"]
+        else:
+            self.auto_un_afk.pop(user_id, None)
+
     async def setup_hook(self) -> None:
-        await self.populate_cache()
+        if await self.snapshot.load(self):
+            # Serve commands from the snapshot right away, and reconcile with the database in the background.
+            self.loop.create_task(self.populate_cache())
+        else:
+            await self.populate_cache()
+        self.loop.create_task(self._snapshot_loop())
+        self.loop.create_task(self._member_sweep_loop())
+        await self.metrics.start()
+        self.invalidation.start()
+        self.command_usage.start()
+        self.command_rollups.start()
+        self.command_partitions.start()
+        self.log_delivery.start()
 
         for ext in initial_extensions:
             await self.load_extension(ext, _raise=False)
@@ -182,30 +344,67 @@ class BaseDuck(commands.AutoShardedBot):
         for ext in extensions:
             await self.load_extension(ext, _raise=False)
 
-    async def get_pre(self, bot, message: discord.Message, raw_prefix: Optional[bool] = False) -> Iterable[str]:
-        if not message:
-            return commands.when_mentioned_or(*self.PRE)(bot, message) if not raw_prefix else self.PRE
-        if not message.guild:
-            return commands.when_mentioned_or(*self.PRE)(bot, message) if not raw_prefix else self.PRE
+        self.logger.info(f"{col(7)}Requesting gateway intents {col(7, fmt=4)}{self.intents.value}{col()}")
+        for line in format_report(self.intent_requirements, self.intents):
+            self.logger.info(f"{col(7)}  {line}{col()}")
+
+    async def _resolve_prefixes(self, message: Optional[discord.Message]) -> Iterable[str]:
+        if not message or not message.guild:
+            return self.PRE
         try:
-            prefix = self.prefixes[message.guild.id]
+            return self.prefixes[message.guild.id]
         except KeyError:
+            if self.guild_config.lazy:
+                return (await self.guild_config.get(message.guild.id)).prefixes
             prefix = [
-                x["prefix"] for x in await bot.db.fetch("SELECT prefix FROM pre WHERE guild_id = $1", message.guild.id)
+                x["prefix"] for x in await self.db.fetch("SELECT prefix FROM pre WHERE guild_id = $1", message.guild.id)
             ] or self.PRE
             self.prefixes[message.guild.id] = prefix
-
-        should_noprefix = False
+            return prefix
+
+    async def check_owner(self, user: discord.abc.User) -> bool:
+        """Like is_owner, but answers from the cached owner IDs without awaiting once they are known."""
+        if self.owner_id:
+            return user.id == self.owner_id
+        if self.owner_ids:
+            return user.id in self.owner_ids
+        return await self.is_owner(user)
+
+    def _should_noprefix(self, message: discord.Message) -> bool:
+        if self.noprefix is True:
+            return True
         if not message.content.startswith(("jishaku", "eval", "jsk", "ev", "rall", "dev", "rmsg")):
-            pass
-        elif not message.guild:
-            should_noprefix = True
-        elif not message.guild.get_member(788278464474120202):
-            should_noprefix = True
+            return False
+        return not message.guild or not message.guild.get_member(788278464474120202)
+
+    async def get_prefix_matcher(self, message: discord.Message) -> PrefixMatcher:
+        source = await self._resolve_prefixes(message)
+        key = message.guild.id if message.guild else None
+        matcher = self._prefix_matchers.get(key)
+        if matcher is None or matcher.source is not source:
+            mentions = (f"<@{self.user.id}> ", f"<@!{self.user.id}> ") if self.user else ()
+            matcher = PrefixMatcher(source, mentions)
+            if self.user:
+                self._prefix_matchers[key] = matcher
+        return matcher
+
+    async def match_prefix(self, bot, message: discord.Message) -> Union[str, Iterable[str]]:
+        """The command_prefix used for every message, returns the matched prefix directly when there is one."""
+        matcher = await self.get_prefix_matcher(message)
+        prefix = matcher.match(message.content)
+        if prefix is not None:
+            return prefix
+        if self._should_noprefix(message) and await self.check_owner(message.author):
+            return ""
+        return matcher.candidates
 
-        if await bot.is_owner(message.author) and (bot.noprefix is True or should_noprefix):
-            return commands.when_mentioned_or(*prefix, "")(bot, message) if not raw_prefix else prefix
-        return commands.when_mentioned_or(*prefix)(bot, message) if not raw_prefix else prefix
+    async def get_pre(self, bot, message: discord.Message, raw_prefix: Optional[bool] = False) -> Iterable[str]:
+        prefix = await self._resolve_prefixes(message)
+        if raw_prefix:
+            return prefix
+        if message and self._should_noprefix(message) and await self.check_owner(message.author):
+            return commands.when_mentioned_or(*prefix, "")(bot, message)
+        return commands.when_mentioned_or(*prefix)(bot, message)
 
     async def fetch_prefixes(self, message):
         prefixes = [x["prefix"] for x in await self.db.fetch("SELECT prefix FROM pre WHERE guild_id = $1", message.guild.id)]
@@ -218,25 +417,69 @@ class BaseDuck(commands.AutoShardedBot):
             return tuple(await self.fetch_prefixes(message))
         return tuple(prefixes)
 
+    async def wait_for_message(
+        self,
+        channel: typing.Union[discord.abc.Snowflake, int],
+        *,
+        author: typing.Optional[typing.Union[discord.abc.Snowflake, int]] = None,
+        check: typing.Optional[Callable[[discord.Message], bool]] = None,
+        timeout: typing.Optional[float] = None,
+    ) -> discord.Message:
+        """Waits for a message in a channel, optionally from a specific author.
+
+        Behaves like ``wait_for('message')``, but the check is only run
+        for messages sent in that channel (and by that author, if given).
+        """
+        return await self.message_waiters.wait(
+            getattr(channel, "id", channel),
+            author_id=getattr(author, "id", author),
+            check=check,
+            timeout=timeout,
+        )
+
     async def get_context(self, message, *, cls=CustomContext):
         return await super().get_context(message, cls=cls)
 
+    async def invoke(self, ctx: CustomContext) -> None:
+        name = ctx.command.qualified_name if ctx.command else "unknown"
+        with db_usage.scope(f"command:{name}"):
+            await super().invoke(ctx)
+
+    async def _run_event(self, coro: Callable[..., Awaitable[Any]], event_name: str, *args: Any, **kwargs: Any) -> None:
+        # Runs in the event's own task, so the scope covers nothing else.
+        with db_usage.scope(f"listener:{getattr(coro, '__qualname__', event_name)}"):
+            if self.guild_config.lazy:
+                await self._load_event_guild(args)
+            await super()._run_event(coro, event_name, *args, **kwargs)
+
+    async def _load_event_guild(self, args: typing.Sequence[Any]) -> None:
+        """Makes sure the event's guild config is resident, so the listener's lookups in the config views don't miss."""
+        guild_id = event_guild_id(args)
+        if guild_id is None:
+            return
+        try:
+            await self.guild_config.get(guild_id)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            self.logger.warning(f"Could not load the config of guild {guild_id}", exc_info=e)
+
     async def on_ready(self) -> None:
+        self._mention_forms = (f"<@{self.user.id}>", f"<@!{self.user.id}>")
         self.logger.info(f"{col(2)}======[ BOT ONLINE! ]======={col()}")
         self.logger.info(f"{col(2, bg=True)}Logged in as {self.user} {col()}")
 
     async def on_message(self, message: discord.Message) -> None:
         await self.wait_until_ready()
-        if self.user:
-            if re.fullmatch(rf"<@!?{self.user.id}>", message.content):
-                prefix = await self.get_pre(self, message, raw_prefix=True)
-                if isinstance(prefix, str):
-                    await message.reply(f"For a list of commands do `{prefix}help` 💞")
-                elif isinstance(prefix, (tuple, list)):
-                    await message.reply(
-                        f"My prefixes here are `{'`, `'.join(prefix[0:10])}`\n"
-                        f"For a list of commands do`{prefix[0]}help` 💞"[0:2000]
-                    )
+        self.message_waiters.resolve(message)
+        await self.router.dispatch(message)
+        if message.content in self._mention_forms:
+            prefix = await self.get_pre(self, message, raw_prefix=True)
+            if isinstance(prefix, str):
+                await message.reply(f"For a list of commands do `{prefix}help` 💞")
+            elif isinstance(prefix, (tuple, list)):
+                await message.reply(
+                    f"My prefixes here are `{'`, `'.join(prefix[0:10])}`\n"
+                    f"For a list of commands do`{prefix[0]}help` 💞"[0:2000]
+                )
         await self.process_commands(message)
 
     async def on_error(self, event_method: str, *args: Any, **kwargs: Any) -> None:
@@ -269,50 +512,54 @@ class BaseDuck(commands.AutoShardedBot):
                 ),
             )
 
-    async def populate_cache(self):
+    async def _timed_cache_load(self, name: str, loader: Callable[[asyncpg.Connection], Awaitable[int]]) -> None:
+        start = time.perf_counter()
+        async with self.db.acquire() as conn:
+            rows = await loader(conn)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.logger.info(f"{col(7)}Loaded {col(7, fmt=4)}{name}{col()} cache: {rows} rows in {elapsed:.2f}ms")
+
+    async def _load_prefixes(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT guild_id, prefix FROM pre")
         _temp_prefixes = defaultdict(list)
-        for x in await self.db.fetch("SELECT * FROM pre"):
+        for x in records:
             _temp_prefixes[x["guild_id"]].append(x["prefix"] or self.PRE)
-        self.prefixes = dict(_temp_prefixes)
-
-        async def _populate_guild_cache():
-            await self.wait_until_ready()
-            for guild in self.guilds:
-                try:
-                    self.prefixes[guild.id]
-                except KeyError:
-                    self.prefixes[guild.id] = self.PRE
-
-        self.loop.create_task(_populate_guild_cache())
-
-        values = await self.db.fetch("SELECT user_id, is_blacklisted FROM blacklist")
-        for value in values:
-            self.blacklist[value["user_id"]] = value["is_blacklisted"] or False
-
-        values = await self.db.fetch("SELECT guild_id, welcome_channel FROM guilds")
-        for value in values:
-            self.welcome_channels[value["guild_id"]] = value["welcome_channel"] or None
-
-        self.afk_users = dict(
-            [(r["user_id"], True) for r in (await self.db.fetch("SELECT user_id, start_time FROM afk")) if r["start_time"]]
+        self.prefixes.reset(_temp_prefixes)
+        return len(records)
+
+    async def _load_blacklist(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT user_id, is_blacklisted FROM blacklist")
+        self.blacklist = {r["user_id"]: r["is_blacklisted"] or False for r in records}
+        return len(records)
+
+    async def _load_plonks(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT guild_id, array_agg(entity_id) AS entities FROM plonks GROUP BY guild_id")
+        self.plonks = {r["guild_id"]: set(r["entities"]) for r in records}
+        return len(records)
+
+    async def _load_welcome_channels(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT guild_id, welcome_channel FROM guilds")
+        self.welcome_channels.reset({r["guild_id"]: r["welcome_channel"] or None for r in records})
+        return len(records)
+
+    async def _load_afk(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT user_id, start_time, auto_un_afk FROM afk")
+        self.afk_users = {r["user_id"]: True for r in records if r["start_time"]}
+        self.auto_un_afk = {r["user_id"]: r["auto_un_afk"] for r in records if r["auto_un_afk"] is not None}
+        return len(records)
+
+    async def _load_suggestions(self, conn: asyncpg.Connection) -> int:
+        records = await conn.fetch("SELECT channel_id, image_only FROM suggestions")
+        self.suggestion_channels = {r["channel_id"]: r["image_only"] for r in records}
+        return len(records)
+
+    async def _load_counting(self, conn: asyncpg.Connection) -> int:
+        settings = await conn.fetch(
+            "SELECT guild_id, channel_id, current_number, last_counter, delete_messages, reset_on_fail FROM count_settings"
         )
-        self.auto_un_afk = dict(
-            [
-                (r["user_id"], r["auto_un_afk"])
-                for r in (await self.db.fetch("SELECT user_id, auto_un_afk FROM afk"))
-                if r["auto_un_afk"] is not None
-            ]
-        )
-        self.suggestion_channels = dict(
-            [
-                (r["channel_id"], r["image_only"])
-                for r in (await self.db.fetch("SELECT channel_id, image_only FROM suggestions"))
-            ]
-        )
-        self.counting_channels = dict(
-            (
-                x["guild_id"],
-                {
+        self.counting_channels.reset(
+            {
+                x["guild_id"]: {
                     "channel": x["channel_id"],
                     "number": x["current_number"],
                     "last_counter": x["last_counter"],
@@ -320,25 +567,51 @@ class BaseDuck(commands.AutoShardedBot):
                     "reset": x["reset_on_fail"],
                     "last_message_id": None,
                     "messages": deque(maxlen=100),
-                },
-            )
-            for x in await self.db.fetch("SELECT * FROM count_settings")
+                }
+                for x in settings
+            }
         )
+        return len(settings) + await self._load_counting_rewards(conn)
+
+    async def _load_counting_rewards(self, conn: asyncpg.Connection) -> int:
+        rewards = await conn.fetch("SELECT guild_id, array_agg(reward_number) AS rewards FROM counting GROUP BY guild_id")
+        self.counting_rewards = {x["guild_id"]: set(x["rewards"]) for x in rewards}
+        return len(rewards)
 
-        for x in await self.db.fetch("SELECT * FROM counting"):
+    async def _snapshot_loop(self) -> None:
+        await self.wait_until_ready()
+        while not self.is_closed():
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
             try:
-                self.counting_rewards[x["guild_id"]].add(x["reward_number"])
-            except KeyError:
-                self.counting_rewards[x["guild_id"]] = {x["reward_number"]}
+                await self.snapshot.save(self)
+            except Exception as e:
+                self.logger.error("Failed to save cache snapshot", exc_info=e)
 
-        for entry in await self.db.fetch("SELECT * FROM log_channels"):
+    async def _member_sweep_loop(self) -> None:
+        await self.wait_until_ready()
+        while not self.is_closed():
+            await asyncio.sleep(SWEEP_INTERVAL)
+            try:
+                self.member_residency.sweep()
+            except Exception as e:
+                self.logger.error("Failed to sweep member caches", exc_info=e)
+
+    async def _load_log_channels(self, conn: asyncpg.Connection) -> int:
+        # Make sure every logged guild has a flags row, then fetch both in one go.
+        await conn.execute(
+            "INSERT INTO logging_events (guild_id) SELECT guild_id FROM log_channels ON CONFLICT (guild_id) DO NOTHING"
+        )
+        records = await conn.fetch(
+            "SELECT lc.guild_id, lc.default_channel, lc.message_channel, lc.join_leave_channel, lc.member_channel, "
+            "lc.voice_channel, lc.server_channel, "
+            + ", ".join(f"le.{flag}" for flag in LoggingEventsFlags.VALID_FLAGS)
+            + " FROM log_channels lc INNER JOIN logging_events le ON lc.guild_id = le.guild_id"
+        )
+        log_channels = {}
+        guild_loggings = {}
+        for entry in records:
             guild_id = entry["guild_id"]
-            await self.db.execute(
-                "INSERT INTO logging_events(guild_id) VALUES ($1) ON CONFLICT (guild_id) DO NOTHING",
-                entry["guild_id"],
-            )
-
-            self.log_channels[guild_id] = LoggingConfig(
+            log_channels[guild_id] = LoggingConfig(
                 default=entry["default_channel"],
                 message=entry["message_channel"],
                 join_leave=entry["join_leave_channel"],
@@ -346,24 +619,85 @@ class BaseDuck(commands.AutoShardedBot):
                 voice=entry["voice_channel"],
                 server=entry["server_channel"],
             )
+            guild_loggings[guild_id] = LoggingEventsFlags(**{flag: entry[flag] for flag in LoggingEventsFlags.VALID_FLAGS})
+        self.log_channels.reset(log_channels)
+        self.guild_loggings.reset(guild_loggings)
+        return len(records)
 
-            flags = dict(
-                await self.db.fetchrow(
-                    "SELECT message_delete, message_purge, message_edit, member_join, member_leave, member_update, user_ban, user_unban, "
-                    "user_update, invite_create, invite_delete, voice_join, voice_leave, voice_move, voice_mod, emoji_create, emoji_delete, "
-                    "emoji_update, sticker_create, sticker_delete, sticker_update, server_update, stage_open, stage_close, channel_create, "
-                    "channel_delete, channel_edit, role_create, role_delete, role_edit FROM logging_events WHERE guild_id = $1",
-                    guild_id,
+    async def populate_cache(self):
+        start = time.perf_counter()
+        loaders = [
+            self._timed_cache_load("blacklist", self._load_blacklist),
+            self._timed_cache_load("plonks", self._load_plonks),
+            self._timed_cache_load("afk", self._load_afk),
+            self._timed_cache_load("suggestions", self._load_suggestions),
+        ]
+        if self.guild_config.lazy:
+            # Guild settings are fetched on demand by the GuildConfigStore, only the rewards are global.
+            loaders.append(self._timed_cache_load("counting rewards", self._load_counting_rewards))
+        else:
+            loaders.extend(
+                (
+                    self._timed_cache_load("prefixes", self._load_prefixes),
+                    self._timed_cache_load("welcome channels", self._load_welcome_channels),
+                    self._timed_cache_load("counting", self._load_counting),
+                    self._timed_cache_load("log channels", self._load_log_channels),
                 )
             )
-            self.guild_loggings[guild_id] = LoggingEventsFlags(**flags)
+        await asyncio.gather(*loaders)
+
+        async def _populate_guild_cache():
+            await self.wait_until_ready()
+            for guild in self.guilds:
+                try:
+                    self.prefixes[guild.id]
+                except KeyError:
+                    self.prefixes[guild.id] = self.PRE
 
-        self.logger.info(f"{col(2)}All cache populated successfully")
+        if not self.guild_config.lazy:
+            self.loop.create_task(_populate_guild_cache())
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.logger.info(f"{col(2)}All cache populated successfully in {elapsed:.2f}ms")
         self.dispatch("cache_ready")
 
     async def start(self, *args, **kwargs):
         await super().start(*args, **kwargs)
 
+    async def close(self) -> None:
+        try:
+            await self.snapshot.save(self)
+        except Exception as e:
+            self.logger.error("Failed to save cache snapshot", exc_info=e)
+        try:
+            await self.command_usage.close()
+        except Exception as e:
+            self.logger.error("Failed to write buffered command usage", exc_info=e)
+        await self.metrics.stop()
+        self.invalidation.stop()
+        self.command_rollups.stop()
+        self.command_partitions.stop()
+        self.log_delivery.stop()
+        await super().close()
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs: Any) -> None:
+        await super().add_cog(cog, **kwargs)
+        self.router.add_cog(cog)
+        disabled = disabled_intents()
+        missing = [i for i in cog_intents(cog) if not getattr(self.intents, i) and i not in disabled]
+        if missing:
+            # e.g. a cog from an extension outside of `extensions`, loaded after connecting.
+            self.logger.warning(
+                f"{cog.qualified_name} needs the {', '.join(missing)} intent(s), "
+                "which are only requested after a restart"
+            )
+
+    async def remove_cog(self, name: str, /, **kwargs: Any) -> Optional[commands.Cog]:
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            self.router.remove_cog(cog)
+        return cog
+
     async def load_extension(self, name: str, *, package: Optional[str] = None, _raise: bool = True) -> None:
         self._ext_log.info(f"{col(7)}Attempting to load {col(7, fmt=4)}{name}{col()}")
         try:
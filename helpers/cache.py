@@ -9,57 +9,156 @@ from __future__ import annotations
 
 import asyncio
 import enum
+import inspect
 import time
 
+from collections import OrderedDict, deque
 from functools import wraps
-from typing import Any, Callable, Coroutine, MutableMapping, TypeVar, Protocol
+from typing import Any, Callable, Coroutine, Deque, Iterator, MutableMapping, Optional, TypeVar, Protocol
 
 from lru import LRU
 
+from helpers.cache_registry import registry
+
 R = TypeVar('R')
 
 # Can't use ParamSpec due to https://github.com/python/typing/discussions/946
 class CacheProtocol(Protocol[R]):
-    cache: MutableMapping[str, asyncio.Task[R]]
+    cache: MutableMapping[tuple[Any, ...], asyncio.Task[R]]
 
     def __call__(self, *args: Any, **kwds: Any) -> asyncio.Task[R]:
         ...
 
-    def get_key(self, *args: Any, **kwargs: Any) -> str:
+    def get_key(self, *args: Any, **kwargs: Any) -> tuple[Any, ...]:
         ...
 
     def invalidate(self, *args: Any, **kwargs: Any) -> bool:
         ...
 
-    def invalidate_containing(self, key: str) -> None:
+    def invalidate_containing(self, value: Any) -> None:
+        ...
+
+    def clear(self) -> None:
         ...
 
     def get_stats(self) -> tuple[int, int]:
         ...
 
 
-class ExpiringCache(dict):
-    def __init__(self, seconds: float):
-        self.__ttl: float = seconds
-        super().__init__()
+class ExpiringCache(MutableMapping[Any, Any]):
+    """A mapping whose entries expire ``seconds`` after they were set.
+
+    Entries are kept in LRU order, and once ``maxsize`` is reached the
+    least recently used one is evicted. Expiry times are queued per TTL,
+    and since every entry of a queue shares the same TTL the queue is
+    sorted by expiry time, so expired entries are always at its front
+    and purging them is amortized O(1).
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        *,
+        maxsize: Optional[int] = None,
+        callback: Optional[Callable[[Any, Any], Any]] = None,
+    ):
+        self.ttl: float = seconds
+        self.maxsize: Optional[int] = maxsize
+        # Like lru.LRU's callback, called with (key, value) when an entry is evicted or expires.
+        self.callback: Optional[Callable[[Any, Any], Any]] = callback
+        self._data: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self._queues: dict[float, Deque[tuple[float, Any]]] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def _expire(self, now: float) -> None:
+        data = self._data
+        for queue in self._queues.values():
+            while queue and queue[0][0] <= now:
+                expires_at, key = queue.popleft()
+                entry = data.get(key)
+                # The key may have been set again, or evicted, since this was queued.
+                if entry is not None and entry[1] == expires_at:
+                    del data[key]
+                    self.expirations += 1
+                    if self.callback is not None:
+                        self.callback(key, entry[0])
+
+    def set(self, key: Any, value: Any, *, ttl: Optional[float] = None) -> None:
+        """Sets a value with its own TTL, instead of the cache's default one."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._expire(now)
+
+        expires_at = now + ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        try:
+            queue = self._queues[ttl]
+        except KeyError:
+            queue = self._queues[ttl] = deque()
+        queue.append((expires_at, key))
+
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            evicted, (evicted_value, _) = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.callback is not None:
+                self.callback(evicted, evicted_value)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
 
-    def __verify_cache_integrity(self):
-        # Have to do this in two steps...
-        current_time = time.monotonic()
-        to_remove = [k for (k, (v, t)) in self.items() if current_time > (t + self.__ttl)]
-        for k in to_remove:
-            del self[k]
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            value, expires_at = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            if self.callback is not None:
+                self.callback(key, value)
+            raise KeyError(key)
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
 
-    def __contains__(self, key: str):
-        self.__verify_cache_integrity()
-        return super().__contains__(key)
+    def __contains__(self, key: Any) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
 
-    def __getitem__(self, key: str):
-        self.__verify_cache_integrity()
-        return super().__getitem__(key)
+    def __delitem__(self, key: Any) -> None:
+        del self._data[key]
 
-    def __setitem__(self, key: str, value: Any):
-        super().__setitem__(key, (value, time.monotonic()))
+    def __iter__(self) -> Iterator[Any]:
+        self._expire(time.monotonic())
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._queues.clear()
+
+    def get_stats(self) -> tuple[int, int]:
+        return self.hits, self.misses
+
+
+_KWARGS_MARK = object()
+
+
+def _true_repr(o: Any) -> str:
+    # we do care what 'self' parameter is when we __repr__ it
+    if o.__class__.__repr__ is object.__repr__:
+        return f'<{o.__class__.__module__}.{o.__class__.__name__}>'
+    return repr(o)
 
 
 class Strategy(enum.Enum):
@@ -72,41 +171,127 @@ def cache(
     maxsize: int = 128,
     strategy: Strategy = Strategy.lru,
     ignore_kwargs: bool = False,
+    ttl: Optional[float] = None,
+    evict_failures: bool = False,
+    negative_ttl: Optional[float] = None,
+    stale_while_revalidate: Optional[float] = None,
 ) -> Callable[[Callable[..., Coroutine[Any, Any, R]]], CacheProtocol[R]]:
+    """Caches the task of a coroutine function by its arguments.
+
+    With ``Strategy.timed``, entries live for ``ttl`` seconds and at most
+    ``maxsize`` of them are kept. Without a ``ttl``, ``maxsize`` is the
+    number of seconds instead and the cache is unbounded, like it always was.
+
+    ``evict_failures`` drops tasks that raised or got cancelled, so the
+    next call retries instead of re-raising the same error. ``negative_ttl``
+    only keeps ``None`` results for that many seconds. With
+    ``stale_while_revalidate``, entries older than that many seconds are
+    still returned, but refreshed in the background (one refresh per key
+    at a time); if the refresh fails, the old value keeps being served.
+    """
+
     def decorator(func: Callable[..., Coroutine[Any, Any, R]]) -> CacheProtocol[R]:
+        # {leading argument: keys}, so invalidate_containing(guild_id) only touches that guild's entries.
+        _index: dict[Any, set[tuple[Any, ...]]] = {}
+
+        # Only tracked with stale_while_revalidate.
+        _born: dict[tuple[Any, ...], float] = {}
+        _refreshing: dict[tuple[Any, ...], asyncio.Task[R]] = {}
+
+        def _unindex(key: tuple[Any, ...], *_: Any) -> None:
+            _born.pop(key, None)
+            if len(key) > _lead:
+                keys = _index.get(key[_lead])
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del _index[key[_lead]]
+
+        _evictions = 0
+
+        def _evicted(key: tuple[Any, ...], value: Any) -> None:
+            nonlocal _evictions
+            _evictions += 1
+            _unindex(key)
+
         if strategy is Strategy.lru:
-            _internal_cache = LRU(maxsize)
+            _internal_cache = LRU(maxsize, callback=_evicted)
             _stats = _internal_cache.get_stats
         elif strategy is Strategy.raw:
             _internal_cache = {}
             _stats = lambda: (0, 0)
         elif strategy is Strategy.timed:
-            _internal_cache = ExpiringCache(maxsize)
-            _stats = lambda: (0, 0)
+            if ttl is None:
+                _internal_cache = ExpiringCache(maxsize, callback=_evicted)
+            else:
+                _internal_cache = ExpiringCache(ttl, maxsize=maxsize, callback=_evicted)
+            _stats = _internal_cache.get_stats
+
+        def _registry_stats() -> dict[str, int]:
+            hits, misses = _stats()
+            return {'hits': hits, 'misses': misses, 'evictions': _evictions}
+
+        registry.register(
+            f'{func.__module__}.{func.__qualname__}',
+            lambda: _internal_cache,
+            owner=func.__module__,
+            stats=_registry_stats if strategy is not Strategy.raw else None,
+        )
+
+        # The instance is not a useful thing to invalidate by, the argument after it is.
+        params = list(inspect.signature(func).parameters)
+        _lead = 1 if params and params[0] in ('self', 'cls') else 0
 
-        def _make_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
-            # this is a bit of a cluster fuck
-            # we do care what 'self' parameter is when we __repr__ it
-            def _true_repr(o):
-                if o.__class__.__repr__ is object.__repr__:
-                    return f'<{o.__class__.__module__}.{o.__class__.__name__}>'
-                return repr(o)
-
-            key = [f'{func.__module__}.{func.__name__}']
-            key.extend(_true_repr(o) for o in args)
-            if not ignore_kwargs:
-                for k, v in kwargs.items():
-                    # note: this only really works for this use case in particular
-                    # I want to pass asyncpg.Connection objects to the parameters
-                    # however, they use default __repr__ and I do not care what
-                    # connection is passed in, so I needed a bypass.
-                    if k == 'connection' or k == 'pool':
-                        continue
-
-                    key.append(_true_repr(k))
-                    key.append(_true_repr(v))
-
-            return ':'.join(key)
+        def _make_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, ...]:
+            key = args
+            if kwargs and not ignore_kwargs:
+                # note: this only really works for this use case in particular
+                # I want to pass asyncpg.Connection objects to the parameters
+                # however, I do not care what connection is passed in, so I needed a bypass.
+                extra = tuple(item for item in kwargs.items() if item[0] != 'connection' and item[0] != 'pool')
+                if extra:
+                    key = args + (_KWARGS_MARK,) + extra
+            try:
+                hash(key)
+            except TypeError:
+                # Unhashable arguments (lists, dicts...) fall back to their repr.
+                key = tuple(_true_repr(o) for o in key)
+            return key
+
+        def _store(key: tuple[Any, ...], task: asyncio.Task[R]) -> None:
+            _internal_cache[key] = task
+            if len(key) > _lead:
+                _index.setdefault(key[_lead], set()).add(key)
+            if stale_while_revalidate is not None:
+                _born[key] = time.monotonic()
+            if evict_failures or negative_ttl is not None:
+                task.add_done_callback(lambda t: _settled(key, t))
+
+        def _delete_if_current(key: tuple[Any, ...], task: asyncio.Task[R]) -> None:
+            if _internal_cache.get(key) is task:
+                _delete(key)
+
+        def _settled(key: tuple[Any, ...], task: asyncio.Task[R]) -> None:
+            if task.cancelled() or task.exception() is not None:
+                if evict_failures:
+                    _delete_if_current(key, task)
+            elif negative_ttl is not None and task.result() is None:
+                asyncio.get_running_loop().call_later(negative_ttl, _delete_if_current, key, task)
+
+        def _refreshed(key: tuple[Any, ...], stale: asyncio.Task[R], task: asyncio.Task[R]) -> None:
+            if _refreshing.get(key) is task:
+                del _refreshing[key]
+            # Failed refreshes leave the stale value in place, it gets retried on the next call.
+            if not task.cancelled() and task.exception() is None and _internal_cache.get(key) is stale:
+                _store(key, task)
+
+        def _revalidate(key: tuple[Any, ...], task: asyncio.Task[R], args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+            if key in _refreshing or not task.done() or task.cancelled() or task.exception() is not None:
+                return
+            if time.monotonic() - _born.get(key, 0.0) < stale_while_revalidate:  # type: ignore
+                return
+            refresh = _refreshing[key] = asyncio.create_task(func(*args, **kwargs))
+            refresh.add_done_callback(lambda t: _refreshed(key, task, t))
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any):
@@ -114,35 +299,57 @@ def cache(
             try:
                 task = _internal_cache[key]
             except KeyError:
-                _internal_cache[key] = task = asyncio.create_task(func(*args, **kwargs))
+                task = asyncio.create_task(func(*args, **kwargs))
+                _store(key, task)
                 return task
             else:
+                if stale_while_revalidate is not None:
+                    _revalidate(key, task, args, kwargs)
                 return task
 
-        def _invalidate(*args: Any, **kwargs: Any) -> bool:
+        def _delete(key: tuple[Any, ...]) -> bool:
+            _unindex(key)
+            refresh = _refreshing.pop(key, None)
+            if refresh is not None:
+                refresh.cancel()
             try:
-                del _internal_cache[_make_key(args, kwargs)]
+                del _internal_cache[key]
             except KeyError:
                 return False
             else:
                 return True
 
-        def _invalidate_containing(key: str) -> None:
-            to_remove = []
-            for k in _internal_cache.keys():
-                if key in k:
-                    to_remove.append(k)
-            for k in to_remove:
-                try:
-                    del _internal_cache[k]
-                except KeyError:
-                    continue
+        def _invalidate(*args: Any, **kwargs: Any) -> bool:
+            return _delete(_make_key(args, kwargs))
+
+        def _invalidate_containing(value: Any) -> None:
+            try:
+                keys = _index.get(value)
+            except TypeError:
+                keys = None
+            if keys is not None:
+                for k in list(keys):
+                    _delete(k)
+            elif isinstance(value, str):
+                # Old style, e.g. invalidate_containing(f'{guild_id!r}:'), matched against the key's repr.
+                for k in list(_internal_cache.keys()):
+                    if value in ':'.join(_true_repr(o) for o in k):
+                        _delete(k)
+
+        def _clear() -> None:
+            for refresh in _refreshing.values():
+                refresh.cancel()
+            _refreshing.clear()
+            _born.clear()
+            _index.clear()
+            _internal_cache.clear()
 
         wrapper.cache = _internal_cache
         wrapper.get_key = lambda *args, **kwargs: _make_key(args, kwargs)
         wrapper.invalidate = _invalidate
         wrapper.get_stats = _stats
         wrapper.invalidate_containing = _invalidate_containing
+        wrapper.clear = _clear
         return wrapper  # type: ignore
 
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sized, Tuple
+
+from lru import LRU
+
+# How many items are measured per container, the rest is extrapolated.
+SAMPLE_SIZE = 16
+MAX_DEPTH = 4
+# Discord models, the bot, pools and sessions are referenced by caches, not owned by them.
+SHARED_MODULES = {"discord", "asyncpg", "aiohttp"}
+
+CacheStats = Dict[str, int]
+
+
+def approximate_size(obj: Any, depth: int = MAX_DEPTH) -> int:
+    """Estimates the memory held by ``obj`` by measuring a sample of its items.
+
+    Only follows containers, slotted objects and ``__dict__``s up to
+    ``depth`` levels, and never into discord.py, asyncpg or aiohttp
+    objects, so shared objects like guilds are not counted.
+    """
+    if isinstance(obj, asyncio.Future):
+        if not obj.done() or obj.cancelled() or obj.exception() is not None:
+            return sys.getsizeof(obj)
+        obj = obj.result()
+
+    size = sys.getsizeof(obj)
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+
+    if isinstance(obj, (Mapping, LRU)):
+        # LRU is not a Mapping, and its items() is a list copy, which still beats not measuring it.
+        items: Iterable[Any] = obj.items()
+        total = len(obj)
+    elif isinstance(obj, (list, tuple, set, frozenset)) or hasattr(obj, "maxlen"):
+        items = obj
+        total = len(obj)
+    elif any(k.__module__.partition(".")[0] in SHARED_MODULES for k in type(obj).__mro__):
+        return size
+    elif hasattr(obj, "__slots__"):
+        items = [getattr(obj, s, None) for s in obj.__slots__]
+        total = len(items)
+    elif hasattr(obj, "__dict__"):
+        return size + approximate_size(vars(obj), depth - 1)
+    else:
+        return size
+
+    sample = list(itertools.islice(items, SAMPLE_SIZE))
+    if not sample:
+        return size
+    measured = sum(approximate_size(item, depth - 1) for item in sample)
+    return size + measured * total // len(sample)
+
+
+class RegisteredCache:
+    __slots__ = ("name", "owner", "source", "stats")
+
+    def __init__(
+        self,
+        name: str,
+        owner: str,
+        source: Callable[[], Sized],
+        stats: Optional[Callable[[], CacheStats]],
+    ):
+        self.name: str = name
+        self.owner: str = owner
+        self.source: Callable[[], Sized] = source
+        self.stats: Optional[Callable[[], CacheStats]] = stats
+
+
+class CacheRegistry:
+    """Every long lived cache in the process, so their sizes and hit rates can be reported.
+
+    ``source`` is a callable returning the cache, since most of the bot's
+    caches get replaced rather than mutated when they are reloaded.
+    ``stats`` optionally returns ``hits``, ``misses`` and ``evictions``.
+    """
+
+    def __init__(self):
+        self.caches: Dict[str, RegisteredCache] = {}
+
+    def register(
+        self,
+        name: str,
+        source: Callable[[], Sized],
+        *,
+        owner: str = "bot",
+        stats: Optional[Callable[[], CacheStats]] = None,
+    ) -> None:
+        # Re-registering under the same name (e.g. reloading a cog) replaces the old entry.
+        self.caches[name] = RegisteredCache(name, owner, source, stats)
+
+    def unregister(self, name: str) -> None:
+        self.caches.pop(name, None)
+
+    def unregister_owner(self, owner: str) -> None:
+        for name in [n for n, c in self.caches.items() if c.owner == owner]:
+            del self.caches[name]
+
+    def report(self) -> List[Tuple[str, str, int, int, CacheStats]]:
+        """(name, owner, entries, approximate bytes, stats) for every cache, biggest first."""
+        rows = []
+        for cache in list(self.caches.values()):
+            data = cache.source()
+            stats = cache.stats() if cache.stats is not None else {}
+            rows.append((cache.name, cache.owner, len(data), approximate_size(data), stats))
+        rows.sort(key=lambda r: r[3], reverse=True)
+        return rows
+
+    def collect_metrics(self) -> Iterable[str]:
+        rows = self.report()
+        yield "# TYPE duckbot_cache_entries gauge"
+        for name, owner, entries, _, _ in rows:
+            yield f'duckbot_cache_entries{{cache="{name}",owner="{owner}"}} {entries}'
+        yield "# TYPE duckbot_cache_bytes gauge"
+        for name, owner, _, size, _ in rows:
+            yield f'duckbot_cache_bytes{{cache="{name}",owner="{owner}"}} {size}'
+        for stat in ("hits", "misses", "evictions"):
+            yield f"# TYPE duckbot_cache_{stat}_total counter"
+            for name, owner, _, _, stats in rows:
+                if stat in stats:
+                    yield f'duckbot_cache_{stat}_total{{cache="{name}",owner="{owner}"}} {stats[stat]}'
+
+
+registry = CacheRegistry()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("command_rollups")
+
+ROLLUP_INTERVAL = 600
+# Raw rows newer than this stay un-rolled, so the batched writes of every process have landed.
+ROLLUP_GRACE = "1 hour"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS command_rollups (
+    guild_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    command TEXT NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    uses INTEGER NOT NULL,
+    first_used TIMESTAMP NOT NULL,
+    PRIMARY KEY (guild_id, user_id, command, hour)
+);
+CREATE TABLE IF NOT EXISTS command_rollup_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    rolled_up_to TIMESTAMP
+);
+INSERT INTO command_rollup_state (id, rolled_up_to) VALUES (TRUE, NULL) ON CONFLICT (id) DO NOTHING;
+"""
+
+# Folds the raw rows in [$1, $2) into the hourly buckets.
+ROLL_UP = """
+INSERT INTO command_rollups (guild_id, user_id, command, hour, uses, first_used)
+SELECT guild_id, user_id, command, date_trunc('hour', timestamp), COUNT(*), MIN(timestamp)
+FROM commands
+WHERE guild_id IS NOT NULL AND timestamp >= $1::TIMESTAMP AND timestamp < $2::TIMESTAMP
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (guild_id, user_id, command, hour) DO UPDATE
+SET uses = command_rollups.uses + EXCLUDED.uses, first_used = LEAST(command_rollups.first_used, EXCLUDED.first_used)
+"""
+
+WATERMARK = f"SELECT date_trunc('hour', now() AT TIME ZONE 'UTC' - INTERVAL '{ROLLUP_GRACE}')"
+
+# Everything before the watermark comes from the rollups, the rest from the raw table.
+_USAGE = """
+WITH state AS (SELECT COALESCE(rolled_up_to, '-infinity') AS rolled_up_to FROM command_rollup_state),
+usage AS (
+    SELECT user_id, command, hour, uses, first_used
+    FROM command_rollups
+    WHERE {where} AND hour < (SELECT rolled_up_to FROM state)
+    UNION ALL
+    SELECT user_id, command, date_trunc('hour', timestamp), 1, timestamp
+    FROM commands
+    WHERE {where} AND timestamp >= (SELECT rolled_up_to FROM state)
+)
+SELECT 'total', NULL::BIGINT, NULL::TEXT, COALESCE(SUM(uses), 0)::BIGINT, MIN(first_used) FROM usage
+"""
+
+_TOP = """
+UNION ALL (
+    SELECT '{kind}', {user}, {command}, SUM(uses)::BIGINT, NULL
+    FROM usage {today}
+    GROUP BY {group}
+    ORDER BY 4 DESC
+    LIMIT 5
+)"""
+
+_TODAY = "WHERE hour >= date_trunc('hour', now() AT TIME ZONE 'UTC' - INTERVAL '1 day')"
+
+
+def _stats_query(where: str, *tops: Tuple[str, str, bool]) -> str:
+    query = _USAGE.format(where=where)
+    for kind, group, today in tops:
+        query += _TOP.format(
+            kind=kind,
+            user="user_id" if group == "user_id" else "NULL::BIGINT",
+            command="command" if group == "command" else "NULL::TEXT",
+            today=_TODAY if today else "",
+            group=group,
+        )
+    return query
+
+
+GUILD_STATS = _stats_query(
+    "guild_id = $1",
+    ("commands", "command", False),
+    ("commands_today", "command", True),
+    ("users", "user_id", False),
+    ("users_today", "user_id", True),
+)
+MEMBER_STATS = _stats_query(
+    "guild_id = $1 AND user_id = $2",
+    ("commands", "command", False),
+    ("commands_today", "command", True),
+)
+
+
+class CommandStats:
+    """The result of one stats query. ``top`` maps each ranking to (user_id or command, uses) pairs."""
+
+    __slots__ = ("total", "since", "top")
+
+    def __init__(self, records: List[asyncpg.Record]):
+        self.total: int = 0
+        self.since: Optional[datetime.datetime] = None
+        self.top: Dict[str, List[Tuple[object, int]]] = {}
+        for kind, user_id, command, uses, since in records:
+            if kind == "total":
+                self.total, self.since = uses, since
+            else:
+                self.top.setdefault(kind, []).append((user_id if command is None else command, uses))
+
+
+class CommandRollups:
+    """Hourly per guild, user and command counts of the ``commands`` table.
+
+    A periodic job folds raw rows into ``command_rollups`` up to a
+    watermark, an hour boundary at least ``ROLLUP_GRACE`` in the past.
+    Stats read the rollups before the watermark and the few raw rows
+    after it, in one query. Until :meth:`backfill` has run once, the
+    watermark is unset and stats read only raw rows, like before.
+    """
+
+    def __init__(self, bot: BaseDuck):
+        self.bot: BaseDuck = bot
+        self.rolled_up_to: Optional[datetime.datetime] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def ensure_schema(self) -> None:
+        await self.bot.db.execute(SCHEMA)
+
+    async def roll_up(self) -> int:
+        """Folds the raw rows that passed the grace period since the last run. Returns the number of new buckets."""
+        async with self.bot.db.acquire() as conn:
+            async with conn.transaction():
+                # The row lock keeps other processes from folding the same rows.
+                start = await conn.fetchval("SELECT rolled_up_to FROM command_rollup_state FOR UPDATE")
+                if start is None:
+                    return 0
+                end = await conn.fetchval(WATERMARK)
+                if end <= start:
+                    return 0
+                status = await conn.execute(ROLL_UP, start, end)
+                await conn.execute("UPDATE command_rollup_state SET rolled_up_to = $1", end)
+        self.rolled_up_to = end
+        return int(status.rpartition(" ")[2])
+
+    async def backfill(self) -> int:
+        """Rebuilds the rollups from the raw history that is left. Returns the number of buckets.
+
+        Buckets older than the oldest raw row are kept, their rows may
+        have been expired from the partitioned ``commands`` table.
+        """
+        async with self.bot.db.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT rolled_up_to FROM command_rollup_state FOR UPDATE")
+                end = await conn.fetchval(WATERMARK)
+                start = await conn.fetchval("SELECT date_trunc('hour', MIN(timestamp)) FROM commands")
+                status = "INSERT 0 0"
+                if start is not None and start < end:
+                    await conn.execute("DELETE FROM command_rollups WHERE hour >= $1", start)
+                    status = await conn.execute(ROLL_UP, start, end)
+                await conn.execute("UPDATE command_rollup_state SET rolled_up_to = $1", end)
+        self.rolled_up_to = end
+        return int(status.rpartition(" ")[2])
+
+    async def clear(self) -> None:
+        """Deletes the whole command history, raw rows and rollups alike, and unsets the watermark."""
+        async with self.bot.db.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT rolled_up_to FROM command_rollup_state FOR UPDATE")
+                await conn.execute("TRUNCATE commands, command_rollups")
+                await conn.execute("UPDATE command_rollup_state SET rolled_up_to = NULL")
+        self.rolled_up_to = None
+
+    async def guild_stats(self, guild_id: int) -> CommandStats:
+        return CommandStats(await self.bot.db.fetch(GUILD_STATS, guild_id))
+
+    async def member_stats(self, guild_id: int, user_id: int) -> CommandStats:
+        return CommandStats(await self.bot.db.fetch(MEMBER_STATS, guild_id, user_id))
+
+    async def _run(self) -> None:
+        try:
+            await self.ensure_schema()
+        except asyncpg.PostgresError as e:
+            log.error("Could not create the command rollup tables", exc_info=e)
+            return
+        while True:
+            try:
+                await self.roll_up()
+            except Exception as e:
+                log.error("Failed to roll up command usage", exc_info=e)
+            await asyncio.sleep(ROLLUP_INTERVAL)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="command-rollups")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -139,6 +139,13 @@ class CustomContext(commands.Context):
     bot: DuckBot
     guild: discord.Guild
     me: discord.Member
+    _author_is_owner: typing.Optional[bool] = None
+
+    async def author_is_owner(self) -> bool:
+        """Whether the author is a bot owner, resolved once per context"""
+        if self._author_is_owner is None:
+            self._author_is_owner = await self.bot.check_owner(self.author)
+        return self._author_is_owner
 
     @property
     def clean_prefix(self) -> str:
@@ -404,11 +411,7 @@ class CustomContext(commands.Context):
         bot_message = await self.send(**{"content" if not isinstance(message, discord.Embed) else "embed": message})
         usermessage = None
         try:
-            usermessage = await self.bot.wait_for(
-                "message",
-                check=lambda m: m.author == self.author and m.channel == self.channel,
-                timeout=timeout,
-            )
+            usermessage = await self.bot.wait_for_message(self.channel, author=self.author, timeout=timeout)
             message = usermessage
         except asyncio.TimeoutError:
             raise commands.BadArgument("Prompt timed out.")
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import asyncpg
+import sentry_sdk
+
+# Work that isn't running on behalf of a command or listener, e.g. loops and setup.
+BACKGROUND = "background"
+
+
+class DBScope:
+    """Database time spent by one command invocation or listener call."""
+
+    __slots__ = ("name", "queries", "query_time", "wait_time", "rows")
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.queries: int = 0
+        self.query_time: float = 0.0
+        self.wait_time: float = 0.0
+        self.rows: int = 0
+
+
+class DBConsumer:
+    """Totals for every scope that had the same name."""
+
+    __slots__ = ("name", "calls", "queries", "query_time", "wait_time", "max_wait", "rows")
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.calls: int = 0
+        self.queries: int = 0
+        self.query_time: float = 0.0
+        self.wait_time: float = 0.0
+        self.max_wait: float = 0.0
+        self.rows: int = 0
+
+    @property
+    def total_time(self) -> float:
+        return self.query_time + self.wait_time
+
+
+current_scope: contextvars.ContextVar[Optional[DBScope]] = contextvars.ContextVar("db_scope", default=None)
+
+
+class DBUsage:
+    """Attributes the pool's query and wait time to whatever command or listener is running.
+
+    Commands and listeners open a :meth:`scope`, which is stored in a
+    context variable, so every query made from their task (and the tasks
+    it creates) is added to it. Anything else ends up under ``background``.
+    When ``SENTRY_DB_USAGE`` is set, every scope is also sent to Sentry as
+    a transaction carrying the totals as span data.
+    """
+
+    def __init__(self):
+        self.consumers: Dict[str, DBConsumer] = {}
+        self.since: float = time.monotonic()
+        self.sentry: bool = bool(os.getenv("SENTRY_DB_USAGE"))
+
+    def _consumer(self, name: str) -> DBConsumer:
+        try:
+            return self.consumers[name]
+        except KeyError:
+            consumer = self.consumers[name] = DBConsumer(name)
+            return consumer
+
+    @contextlib.contextmanager
+    def scope(self, name: str) -> Iterator[DBScope]:
+        scope = DBScope(name)
+        token = current_scope.set(scope)
+        transaction = sentry_sdk.start_transaction(op="db.usage", name=name) if self.sentry else None
+        try:
+            with transaction or contextlib.nullcontext():
+                try:
+                    yield scope
+                finally:
+                    if transaction is not None:
+                        transaction.set_data("db.queries", scope.queries)
+                        transaction.set_data("db.query_time", scope.query_time)
+                        transaction.set_data("db.wait_time", scope.wait_time)
+                        transaction.set_data("db.rows", scope.rows)
+        finally:
+            current_scope.reset(token)
+            if scope.queries or scope.wait_time:
+                self._consumer(name).calls += 1
+
+    def record(self, *, elapsed: float = 0.0, wait: float = 0.0, rows: int = 0, queries: int = 1) -> None:
+        scope = current_scope.get()
+        consumer = self._consumer(scope.name if scope is not None else BACKGROUND)
+        consumer.queries += queries
+        consumer.query_time += elapsed
+        consumer.wait_time += wait
+        consumer.max_wait = max(consumer.max_wait, wait)
+        consumer.rows += rows
+        if scope is not None:
+            scope.queries += queries
+            scope.query_time += elapsed
+            scope.wait_time += wait
+            scope.rows += rows
+
+    def report(self) -> List[DBConsumer]:
+        """Every consumer, most database time first."""
+        return sorted(self.consumers.values(), key=lambda c: c.total_time, reverse=True)
+
+    def reset(self) -> None:
+        self.consumers.clear()
+        self.since = time.monotonic()
+
+    def collect_metrics(self) -> Iterable[str]:
+        consumers = list(self.consumers.values())
+        for metric, attr in (
+            ("db_query_seconds", "query_time"),
+            ("db_wait_seconds", "wait_time"),
+            ("db_queries", "queries"),
+            ("db_rows", "rows"),
+        ):
+            yield f"# TYPE duckbot_{metric}_total counter"
+            for consumer in consumers:
+                yield f'duckbot_{metric}_total{{consumer="{consumer.name}"}} {getattr(consumer, attr)}'
+
+
+usage = DBUsage()
+
+
+def _rows(method: str, result: Any) -> int:
+    if method == "fetch":
+        return len(result)
+    if method in ("execute", "executemany", "copy_records_to_table"):
+        # e.g. "DELETE 3" or "COPY 10", executemany returns None
+        last = (result or "").rpartition(" ")[2]
+        return int(last) if last.isdigit() else 0
+    return int(result is not None)
+
+
+class AttributedConnection:
+    """An acquired pool connection whose queries are added to the current scope."""
+
+    __slots__ = ("connection",)
+
+    def __init__(self, connection: asyncpg.Connection):
+        self.connection: asyncpg.Connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+    async def _timed(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        result = await getattr(self.connection, method)(*args, **kwargs)
+        usage.record(elapsed=time.perf_counter() - start, rows=_rows(method, result))
+        return result
+
+    async def fetch(self, *args: Any, **kwargs: Any) -> List[asyncpg.Record]:
+        return await self._timed("fetch", *args, **kwargs)
+
+    async def fetchrow(self, *args: Any, **kwargs: Any) -> Optional[asyncpg.Record]:
+        return await self._timed("fetchrow", *args, **kwargs)
+
+    async def fetchval(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed("fetchval", *args, **kwargs)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> str:
+        return await self._timed("execute", *args, **kwargs)
+
+    async def executemany(self, *args: Any, **kwargs: Any) -> None:
+        return await self._timed("executemany", *args, **kwargs)
+
+    async def copy_records_to_table(self, *args: Any, **kwargs: Any) -> str:
+        return await self._timed("copy_records_to_table", *args, **kwargs)
+
+
+class _AcquireContext:
+    __slots__ = ("pool", "timeout", "connection")
+
+    def __init__(self, pool: AttributedPool, timeout: Optional[float]):
+        self.pool: AttributedPool = pool
+        self.timeout: Optional[float] = timeout
+        self.connection: Optional[AttributedConnection] = None
+
+    async def __aenter__(self) -> AttributedConnection:
+        start = time.perf_counter()
+        connection = await self.pool.pool.acquire(timeout=self.timeout)
+        usage.record(wait=time.perf_counter() - start, queries=0)
+        self.connection = AttributedConnection(connection)
+        return self.connection
+
+    async def __aexit__(self, *exc: Any) -> None:
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            await self.pool.pool.release(connection.connection)
+
+
+class AttributedPool:
+    """Wraps the asyncpg pool so the time spent waiting for and running queries can be attributed.
+
+    Behaves like the pool it wraps, anything not overridden is passed
+    through to it.
+    """
+
+    __slots__ = ("pool",)
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool: asyncpg.Pool = pool
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _AcquireContext:
+        return _AcquireContext(self, timeout)
+
+    async def fetch(self, *args: Any, **kwargs: Any) -> List[asyncpg.Record]:
+        async with self.acquire() as conn:
+            return await conn.fetch(*args, **kwargs)
+
+    async def fetchrow(self, *args: Any, **kwargs: Any) -> Optional[asyncpg.Record]:
+        async with self.acquire() as conn:
+            return await conn.fetchrow(*args, **kwargs)
+
+    async def fetchval(self, *args: Any, **kwargs: Any) -> Any:
+        async with self.acquire() as conn:
+            return await conn.fetchval(*args, **kwargs)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(*args, **kwargs)
+
+    async def executemany(self, *args: Any, **kwargs: Any) -> None:
+        async with self.acquire() as conn:
+            return await conn.executemany(*args, **kwargs)
+
+    async def copy_records_to_table(self, *args: Any, **kwargs: Any) -> str:
+        async with self.acquire() as conn:
+            return await conn.copy_records_to_table(*args, **kwargs)
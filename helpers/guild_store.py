@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, Iterator, MutableMapping, Optional, Sequence
+
+import discord
+from lru import LRU
+
+from helpers.helper import LoggingEventsFlags
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+# Every guild-scoped setting in one round trip. The subselect
+# makes sure we always get a row back, even for unknown guilds.
+FETCH_QUERY = (
+    "SELECT (SELECT array_agg(prefix) FROM pre WHERE guild_id = t.guild_id) AS prefixes, "
+    "g.welcome_channel, g.snipe_enabled, g.modlog, g.muted_id, "
+    "cs.channel_id AS count_channel, cs.current_number, cs.last_counter, cs.delete_messages, cs.reset_on_fail, "
+    "lc.guild_id IS NOT NULL AS logged, lc.default_channel, lc.message_channel, lc.join_leave_channel, "
+    "lc.member_channel, lc.voice_channel, lc.server_channel, le.guild_id IS NOT NULL AS has_events, "
+    + ", ".join(f"le.{flag}" for flag in LoggingEventsFlags.VALID_FLAGS)
+    + " FROM (SELECT $1::BIGINT AS guild_id) AS t "
+    "LEFT JOIN guilds g ON g.guild_id = t.guild_id "
+    "LEFT JOIN count_settings cs ON cs.guild_id = t.guild_id "
+    "LEFT JOIN log_channels lc ON lc.guild_id = t.guild_id "
+    "LEFT JOIN logging_events le ON le.guild_id = t.guild_id"
+)
+
+
+def event_guild_id(args: Sequence[Any]) -> Optional[int]:
+    """The guild an event is about, read from its first argument: a guild, something in one or a raw payload."""
+    if not args:
+        return None
+    first = args[0]
+    if isinstance(first, discord.Guild):
+        return first.id
+    guild_id = getattr(first, 'guild_id', None)
+    if guild_id is None:
+        guild_id = getattr(getattr(first, 'guild', None), 'id', None)
+    return guild_id if isinstance(guild_id, int) else None
+
+
+class GuildConfig:
+    """All the cached settings of a single guild.
+
+    ``complete`` is only set once the guild was loaded through
+    :meth:`GuildConfigStore.fetch`, entries created by the eager
+    startup load only carry the fields that load knows about.
+    """
+
+    __slots__ = (
+        'guild_id',
+        'complete',
+        'prefixes',
+        'welcome_channel',
+        'counting',
+        'log_channels',
+        'loggings',
+        'snipe_enabled',
+        'modlog',
+        'muted_id',
+    )
+
+    def __init__(self, guild_id: int):
+        self.guild_id: int = guild_id
+        self.complete: bool = False
+        self.prefixes = None
+        self.welcome_channel: Optional[int] = None
+        self.counting: Optional[Dict[str, Any]] = None
+        self.log_channels = None
+        self.loggings: Optional[LoggingEventsFlags] = None
+        self.snipe_enabled: bool = False
+        self.modlog: Optional[int] = None
+        self.muted_id: Optional[int] = None
+
+
+class GuildConfigStore:
+    """Holds a :class:`GuildConfig` per guild.
+
+    With ``maxsize`` set the store is lazy: guilds are fetched
+    the first time they are needed and idle guilds are evicted
+    in LRU order. Without it, everything is kept resident and
+    only what ``populate_cache`` loads is known.
+    """
+
+    def __init__(self, bot: BaseDuck, maxsize: Optional[int] = None):
+        self.bot: BaseDuck = bot
+        self.maxsize: Optional[int] = maxsize
+        self._configs: MutableMapping[int, GuildConfig] = LRU(maxsize) if maxsize else {}
+        self._pending: Dict[int, asyncio.Task[GuildConfig]] = {}
+
+    @property
+    def lazy(self) -> bool:
+        return self.maxsize is not None
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def __iter__(self) -> Iterator[GuildConfig]:
+        return iter(list(self._configs.values()))
+
+    def usable(self, config: GuildConfig) -> bool:
+        # A lazy store only trusts what it fetched, partial entries come from writes to guilds it didn't load.
+        return not self.lazy or config.complete
+
+    def peek(self, guild_id: int) -> Optional[GuildConfig]:
+        """Returns the resident config, scheduling a fetch for it if the store is lazy and doesn't have it."""
+        config = self._configs.get(guild_id)
+        if config is not None and self.usable(config):
+            return config
+        if self.lazy:
+            self.prefetch(guild_id)
+        return None
+
+    def entry(self, guild_id: int) -> GuildConfig:
+        """Returns the resident config, creating an empty one if needed."""
+        try:
+            return self._configs[guild_id]
+        except KeyError:
+            config = self._configs[guild_id] = GuildConfig(guild_id)
+            return config
+
+    def prefetch(self, guild_id: int) -> asyncio.Task[GuildConfig]:
+        try:
+            return self._pending[guild_id]
+        except KeyError:
+            task = self._pending[guild_id] = asyncio.create_task(self._fetch(guild_id))
+            task.add_done_callback(lambda _: self._pending.pop(guild_id, None))
+            return task
+
+    async def get(self, guild_id: int) -> GuildConfig:
+        """Returns the complete config of a guild, fetching it if needed."""
+        config = self._configs.get(guild_id)
+        if config is not None and config.complete:
+            return config
+        return await self.prefetch(guild_id)
+
+    async def fetch(self, guild_id: int) -> GuildConfig:
+        return await self.prefetch(guild_id)
+
+    async def _fetch(self, guild_id: int) -> GuildConfig:
+        record = await self.bot.db.fetchrow(FETCH_QUERY, guild_id)
+        config = self.entry(guild_id)
+
+        config.prefixes = record['prefixes'] or self.bot.PRE
+        config.welcome_channel = record['welcome_channel']
+        config.snipe_enabled = bool(record['snipe_enabled'])
+        config.modlog = record['modlog']
+        config.muted_id = record['muted_id']
+
+        if record['count_channel'] is None:
+            config.counting = None
+        elif config.counting is None or config.counting['channel'] != record['count_channel']:
+            config.counting = {
+                "channel": record["count_channel"],
+                "number": record["current_number"],
+                "last_counter": record["last_counter"],
+                "delete_messages": record["delete_messages"],
+                "reset": record["reset_on_fail"],
+                "last_message_id": None,
+                "messages": deque(maxlen=100),
+            }
+
+        if record['logged']:
+            config.log_channels = self.bot.log_webhooks(
+                default=record["default_channel"],
+                message=record["message_channel"],
+                join_leave=record["join_leave_channel"],
+                member=record["member_channel"],
+                voice=record["voice_channel"],
+                server=record["server_channel"],
+            )
+            if record['has_events']:
+                config.loggings = LoggingEventsFlags(**{flag: record[flag] for flag in LoggingEventsFlags.VALID_FLAGS})
+            else:
+                config.loggings = LoggingEventsFlags.all()
+        else:
+            config.log_channels = None
+            config.loggings = None
+
+        config.complete = True
+        return config
+
+    def update(self, guild_id: int, **fields: Any) -> None:
+        """Updates a resident config after a write, guilds that aren't loaded get picked up on their next fetch."""
+        config = self._configs.get(guild_id)
+        if config is None:
+            return
+        for key, value in fields.items():
+            setattr(config, key, value)
+
+    def invalidate(self, guild_id: int) -> None:
+        try:
+            del self._configs[guild_id]
+        except KeyError:
+            pass
+
+    def mark_stale(self) -> None:
+        """Makes every resident config get fetched again the next time it is needed, e.g. after missed notifications.
+
+        Unlike clearing the store, this keeps the counting state that a fetch carries over.
+        """
+        for config in self._configs.values():
+            config.complete = False
+
+
+class GuildConfigView(MutableMapping[int, Any]):
+    """Exposes one field of the :class:`GuildConfigStore` as a dict keyed by guild ID.
+
+    This keeps ``bot.prefixes``, ``bot.log_channels`` and friends
+    working like the plain dicts they used to be.
+    """
+
+    __slots__ = ('store', 'field', 'keep_none')
+
+    def __init__(self, store: GuildConfigStore, field: str, *, keep_none: bool = False):
+        self.store: GuildConfigStore = store
+        self.field: str = field
+        # welcome_channels historically stored None for guilds without a channel.
+        self.keep_none: bool = keep_none
+
+    def __getitem__(self, guild_id: int) -> Any:
+        config = self.store.peek(guild_id)
+        if config is None:
+            raise KeyError(guild_id)
+        value = getattr(config, self.field)
+        if value is None and not self.keep_none:
+            raise KeyError(guild_id)
+        return value
+
+    def __setitem__(self, guild_id: int, value: Any) -> None:
+        setattr(self.store.entry(guild_id), self.field, value)
+
+    def __delitem__(self, guild_id: int) -> None:
+        config = self.store.peek(guild_id)
+        if config is None or (getattr(config, self.field) is None and not self.keep_none):
+            raise KeyError(guild_id)
+        setattr(config, self.field, None)
+
+    def __contains__(self, guild_id: object) -> bool:
+        try:
+            self[guild_id]  # type: ignore
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        return (
+            c.guild_id
+            for c in self.store
+            if self.store.usable(c) and (self.keep_none or getattr(c, self.field) is not None)
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'<GuildConfigView field={self.field!r} len={len(self)}>'
+
+    def reset(self, mapping: Dict[int, Any]) -> None:
+        """Replaces every value of this field with the given mapping."""
+        for config in self.store:
+            setattr(config, self.field, None)
+        for guild_id, value in mapping.items():
+            self[guild_id] = value
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple, Type, Union
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger("intents")
+
+# What the bot itself needs, regardless of the loaded cogs.
+BASE_INTENTS: Dict[str, str] = {
+    "guilds": "guild, channel and role cache",
+    "guild_messages": "prefix commands",
+    "dm_messages": "prefix commands and modmail in DMs",
+    "message_content": "prefix commands",
+}
+
+# Gateway events and the intents discord.py needs to dispatch them.
+EVENT_INTENTS: Dict[str, Tuple[str, ...]] = {
+    "on_member_join": ("members",),
+    "on_member_remove": ("members",),
+    "on_member_update": ("members",),
+    "on_user_update": ("members",),
+    "on_member_ban": ("bans",),
+    "on_member_unban": ("bans",),
+    "on_guild_emojis_update": ("emojis_and_stickers",),
+    "on_guild_stickers_update": ("emojis_and_stickers",),
+    "on_invite_create": ("invites",),
+    "on_invite_delete": ("invites",),
+    "on_voice_state_update": ("voice_states",),
+    "on_presence_update": ("presences",),
+    "on_webhooks_update": ("webhooks",),
+    "on_message": ("guild_messages", "dm_messages"),
+    "on_message_edit": ("guild_messages", "dm_messages"),
+    "on_message_delete": ("guild_messages", "dm_messages"),
+    "on_raw_message_edit": ("guild_messages", "dm_messages"),
+    "on_raw_message_delete": ("guild_messages", "dm_messages"),
+    "on_raw_bulk_message_delete": ("guild_messages",),
+    "on_reaction_add": ("guild_reactions", "dm_reactions"),
+    "on_reaction_remove": ("guild_reactions", "dm_reactions"),
+    "on_raw_reaction_add": ("guild_reactions", "dm_reactions"),
+    "on_raw_reaction_remove": ("guild_reactions", "dm_reactions"),
+    "on_typing": ("guild_typing", "dm_typing"),
+    "on_raw_typing": ("guild_typing", "dm_typing"),
+}
+
+# {intent: {cog name: reason}}
+IntentRequirements = Dict[str, Dict[str, str]]
+
+
+def disabled_intents() -> Set[str]:
+    """Intents turned off for this deployment through ``DISABLED_INTENTS``, e.g. ``presences,typing``."""
+    return {name.strip() for name in (os.getenv("DISABLED_INTENTS") or "").split(",") if name.strip()}
+
+
+CogLike = Union[commands.Cog, Type[commands.Cog]]
+
+
+def cog_intents(cog: CogLike) -> Dict[str, str]:
+    """The intents a cog (or cog class) needs, and why.
+
+    Listeners are mapped through :data:`EVENT_INTENTS`, everything else
+    (e.g. reading ``member.activities`` in a command) is declared with
+    an ``__intents__ = {"presences": "reason"}`` class attribute, which
+    is merged across the mixins a cog is made of. Commands can declare
+    one too, see :func:`command_intents`.
+    """
+    klass = cog if isinstance(cog, type) else type(cog)
+    needed: Dict[str, str] = {}
+    for base in klass.__mro__:
+        for intent, reason in vars(base).get("__intents__", {}).items():
+            needed.setdefault(intent, reason)
+        for value in vars(base).values():
+            if isinstance(value, commands.Command):
+                for intent, reason in getattr(value.callback, "__intents__", {}).items():
+                    needed.setdefault(intent, reason)
+    for event, _ in klass.__cog_listeners__:
+        for intent in EVENT_INTENTS.get(event, ()):
+            needed.setdefault(intent, event)
+    return needed
+
+
+def command_intents(**intents: str):
+    """Declares the intents a command needs, e.g. ``@command_intents(members="chunking the guild")``.
+
+    Goes under the command decorator, like checks do.
+    """
+
+    def decorator(func):
+        func.__intents__ = {**getattr(func, "__intents__", {}), **intents}
+        return func
+
+    return decorator
+
+
+def extension_cogs(names: Iterable[str]) -> List[Type[commands.Cog]]:
+    """The cog classes the extensions will add, found by importing them without calling ``setup``.
+
+    Mixins are skipped, only the classes no other cog of the extension
+    derives from are kept. Extensions that fail to import are left to
+    ``load_extension`` to report.
+    """
+    classes: List[Type[commands.Cog]] = []
+    for name in names:
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            log.debug("Could not import %s to collect its intents", name, exc_info=e)
+            continue
+        found = [
+            value
+            for value in vars(module).values()
+            if isinstance(value, type)
+            and issubclass(value, commands.Cog)
+            and (value.__module__ == name or value.__module__.startswith(f"{name}."))
+        ]
+        classes.extend(c for c in found if not any(c is not other and issubclass(other, c) for other in found))
+    return classes
+
+
+def collect_requirements(cogs: Iterable[CogLike]) -> IntentRequirements:
+    required: IntentRequirements = defaultdict(dict)
+    for intent, reason in BASE_INTENTS.items():
+        required[intent]["bot"] = reason
+    for cog in cogs:
+        for intent, reason in cog_intents(cog).items():
+            required[intent][cog.__cog_name__] = reason
+    return dict(required)
+
+
+def build_intents(required: Iterable[str], disabled: Iterable[str] = ()) -> discord.Intents:
+    intents = discord.Intents.none()
+    disabled = set(disabled)
+    for name in required:
+        if name not in disabled:
+            setattr(intents, name, True)
+    return intents
+
+
+def format_report(required: IntentRequirements, intents: discord.Intents) -> Iterable[str]:
+    for intent in sorted(required):
+        state = "on" if getattr(intents, intent) else "disabled"
+        users = ", ".join(f"{cog} ({reason})" for cog, reason in required[intent].items())
+        yield f"{intent} [{state}]: {users}"
+    unused = sorted(name for name, requested in build_intents(required) if not requested)
+    if unused:
+        yield f"not requested: {', '.join(unused)}"
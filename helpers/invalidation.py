@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("invalidation")
+
+CHANNEL = "duckbot_cache"
+HEALTH_CHECK_INTERVAL = 60
+MAX_BACKOFF = 60
+
+# table: (key column, columns whose updates don't need to reach other processes)
+WATCHED_TABLES: Dict[str, Tuple[str, ...]] = {
+    "pre": ("guild_id",),
+    "guilds": ("guild_id",),
+    "count_settings": ("guild_id", "current_number", "last_counter"),
+    "counting": ("guild_id",),
+    "log_channels": ("guild_id",),
+    "logging_events": ("guild_id",),
+    "plonks": ("guild_id",),
+    "command_config": ("guild_id",),
+    "blacklist": ("user_id",),
+    "suggestions": ("channel_id",),
+    "afk": ("user_id",),
+}
+
+# NOTIFY is sent on commit, so other processes never refetch uncommitted data.
+TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION duckbot_notify_cache() RETURNS trigger AS $$
+DECLARE
+    ignored text[] := TG_ARGV[1:];
+    payload jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        payload := to_jsonb(OLD);
+    ELSE
+        payload := to_jsonb(NEW);
+        IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) - ignored) = (payload - ignored) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+    PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME || ':' || (payload ->> TG_ARGV[0]));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+Handler = Callable[[str], Union[Awaitable[Any], Any]]
+
+
+class InvalidationBus:
+    """Keeps the config caches of several bot processes in sync.
+
+    Triggers on the config tables send ``NOTIFY duckbot_cache, '<table>:<key>'``
+    for every committed change, whoever made it. Each process keeps its own
+    connection, outside of the pool, listening on that channel and hands the key to the
+    handlers registered for the table. If the connection drops,
+    notifications may have been missed, so the resync handlers run
+    once it is back.
+    """
+
+    def __init__(self, bot: BaseDuck):
+        self.bot: BaseDuck = bot
+        self.handlers: Dict[str, List[Handler]] = {}
+        self.resync_handlers: List[Callable[[], Awaitable[Any]]] = []
+        self.received: int = 0
+        self.resyncs: int = 0
+        self.connected: bool = False
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def on(self, table: str, handler: Handler) -> None:
+        self.handlers.setdefault(table, []).append(handler)
+
+    def remove(self, table: str, handler: Handler) -> None:
+        handlers = self.handlers.get(table, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def on_resync(self, handler: Callable[[], Awaitable[Any]]) -> None:
+        self.resync_handlers.append(handler)
+
+    def remove_resync(self, handler: Callable[[], Awaitable[Any]]) -> None:
+        if handler in self.resync_handlers:
+            self.resync_handlers.remove(handler)
+
+    async def publish(self, table: str, key: Any) -> None:
+        """Notifies every process (including this one) about a change the triggers can't see."""
+        await self.bot.db.execute("SELECT pg_notify($1, $2)", CHANNEL, f"{table}:{key}")
+
+    async def install_triggers(self) -> None:
+        """Creates the triggers that are missing or have outdated arguments.
+
+        Replacing a trigger locks its table, so the ones that are already
+        up to date are left alone.
+        """
+        async with self.bot.db.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT c.relname, t.tgargs FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid "
+                "WHERE t.tgname = 'duckbot_cache_notify' AND c.relnamespace = 'public'::regnamespace"
+            )
+            installed = {row["relname"]: bytes(row["tgargs"]) for row in rows}
+            async with conn.transaction():
+                await conn.execute(TRIGGER_FUNCTION)
+                for table, (key, *ignored) in WATCHED_TABLES.items():
+                    # tgargs holds every argument followed by a NUL byte.
+                    if installed.get(table) == b"".join(arg.encode() + b"\0" for arg in (key, *ignored)):
+                        continue
+                    args = ", ".join(f"'{arg}'" for arg in (key, *ignored))
+                    await conn.execute(f"DROP TRIGGER IF EXISTS duckbot_cache_notify ON {table}")
+                    await conn.execute(
+                        f"CREATE TRIGGER duckbot_cache_notify AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                        f"FOR EACH ROW EXECUTE FUNCTION duckbot_notify_cache({args})"
+                    )
+                    log.info("Installed the cache invalidation trigger on %s", table)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="invalidation-bus")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _on_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self.received += 1
+        table, _, key = payload.partition(":")
+        for handler in self.handlers.get(table, []):
+            asyncio.create_task(self._call(handler, table, key))
+
+    async def _call(self, handler: Handler, table: str, key: str) -> None:
+        try:
+            result = handler(key)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            log.error("Invalidation handler for %s:%s failed", table, key, exc_info=e)
+
+    async def resync(self) -> None:
+        self.resyncs += 1
+        log.info("Resyncing caches after the invalidation listener reconnected")
+        for handler in self.resync_handlers:
+            try:
+                await handler()
+            except Exception as e:
+                log.error("Cache resync handler %r failed", handler, exc_info=e)
+
+    async def _connect(self) -> asyncpg.Connection:
+        # Not one of the pool's connections, listening keeps it checked out for as long as the bot runs.
+        return await asyncpg.connect(
+            user=os.getenv("PSQL_USER"),
+            password=os.getenv("PSQL_PASSWORD"),
+            database=os.getenv("PSQL_DB"),
+            host=os.getenv("PSQL_HOST"),
+            port=os.getenv("PSQL_PORT"),
+        )
+
+    async def _run(self) -> None:
+        try:
+            await self.install_triggers()
+        except asyncpg.PostgresError as e:
+            log.error("Could not install the cache invalidation triggers", exc_info=e)
+
+        backoff = 1
+        first = True
+        while not self.bot.is_closed():
+            lost = asyncio.Event()
+            try:
+                conn = await self._connect()
+                try:
+                    conn.add_termination_listener(lambda _, lost=lost: lost.set())
+                    await conn.add_listener(CHANNEL, self._on_notify)
+                    self.connected = True
+                    backoff = 1
+                    if not first:
+                        await self.resync()
+
+                    while not lost.is_set():
+                        try:
+                            await asyncio.wait_for(lost.wait(), timeout=HEALTH_CHECK_INTERVAL)
+                        except asyncio.TimeoutError:
+                            # A connection that died silently never terminates, so ask it.
+                            await conn.fetchval("SELECT 1", timeout=10)
+                finally:
+                    conn.terminate()
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                log.warning("Invalidation listener lost its connection, reconnecting in %ss", backoff, exc_info=e)
+            finally:
+                self.connected = False
+
+            first = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
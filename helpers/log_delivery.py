@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import datetime
+import logging
+import os
+import time
+from collections import Counter, deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import discord
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("log_delivery")
+
+# Discord allows about 5 requests per 2 seconds on a webhook.
+WEBHOOK_RATE = 5
+WEBHOOK_PER = 2.0
+# Per message, the characters are counted across every embed's text.
+MAX_EMBEDS = 10
+MAX_MESSAGE_CHARS = 6000
+MAX_FIELDS = 25
+
+NotFoundHandler = Callable[..., Awaitable[Any]]
+_Job = Tuple[int, str, str, List[discord.Embed]]
+
+
+def split_embed(embed: discord.Embed, limit: int = MAX_MESSAGE_CHARS) -> List[discord.Embed]:
+    """Splits an embed too long to be sent, moving the fields that don't fit to continuation embeds."""
+    if len(embed) <= limit:
+        return [embed]
+    head = embed.copy()
+    head.clear_fields()
+    if len(head) > limit and head.description:
+        room = len(head.description) - (len(head) - limit) - 1
+        head.description = head.description[: max(room, 0)] + "…"
+    parts = [head]
+    for field in embed.fields:
+        part = parts[-1]
+        if len(part) + len(field.name or "") + len(field.value or "") > limit or len(part.fields) >= MAX_FIELDS:
+            part = discord.Embed(title=f"{embed.title or ''} (continued)".strip(), colour=embed.colour)
+            part.timestamp = embed.timestamp
+            parts.append(part)
+        part.add_field(name=field.name, value=field.value, inline=field.inline)
+    return parts
+
+
+class LogRecord(abc.ABC):
+    """An event queued for a log channel, only turned into an embed right before it is sent.
+
+    Listeners keep just what the embed needs, so logs that end up
+    dropped cost no formatting at all. Subclasses implement
+    :meth:`to_embed`, and records with a :attr:`key` can override
+    :meth:`merge` to combine their changes.
+    """
+
+    __slots__ = ("created_at",)
+
+    # What the event is called in summaries, like "Message edited".
+    kind: str = "log"
+
+    def __init__(self):
+        self.created_at: datetime.datetime = discord.utils.utcnow()
+
+    @property
+    def key(self) -> Optional[Hashable]:
+        """What the record is about. Records of a guild with the same key, logged close together, are merged."""
+        return None
+
+    def merge(self, newer: LogRecord) -> None:
+        """Folds a newer record with the same key into this one, only called for records whose key isn't None.
+
+        By default the newer record's fields replace these, only the time of the first event is kept.
+        """
+        for klass in type(newer).__mro__:
+            for name in vars(klass).get("__slots__", ()):
+                if name != "created_at":
+                    setattr(self, name, getattr(newer, name))
+
+    @abc.abstractmethod
+    def to_embed(self) -> discord.Embed:
+        ...
+
+
+Loggable = Union[discord.Embed, LogRecord]
+
+
+def _kind(item: Loggable) -> str:
+    return ((item.title if isinstance(item, discord.Embed) else item.kind) or "log").rstrip(":")
+
+
+class DroppedLogs(LogRecord):
+    """Stands in for the logs a full queue dropped, and becomes a summary embed once delivered."""
+
+    __slots__ = ("count", "last", "events")
+
+    kind = "Logs dropped"
+
+    def __init__(self):
+        super().__init__()
+        self.count: int = 0
+        self.last: datetime.datetime = self.created_at
+        self.events: Counter[str] = Counter()
+
+    def add(self, item: Loggable) -> None:
+        self.count += 1
+        self.last = discord.utils.utcnow()
+        self.events[_kind(item)] += 1
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def to_embed(self) -> discord.Embed:
+        name = next(iter(self.events)) if len(self.events) == 1 else "log"
+        start, end = discord.utils.format_dt(self.created_at, "T"), discord.utils.format_dt(self.last, "T")
+        embed = discord.Embed(
+            title=self.kind,
+            colour=discord.Colour.dark_grey(),
+            description=f"{self.count} further {name} events dropped between {start} and {end}, "
+            f"because they came in faster than they could be delivered.",
+            timestamp=self.last,
+        )
+        if len(self.events) > 1:
+            embed.add_field(name="Events", value="\n".join(f"{n}× {e}" for e, n in self.events.most_common(10))[:1024])
+        return embed
+
+
+class LogQueue:
+    """A bounded FIFO of one guild's logs of one type.
+
+    Once ``limit`` logs are waiting, new ones are not kept, only counted
+    in a :class:`DroppedLogs` placed at the tail, which is delivered in
+    their place as a single summary embed. Embeds are measured once, when
+    queued or when a record is rendered, and ones too long for a message
+    are split up.
+    """
+
+    __slots__ = ("limit", "dropped", "_items")
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit: int = limit or int(os.getenv("LOG_QUEUE_SIZE") or 500)
+        self.dropped: int = 0
+        # (length, embed) pairs, records have no length until they are rendered.
+        self._items: Deque[Tuple[Optional[int], Loggable]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def append(self, item: Loggable) -> None:
+        items = self._items
+        if len(items) < self.limit:
+            if isinstance(item, LogRecord):
+                items.append((None, item))
+            else:
+                items.extend((len(part), part) for part in split_embed(item))
+            return
+        self.dropped += 1
+        # The summary is allowed one slot past the limit, and absorbs every drop until the queue moves again.
+        if not items or not isinstance(items[-1][1], DroppedLogs):
+            items.append((None, DroppedLogs()))
+        items[-1][1].add(item)  # type: ignore
+
+    def pop_batch(self, size: int = MAX_EMBEDS, chars: int = MAX_MESSAGE_CHARS) -> List[discord.Embed]:
+        """The oldest embeds that fit in one message, at most ``size`` of them and ``chars`` characters long.
+
+        Logs keep their order, so a batch ends at the first embed that
+        doesn't fit, which leaves as little room unused as the order allows.
+        """
+        items = self._items
+        batch: List[discord.Embed] = []
+        total = 0
+        while items and len(batch) < size:
+            length, item = items[0]
+            if length is None:
+                items.popleft()
+                if not item:
+                    # Records that merged into no change at all, or a summary with nothing dropped.
+                    continue
+                try:
+                    parts = split_embed(item.to_embed())  # type: ignore
+                except Exception as e:
+                    log.error("Failed to render a %s log", _kind(item), exc_info=e)
+                    continue
+                items.extendleft((len(part), part) for part in reversed(parts))
+                continue
+            if batch and total + length > chars:
+                break
+            items.popleft()
+            batch.append(item)  # type: ignore
+            total += length
+        return batch
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class WebhookBucket:
+    """A sliding window of the last sends on one webhook."""
+
+    __slots__ = ("sent", "busy")
+
+    def __init__(self):
+        self.sent: Deque[float] = deque(maxlen=WEBHOOK_RATE)
+        self.busy: bool = False
+
+    def available_in(self, now: float) -> float:
+        if len(self.sent) < WEBHOOK_RATE:
+            return 0.0
+        return max(self.sent[0] + WEBHOOK_PER - now, 0.0)
+
+
+class LogDelivery:
+    """Sends the logs queued in ``bot.log_cache`` through the guilds' log webhooks.
+
+    A fixed number of workers share the work. Guilds with pending logs
+    take turns in a round-robin, and each turn sends one message's worth
+    of embeds, so a busy guild can't hold up the others. A webhook only
+    has one request in flight, and is skipped while its rate limit bucket
+    is empty, so a slow or limited webhook only delays its own logs.
+    ``Webhook`` objects are created once per URL and reused.
+
+    Records with a :attr:`~LogRecord.key` are held for
+    ``LOG_COALESCE_SECONDS`` (2 by default, 0 disables it) before being
+    queued, and the records with the same key logged meanwhile are merged
+    into them, so a burst of updates to one member, role or voice state
+    becomes a single log of the net change.
+    """
+
+    def __init__(self, bot: BaseDuck, *, workers: Optional[int] = None):
+        self.bot: BaseDuck = bot
+        self.workers: int = workers or int(os.getenv("LOG_DELIVERY_WORKERS") or 4)
+        self.coalesce_window: float = float(os.getenv("LOG_COALESCE_SECONDS") or 2)
+        # Called with embeds, deliver_type and guild_id when a webhook was deleted.
+        self.on_not_found: Optional[NotFoundHandler] = None
+        self._ready: Deque[int] = deque()
+        self._queued: Set[int] = set()
+        self._buckets: Dict[str, WebhookBucket] = {}
+        self._webhooks: Dict[str, discord.Webhook] = {}
+        self._held: Dict[Tuple[int, str, Hashable], LogRecord] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task[None]] = []
+
+        self.sent: int = 0
+        self.failed: int = 0
+        self.deferred: int = 0
+        self.coalesced: int = 0
+
+    @property
+    def pending_guilds(self) -> int:
+        return len(self._ready)
+
+    @property
+    def cached_webhooks(self) -> int:
+        return len(self._webhooks)
+
+    @property
+    def held(self) -> int:
+        return len(self._held)
+
+    def queue_stats(self) -> Dict[str, Tuple[int, int]]:
+        """(queued, dropped) per log type, across every guild."""
+        stats: Dict[str, Tuple[int, int]] = {}
+        for caches in list(self.bot.log_cache.values()):
+            for deliver_type, queue in caches.items():
+                queued, dropped = stats.get(deliver_type, (0, 0))
+                stats[deliver_type] = (queued + len(queue), dropped + queue.dropped)
+        return stats
+
+    def collect_metrics(self) -> Iterable[str]:
+        stats = self.queue_stats()
+        yield "# TYPE duckbot_log_queue_depth gauge"
+        for deliver_type, (queued, _) in stats.items():
+            yield f'duckbot_log_queue_depth{{type="{deliver_type}"}} {queued}'
+        yield "# TYPE duckbot_log_queue_dropped_total counter"
+        for deliver_type, (_, dropped) in stats.items():
+            yield f'duckbot_log_queue_dropped_total{{type="{deliver_type}"}} {dropped}'
+        yield "# TYPE duckbot_log_delivered_total counter"
+        yield f"duckbot_log_delivered_total {self.sent}"
+        yield "# TYPE duckbot_log_failed_total counter"
+        yield f"duckbot_log_failed_total {self.failed}"
+        yield "# TYPE duckbot_log_coalesced_total counter"
+        yield f"duckbot_log_coalesced_total {self.coalesced}"
+
+    def log(self, guild_id: int, deliver_type: str, item: Loggable) -> None:
+        """Queues a log for a guild's ``deliver_type`` channel."""
+        key = item.key if isinstance(item, LogRecord) and self.coalesce_window > 0 else None
+        if key is None:
+            self._enqueue(guild_id, deliver_type, item)
+            return
+        held_key = (guild_id, deliver_type, key)
+        held = self._held.get(held_key)
+        if held is not None:
+            held.merge(item)  # type: ignore
+            self.coalesced += 1
+            return
+        self._held[held_key] = item  # type: ignore
+        asyncio.get_running_loop().call_later(self.coalesce_window, self._release, held_key)
+
+    def _release(self, held_key: Tuple[int, str, Hashable]) -> None:
+        record = self._held.pop(held_key, None)
+        # Merged changes can cancel out, like a role added and removed again.
+        if record:
+            self._enqueue(held_key[0], held_key[1], record)
+
+    def _enqueue(self, guild_id: int, deliver_type: str, item: Loggable) -> None:
+        self.bot.log_cache[guild_id][deliver_type].append(item)
+        self.notify(guild_id)
+
+    def notify(self, guild_id: int) -> None:
+        """Marks a guild as having logs to send."""
+        if guild_id not in self._queued:
+            self._queued.add(guild_id)
+            self._ready.append(guild_id)
+        self._wakeup.set()
+
+    def webhook(self, url: str) -> discord.Webhook:
+        try:
+            return self._webhooks[url]
+        except KeyError:
+            webhook = self._webhooks[url] = discord.Webhook.from_url(
+                url, bot_token=self.bot.http.token, session=self.bot.session
+            )
+            return webhook
+
+    def forget(self, url: str) -> None:
+        self._webhooks.pop(url, None)
+        self._buckets.pop(url, None)
+
+    def _next_job(self) -> Tuple[Optional[_Job], float]:
+        """The next batch to send, or how long until a rate limited webhook frees up."""
+        now = time.monotonic()
+        wait = WEBHOOK_PER
+        for _ in range(len(self._ready)):
+            guild_id = self._ready.popleft()
+            webhooks = self.bot.log_channels.get(guild_id)
+            caches = self.bot.log_cache.get(guild_id)
+            if webhooks is None or not caches or not any(caches.values()):
+                self._queued.discard(guild_id)
+                continue
+
+            job = None
+            for deliver_type, queue in caches.items():
+                if not queue:
+                    continue
+                # Types without their own channel go to the default one, like create_and_deliver expects.
+                target = deliver_type if getattr(webhooks, deliver_type, None) else "default"
+                url = getattr(webhooks, target, None)
+                if not url:
+                    # Nowhere to deliver these, same as when the guild has no log channels.
+                    queue.clear()
+                    continue
+                bucket = self._buckets.get(url)
+                if bucket is None:
+                    bucket = self._buckets[url] = WebhookBucket()
+                if bucket.busy:
+                    continue
+                available_in = bucket.available_in(now)
+                if available_in:
+                    self.deferred += 1
+                    wait = min(wait, available_in)
+                    continue
+                batch = queue.pop_batch()
+                if not batch:
+                    # Everything left rendered to nothing, the queue is empty now and the token stays unspent.
+                    continue
+                # Move this type to the back, so the guild's other types get the next turns.
+                caches[deliver_type] = caches.pop(deliver_type)
+                bucket.busy = True
+                bucket.sent.append(now)
+                job = (guild_id, target, url, batch)
+                break
+
+            if any(caches.values()):
+                self._ready.append(guild_id)
+            else:
+                self._queued.discard(guild_id)
+            if job is not None:
+                return job, 0.0
+        return None, wait
+
+    async def _send(self, guild_id: int, deliver_type: str, url: str, embeds: List[discord.Embed]) -> None:
+        try:
+            await self.webhook(url).send(embeds=embeds)
+            self.sent += len(embeds)
+        except discord.NotFound:
+            self.failed += len(embeds)
+            self.forget(url)
+            if self.on_not_found is not None:
+                asyncio.create_task(self.on_not_found(embeds=embeds, deliver_type=deliver_type, guild_id=guild_id))
+        except (discord.HTTPException, ValueError, OSError, asyncio.TimeoutError) as e:
+            self.failed += len(embeds)
+            log.warning("Failed to deliver %s logs to guild %s", deliver_type, guild_id, exc_info=e)
+        finally:
+            bucket = self._buckets.get(url)
+            if bucket is not None:
+                bucket.busy = False
+            self._wakeup.set()
+
+    async def _worker(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    # Nothing sendable: sleep until new logs arrive, a send finishes or a bucket refills.
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait if self._ready else None)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._send(*job)
+            except Exception as e:
+                log.error("Unexpected error while delivering logs", exc_info=e)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        # Anything queued while the workers were stopped.
+        for guild_id, caches in list(self.bot.log_cache.items()):
+            if any(caches.values()):
+                self.notify(guild_id)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"log-delivery:{i}") for i in range(self.workers)]
+
+    def stop(self) -> None:
+        # Queued, so nothing held is lost if the workers start again.
+        for held_key in list(self._held):
+            self._release(held_key)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
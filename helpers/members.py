@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import discord
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+    from helpers.context import CustomContext
+
+log = logging.getLogger("members")
+
+T = TypeVar("T")
+
+SWEEP_INTERVAL = 300
+# Guilds caching fewer members than this are not worth evicting.
+EVICT_FLOOR = 50
+
+
+class MemberResidency:
+    """Decides which guilds keep their full member list in memory.
+
+    Commands that need every member call :meth:`ensure` (or use
+    :func:`needs_members`), which chunks the guild on demand. Guilds
+    nobody needed for ``idle_after`` seconds have their member cache
+    dropped by :meth:`sweep`, and ``max_members`` caps the total number
+    of resident members by evicting the least recently used guilds.
+    """
+
+    def __init__(self, bot: BaseDuck, *, max_members: Optional[int] = None, idle_after: float = 1800):
+        self.bot: BaseDuck = bot
+        self.max_members: Optional[int] = max_members
+        self.idle_after: float = idle_after
+        self._last_used: Dict[int, float] = {}
+        self._chunking: Dict[int, asyncio.Task[Any]] = {}
+
+        self.chunks: int = 0
+        self.evictions: int = 0
+        self.evicted_members: int = 0
+
+    @classmethod
+    def from_env(cls, bot: BaseDuck) -> MemberResidency:
+        return cls(
+            bot,
+            max_members=int(os.getenv("MEMBER_CACHE_LIMIT") or 0) or None,
+            idle_after=float(os.getenv("MEMBER_IDLE_MINUTES") or 30) * 60,
+        )
+
+    @staticmethod
+    def resident(guild: discord.Guild) -> int:
+        # guild.members builds a list, we only want the count.
+        return len(guild._members)
+
+    @property
+    def total_resident(self) -> int:
+        return sum(self.resident(g) for g in self.bot.guilds)
+
+    def idle_for(self, guild: discord.Guild) -> Optional[float]:
+        last_used = self._last_used.get(guild.id)
+        return None if last_used is None else time.monotonic() - last_used
+
+    async def ensure(self, guild: discord.Guild) -> None:
+        """Makes sure every member of the guild is cached, chunking it if needed."""
+        self._last_used[guild.id] = time.monotonic()
+        if guild.chunked:
+            return
+
+        task = self._chunking.get(guild.id)
+        if task is None:
+            task = self._chunking[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+            task.add_done_callback(lambda _: self._chunking.pop(guild.id, None))
+            self.chunks += 1
+        await asyncio.shield(task)
+        self.enforce_limit(keep=guild.id)
+
+    def evict(self, guild: discord.Guild) -> int:
+        """Drops the guild's member cache, except for ourselves and members in voice."""
+        members = guild._members
+        before = len(members)
+        keep = {self.bot.user.id, *guild._voice_states}
+        kept = {member_id: members[member_id] for member_id in keep if member_id in members}
+        members.clear()
+        members.update(kept)
+
+        self._last_used.pop(guild.id, None)
+        dropped = before - len(kept)
+        self.evictions += 1
+        self.evicted_members += dropped
+        return dropped
+
+    def _eviction_order(self) -> List[Tuple[float, discord.Guild]]:
+        # Guilds that were never needed come first, then the least recently used.
+        return sorted(
+            ((self._last_used.get(g.id, 0.0), g) for g in self.bot.guilds if self.resident(g) > EVICT_FLOOR),
+            key=lambda pair: pair[0],
+        )
+
+    def enforce_limit(self, *, keep: Optional[int] = None) -> None:
+        if self.max_members is None:
+            return
+        total = self.total_resident
+        for _, guild in self._eviction_order():
+            if total <= self.max_members:
+                break
+            if guild.id == keep or guild.id in self._chunking:
+                continue
+            total -= self.evict(guild)
+
+    def sweep(self) -> None:
+        start = time.perf_counter()
+        now = time.monotonic()
+        dropped = 0
+        for last_used, guild in self._eviction_order():
+            if now - last_used < self.idle_after or guild.id in self._chunking:
+                continue
+            dropped += self.evict(guild)
+        self.enforce_limit()
+        if dropped:
+            log.info("Evicted %s idle members in %.2fms", dropped, (time.perf_counter() - start) * 1000)
+
+
+def needs_members() -> Callable[[T], T]:
+    """Chunks the invoking guild before the command's arguments are converted, so member converters see everyone.
+
+    This is a check, so it runs before conversion and adds to the command's
+    other checks and hooks instead of replacing them. Checks run in the order
+    they were added, keep it after the permission checks so only invocations
+    that passed them chunk the guild.
+    """
+
+    async def predicate(ctx: CustomContext) -> bool:
+        # Help and the error handler call can_run on commands nobody invoked, those must not chunk.
+        invoked = (ctx.invoked_with or '').lower()
+        if ctx.guild is not None and invoked in (ctx.command.name, *ctx.command.aliases):
+            await ctx.bot.member_residency.ensure(ctx.guild)
+        return True
+
+    return commands.check(predicate)
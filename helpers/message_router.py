@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Collection, Dict, List, Optional, Set, TypeVar, Union
+
+import discord
+
+from helpers.db_usage import usage as db_usage
+
+if TYPE_CHECKING:
+    from discord.ext import commands
+
+    from helpers.bot_base import BaseDuck
+
+T = TypeVar("T", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+# Either a static collection of IDs, or the name of a bot attribute
+# whose keys are looked up on every message (e.g. "suggestion_channels").
+IdFilter = Union[Collection[int], str, None]
+
+
+class MessageRoute:
+    """A single ``on_message`` handler and the messages it is interested in."""
+
+    __slots__ = (
+        'name',
+        'cog',
+        'callback',
+        'channels',
+        'guilds',
+        'dm_only',
+        'guild_only',
+        'mentions',
+        'afk_author',
+        'ignore_bots',
+        'owner_only',
+        'received',
+    )
+
+    def __init__(self, cog: commands.Cog, callback: Callable[[discord.Message], Coroutine[Any, Any, Any]], **options: Any):
+        self.name: str = f'{type(cog).__name__}.{callback.__name__}'
+        self.cog: commands.Cog = cog
+        self.callback = callback
+        self.channels: IdFilter = options['channels']
+        self.guilds: IdFilter = options['guilds']
+        self.dm_only: bool = options['dm_only']
+        self.guild_only: bool = options['guild_only']
+        self.mentions: bool = options['mentions']
+        self.afk_author: bool = options['afk_author']
+        self.ignore_bots: bool = options['ignore_bots']
+        self.owner_only: bool = options['owner_only']
+        self.received: int = 0
+
+    def describe(self) -> str:
+        parts = []
+        for attr in ('channels', 'guilds'):
+            value = getattr(self, attr)
+            if isinstance(value, str):
+                parts.append(f'{attr}=bot.{value}')
+            elif value is not None:
+                parts.append(f'{attr}={len(value)} ids')
+        flags = ('dm_only', 'guild_only', 'mentions', 'afk_author', 'ignore_bots', 'owner_only')
+        parts.extend(flag for flag in flags if getattr(self, flag))
+        return ', '.join(parts) or 'all messages'
+
+
+def message_route(
+    *,
+    channels: IdFilter = None,
+    guilds: IdFilter = None,
+    dm_only: bool = False,
+    guild_only: bool = False,
+    mentions: bool = False,
+    afk_author: bool = False,
+    ignore_bots: bool = False,
+    owner_only: bool = False,
+) -> Callable[[T], T]:
+    """Marks a cog method as an ``on_message`` handler for the :class:`MessageRouter`.
+
+    The handler is only called for messages that pass every filter given,
+    so it does not need to repeat those checks itself.
+    """
+
+    def decorator(func: T) -> T:
+        func.__message_route__ = dict(  # type: ignore
+            channels=channels,
+            guilds=guilds,
+            dm_only=dm_only,
+            guild_only=guild_only,
+            mentions=mentions,
+            afk_author=afk_author,
+            ignore_bots=ignore_bots,
+            owner_only=owner_only,
+        )
+        return func
+
+    return decorator
+
+
+class MessageRouter:
+    """Dispatches ``on_message`` to the routed cog handlers that want the message.
+
+    Routes with static channel or guild IDs are indexed by those IDs.
+    Routes filtering on a bot attribute are grouped by that attribute,
+    which is looked up once per message for the whole group. A message
+    only ever looks at the handlers registered for where it was sent,
+    plus the handlers that filter on something else.
+    """
+
+    def __init__(self, bot: BaseDuck):
+        self.bot: BaseDuck = bot
+        self.routes: Dict[str, MessageRoute] = {}
+        self.dispatched: int = 0
+        self._by_channel: defaultdict[int, List[MessageRoute]] = defaultdict(list)
+        self._by_guild: defaultdict[int, List[MessageRoute]] = defaultdict(list)
+        # Keyed by the name of the bot attribute holding the IDs.
+        self._by_channel_attr: defaultdict[str, List[MessageRoute]] = defaultdict(list)
+        self._by_guild_attr: defaultdict[str, List[MessageRoute]] = defaultdict(list)
+        self._dm: List[MessageRoute] = []
+        self._other: List[MessageRoute] = []
+
+    def add_cog(self, cog: commands.Cog) -> None:
+        seen: Set[str] = set()
+        for klass in type(cog).__mro__:
+            for name, attr in vars(klass).items():
+                if name in seen or not hasattr(attr, '__message_route__'):
+                    continue
+                seen.add(name)
+                self.add_route(MessageRoute(cog, getattr(cog, name), **attr.__message_route__))
+
+    def remove_cog(self, cog: commands.Cog) -> None:
+        for route in [r for r in self.routes.values() if r.cog is cog]:
+            self.remove_route(route)
+
+    def _buckets(self, route: MessageRoute) -> List[List[MessageRoute]]:
+        if isinstance(route.channels, str):
+            return [self._by_channel_attr[route.channels]]
+        if route.channels is not None:
+            return [self._by_channel[channel_id] for channel_id in route.channels]
+        if isinstance(route.guilds, str):
+            return [self._by_guild_attr[route.guilds]]
+        if route.guilds is not None:
+            return [self._by_guild[guild_id] for guild_id in route.guilds]
+        if route.dm_only:
+            return [self._dm]
+        return [self._other]
+
+    def add_route(self, route: MessageRoute) -> None:
+        self.routes[route.name] = route
+        for bucket in self._buckets(route):
+            bucket.append(route)
+
+    def remove_route(self, route: MessageRoute) -> None:
+        self.routes.pop(route.name, None)
+        for bucket in self._buckets(route):
+            bucket.remove(route)
+
+    def _matches(self, route: MessageRoute, message: discord.Message) -> bool:
+        if route.ignore_bots and message.author.bot:
+            return False
+        guild = message.guild
+        if route.guild_only and guild is None:
+            return False
+        if route.dm_only and guild is not None:
+            return False
+        if route.mentions and not message.mentions:
+            return False
+        if route.afk_author and message.author.id not in self.bot.afk_users:
+            return False
+        # Routes are indexed by channels before guilds, so only a channel-indexed route still needs its guilds checked.
+        if route.channels is not None and route.guilds is not None:
+            guilds = getattr(self.bot, route.guilds) if isinstance(route.guilds, str) else route.guilds
+            if guild is None or guild.id not in guilds:
+                return False
+        return True
+
+    async def dispatch(self, message: discord.Message) -> None:
+        self.dispatched += 1
+        candidates = self._by_channel.get(message.channel.id, [])
+        if message.guild is None:
+            candidates = candidates + self._dm
+        else:
+            candidates = candidates + self._by_guild.get(message.guild.id, [])
+        for attr, routes in self._by_channel_attr.items():
+            if routes and message.channel.id in getattr(self.bot, attr):
+                candidates += routes
+        if message.guild is not None:
+            for attr, routes in self._by_guild_attr.items():
+                if routes and message.guild.id in getattr(self.bot, attr):
+                    candidates += routes
+        candidates += self._other
+
+        is_owner: Optional[bool] = None
+        for route in candidates:
+            if not self._matches(route, message):
+                continue
+            if route.owner_only:
+                if is_owner is None:
+                    is_owner = await self.bot.check_owner(message.author)
+                if not is_owner:
+                    continue
+            route.received += 1
+            asyncio.create_task(self._run(route, message), name=f'message-route:{route.name}')
+
+    async def _run(self, route: MessageRoute, message: discord.Message) -> None:
+        try:
+            with db_usage.scope(f'listener:{route.name}'):
+                await route.callback(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            try:
+                await self.bot.on_error(route.name, message)
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Callable, Iterable, List, Optional
+
+import aiohttp.web
+
+log = logging.getLogger("metrics")
+
+Collector = Callable[[], Iterable[str]]
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` in the Prometheus plain text format.
+
+    Anything that wants to be scraped adds a collector, a callable
+    returning the exposition lines. The server only starts when
+    ``METRICS_PORT`` is set.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.host: str = host or os.getenv("METRICS_HOST") or "127.0.0.1"
+        self.port: Optional[int] = port or int(os.getenv("METRICS_PORT") or 0) or None
+        self.collectors: List[Collector] = []
+        self._runner: Optional[aiohttp.web.AppRunner] = None
+
+    def add_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                log.error("Metrics collector %r failed", collector, exc_info=e)
+        return "\n".join(lines) + "\n"
+
+    async def handle(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        return aiohttp.web.Response(text=self.render(), content_type="text/plain")
+
+    async def start(self) -> None:
+        if self.port is None or self._runner is not None:
+            return
+        app = aiohttp.web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self._runner = aiohttp.web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await aiohttp.web.TCPSite(self._runner, self.host, self.port).start()
+        log.info("Serving metrics on http://%s:%s/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import functools
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Deque, Dict, Hashable, Tuple, TypeVar
+
+from helpers.db_usage import usage as db_usage
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+T = TypeVar("T", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+_Job = Tuple[float, str, Callable[[], Coroutine[Any, Any, Any]]]
+
+
+class DropPolicy(enum.Enum):
+    drop_newest = 1  # keep what is queued, reject the incoming event
+    drop_oldest = 2  # make room by discarding the oldest queued event
+
+
+class KeyedExecutor:
+    """Runs jobs one at a time per key, while different keys run concurrently.
+
+    Every key gets its own FIFO and a worker task that only lives while
+    that FIFO has work, so idle guilds cost nothing.
+    """
+
+    def __init__(self, bot: BaseDuck, name: str, *, maxsize: int = 100, policy: DropPolicy = DropPolicy.drop_newest):
+        self.bot: BaseDuck = bot
+        self.name: str = name
+        self.maxsize: int = maxsize
+        self.policy: DropPolicy = policy
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+
+        self.processed: int = 0
+        self.dropped: int = 0
+        self.max_depth: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+
+    @property
+    def active_keys(self) -> int:
+        return len(self._queues)
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.processed if self.processed else 0.0
+
+    def submit(self, key: Hashable, event_name: str, factory: Callable[[], Coroutine[Any, Any, Any]]) -> bool:
+        """Queues a job for the given key. Returns False if the job was dropped."""
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            asyncio.create_task(self._worker(key, queue), name=f'ordered-executor:{self.name}:{key}')
+        elif len(queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy is DropPolicy.drop_newest:
+                return False
+            queue.popleft()
+
+        queue.append((time.perf_counter(), event_name, factory))
+        self.max_depth = max(self.max_depth, len(queue))
+        return True
+
+    async def _worker(self, key: Hashable, queue: Deque[_Job]) -> None:
+        try:
+            while queue:
+                queued_at, event_name, factory = queue.popleft()
+                waited = time.perf_counter() - queued_at
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                self.processed += 1
+                try:
+                    with db_usage.scope(f'listener:{event_name}'):
+                        await factory()
+                except Exception:
+                    await self.bot.on_error(event_name)
+        finally:
+            if self._queues.get(key) is queue:
+                del self._queues[key]
+
+
+def ordered(
+    executor: str,
+    *,
+    key: Callable[..., Hashable],
+    maxsize: int = 100,
+    policy: DropPolicy = DropPolicy.drop_newest,
+) -> Callable[[T], T]:
+    """Makes a cog listener run in order with the other listeners sharing the same executor and key.
+
+    ``key`` receives the listener's arguments (without ``self``), e.g.
+    ``key=lambda message: message.guild.id``. The decorated listener
+    returns as soon as the event is queued.
+    """
+
+    def decorator(func: T) -> T:
+        @functools.wraps(func)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> None:
+            executors = self.bot.executors
+            try:
+                keyed = executors[executor]
+            except KeyError:
+                keyed = executors[executor] = KeyedExecutor(self.bot, executor, maxsize=maxsize, policy=policy)
+            keyed.submit(key(*args, **kwargs), func.__qualname__, lambda: func(self, *args, **kwargs))
+
+        return wrapper  # type: ignore
+
+    return decorator
+
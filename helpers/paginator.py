@@ -298,11 +298,10 @@ class ViewPaginator(discord.ui.View):
             author_id = interaction.user and interaction.user.id
             await interaction.response.send_message('What page do you want to go to?', ephemeral=True)
 
-            def message_check(m):
-                return m.author.id == author_id and channel == m.channel and m.content.isdigit()
-
             try:
-                msg = await self.ctx.bot.wait_for('message', check=message_check, timeout=30.0)
+                msg = await self.ctx.bot.wait_for_message(
+                    channel, author=author_id, check=lambda m: m.content.isdigit(), timeout=30.0
+                )
             except asyncio.TimeoutError:
                 await interaction.followup.send('Took too long.', ephemeral=True)
                 await asyncio.sleep(5)
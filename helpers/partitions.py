@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import os
+import re
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import asyncpg
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("partitions")
+
+MAINTENANCE_INTERVAL = 6 * 60 * 60
+PARTITIONS_AHEAD = 2
+
+_BOUNDS = re.compile(r"FROM \((?:MINVALUE|'(\d{4}-\d{2}-\d{2})[^']*')\) TO \('(\d{4}-\d{2}-\d{2})")
+
+PARTITION_INFO = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::BIGINT, pg_total_relation_size(c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'commands'::regclass
+ORDER BY c.relname
+"""
+
+
+def _today() -> datetime.date:
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def _month(date: datetime.date, offset: int = 0) -> datetime.date:
+    """The first day of the month ``offset`` months after the one ``date`` is in."""
+    index = date.year * 12 + date.month - 1 + offset
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(date: datetime.date) -> str:
+    # The offset is ignored for a timestamp column, and keeps a timestamptz one in UTC.
+    return f"'{date.isoformat()} 00:00:00+00'"
+
+
+class CommandPartitions:
+    """Keeps the ``commands`` table split into monthly range partitions on ``timestamp``.
+
+    :meth:`migrate` converts the plain table once: the existing table is
+    attached as ``commands_legacy``, holding everything up to the end of
+    the current month, so no rows are copied. After that, a background task creates
+    the partitions for the coming months and removes the ones whose whole
+    range is older than ``COMMANDS_RETENTION_MONTHS`` (12 by default, 0
+    keeps everything). With ``COMMANDS_ARCHIVE_SCHEMA`` set, expired
+    partitions are detached and moved to that schema instead of dropped.
+    A default partition catches rows outside every range, so a batched
+    write never fails as a whole because of one odd timestamp.
+    """
+
+    def __init__(self, bot: BaseDuck):
+        self.bot: BaseDuck = bot
+        self.retention_months: int = int(os.getenv("COMMANDS_RETENTION_MONTHS") or 12)
+        self.archive_schema: Optional[str] = os.getenv("COMMANDS_ARCHIVE_SCHEMA") or None
+        self.created: int = 0
+        self.expired: int = 0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def is_partitioned(self, conn: asyncpg.Connection) -> bool:
+        return await conn.fetchval("SELECT relkind = 'p' FROM pg_class WHERE oid = 'commands'::regclass")
+
+    async def migrate(self) -> bool:
+        """Converts ``commands`` into a partitioned table. Returns False if it already was one."""
+        next_month = _month(_today(), 1)
+        async with self.bot.db.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("LOCK TABLE commands IN ACCESS EXCLUSIVE MODE")
+                if await self.is_partitioned(conn):
+                    return False
+                await conn.execute("ALTER TABLE commands RENAME TO commands_legacy")
+                await conn.execute(
+                    "CREATE TABLE commands (LIKE commands_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)"
+                )
+                # Serial columns keep their sequence once the legacy partition is dropped.
+                sequences = await conn.fetch(
+                    "SELECT attname, pg_get_serial_sequence('commands_legacy', attname) FROM pg_attribute "
+                    "WHERE attrelid = 'commands_legacy'::regclass AND attnum > 0 AND NOT attisdropped "
+                    "AND pg_get_serial_sequence('commands_legacy', attname) IS NOT NULL"
+                )
+                for column, sequence in sequences:
+                    await conn.execute(f'ALTER SEQUENCE {sequence} OWNED BY commands."{column}"')
+                await conn.execute("CREATE INDEX ON commands (guild_id, timestamp)")
+                await conn.execute("CREATE INDEX ON commands (user_id, timestamp)")
+                # The legacy table keeps this month's rows so far, the monthly partitions start with the next one.
+                # ATTACH scans it once to validate the range, which a NULL timestamp would fail.
+                await conn.execute(
+                    "ALTER TABLE commands ATTACH PARTITION commands_legacy "
+                    f"FOR VALUES FROM (MINVALUE) TO ({_bound(next_month)})"
+                )
+                await conn.execute("CREATE TABLE commands_default PARTITION OF commands DEFAULT")
+                await self._create_upcoming(conn)
+        return True
+
+    async def _create_upcoming(self, conn: asyncpg.Connection) -> None:
+        this_month = _month(_today())
+        ranges = []
+        for _, bound, _, _ in await conn.fetch(PARTITION_INFO):
+            match = _BOUNDS.search(bound)
+            if match is not None:
+                low = datetime.date.fromisoformat(match[1]) if match[1] else datetime.date.min
+                ranges.append((low, datetime.date.fromisoformat(match[2])))
+        for offset in range(PARTITIONS_AHEAD + 1):
+            start, end = _month(this_month, offset), _month(this_month, offset + 1)
+            # Already created, or still covered by commands_legacy.
+            if any(low < end and start < high for low, high in ranges):
+                continue
+            name = f"commands_{start:%Y_%m}"
+            try:
+                await conn.execute(
+                    f"CREATE TABLE {name} PARTITION OF commands FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"
+                )
+            except asyncpg.CheckViolationError:
+                # The default partition already holds rows for that month, they need moving by hand.
+                log.warning("Could not create %s, commands_default has rows in its range", name)
+                continue
+            self.created += 1
+            log.info("Created command history partition %s", name)
+
+    async def _expire(self, conn: asyncpg.Connection) -> None:
+        if not self.retention_months:
+            return
+        cutoff = _month(_today(), -self.retention_months)
+        for name, bound, _, _ in await conn.fetch(PARTITION_INFO):
+            match = _BOUNDS.search(bound)
+            if match is None or datetime.date.fromisoformat(match[2]) > cutoff:
+                continue
+            if self.archive_schema:
+                await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.archive_schema}")
+                await conn.execute(f"ALTER TABLE commands DETACH PARTITION {name}")
+                await conn.execute(f"ALTER TABLE {name} SET SCHEMA {self.archive_schema}")
+                log.info("Archived command history partition %s to %s", name, self.archive_schema)
+            else:
+                await conn.execute(f"DROP TABLE {name}")
+                log.info("Dropped command history partition %s", name)
+            self.expired += 1
+
+    async def maintain(self) -> None:
+        async with self.bot.db.acquire() as conn:
+            if not await self.is_partitioned(conn):
+                return
+            await self._create_upcoming(conn)
+            await self._expire(conn)
+
+    async def info(self) -> List[Tuple[str, str, int, int]]:
+        """(name, bounds, estimated rows, bytes) for every partition."""
+        return [tuple(r) for r in await self.bot.db.fetch(PARTITION_INFO)]  # type: ignore
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                log.error("Failed to maintain the command history partitions", exc_info=e)
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="command-partitions")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
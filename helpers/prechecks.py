@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import inspect
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Optional, Union
+
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from helpers.context import CustomContext
+
+    StageCallback = Callable[[CustomContext, bool], Union[bool, Awaitable[bool]]]
+
+
+class PrecheckStage:
+    """A single step of the :class:`PrecheckPipeline`.
+
+    The callback receives the context and whether the author is a bot
+    owner, and either returns a truthy value or raises a CheckFailure.
+    """
+
+    __slots__ = ('name', 'callback', 'order', 'once', 'owner_bypass', 'calls', 'rejected', 'total_time', 'max_time')
+
+    def __init__(self, name: str, callback: StageCallback, *, order: int, once: bool, owner_bypass: bool):
+        self.name: str = name
+        self.callback = callback
+        self.order: int = order
+        self.once: bool = once
+        self.owner_bypass: bool = owner_bypass
+        self.calls: int = 0
+        self.rejected: int = 0
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class PrecheckPipeline:
+    """Runs every global command check in one ordered pass.
+
+    Owner status is resolved once per context and handed to every stage,
+    and each stage records how often it ran, rejected and how long it took.
+    ``check`` is registered as a regular bot check (so the help command
+    honours it) and ``check_once`` as a call-once check.
+    """
+
+    def __init__(self):
+        self.stages: List[PrecheckStage] = []
+        self.last_rejection: Optional[str] = None
+
+    def add_stage(
+        self,
+        name: str,
+        callback: StageCallback,
+        *,
+        order: int = 100,
+        once: bool = False,
+        owner_bypass: bool = True,
+    ) -> None:
+        self.remove_stage(name)
+        self.stages.append(PrecheckStage(name, callback, order=order, once=once, owner_bypass=owner_bypass))
+        self.stages.sort(key=lambda s: s.order)
+
+    def remove_stage(self, name: str) -> None:
+        self.stages = [s for s in self.stages if s.name != name]
+
+    async def _run(self, ctx: CustomContext, once: bool) -> bool:
+        is_owner = await ctx.author_is_owner()
+        for stage in self.stages:
+            if stage.once is not once or (is_owner and stage.owner_bypass):
+                continue
+            start = time.perf_counter()
+            try:
+                result = stage.callback(ctx, is_owner)
+                if inspect.isawaitable(result):
+                    result = await result
+            except commands.CheckFailure:
+                stage.rejected += 1
+                self.last_rejection = stage.name
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                stage.calls += 1
+                stage.total_time += elapsed
+                stage.max_time = max(stage.max_time, elapsed)
+            if not result:
+                stage.rejected += 1
+                self.last_rejection = stage.name
+                return False
+        return True
+
+    async def check(self, ctx: CustomContext) -> bool:
+        return await self._run(ctx, once=False)
+
+    async def check_once(self, ctx: CustomContext) -> bool:
+        return await self._run(ctx, once=True)
+
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+
+class PrefixMatcher:
+    """A precompiled prefix lookup for a single guild.
+
+    ``source`` is the exact prefix collection this matcher was built
+    from, so a matcher goes stale as soon as ``bot.prefixes`` gets a
+    new value for its guild.
+    """
+
+    __slots__ = ('source', 'candidates', '_ordered')
+
+    def __init__(self, source: Iterable[str], mentions: Tuple[str, ...]):
+        self.source: Iterable[str] = source
+        prefixes = tuple(p for p in source if isinstance(p, str))
+        # What discord.py receives when nothing matched, same order as when_mentioned_or.
+        self.candidates: Tuple[str, ...] = mentions + prefixes
+        # Longest first, so "db." wins over "d" and the empty prefix always comes last.
+        self._ordered: Tuple[str, ...] = tuple(sorted(set(self.candidates), key=len, reverse=True))
+
+    def match(self, content: str) -> Optional[str]:
+        # str.startswith with a tuple is a single C call, which settles the common no-prefix case.
+        if not content.startswith(self._ordered):
+            return None
+        for prefix in self._ordered:
+            if content.startswith(prefix):
+                return prefix
+        return None
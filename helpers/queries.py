@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import asyncpg
+
+from helpers.db_usage import AttributedConnection, AttributedPool, usage
+
+log = logging.getLogger("queries")
+
+Executor = Union[asyncpg.Pool, asyncpg.Connection, AttributedPool, AttributedConnection]
+
+# Upper bounds in seconds, the last bucket catches everything slower.
+BUCKETS = (0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+
+class Histogram:
+    """Latency buckets of a single query, and how many rows it returned or touched."""
+
+    __slots__ = ("counts", "count", "total", "max", "rows")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * len(BUCKETS)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.rows: int = 0
+
+    def observe(self, elapsed: float, rows: int) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, elapsed)] += 1
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.rows += rows
+
+    def percentile(self, q: float) -> float:
+        """The upper bound of the bucket the q-th percentile falls in (the slowest call for the last bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Query:
+    """A named SQL statement. Prepared on every pool connection when ``prepare`` is set."""
+
+    __slots__ = ("registry", "name", "sql", "prepare", "histogram")
+
+    def __init__(self, registry: QueryRegistry, name: str, sql: str, *, prepare: bool):
+        self.registry: QueryRegistry = registry
+        self.name: str = name
+        self.sql: str = sql
+        self.prepare: bool = prepare
+        self.histogram: Histogram = Histogram()
+
+    async def _run(self, db: Executor, method: str, args: tuple[Any, ...]) -> Any:
+        if isinstance(db, (asyncpg.Pool, AttributedPool)):
+            async with db.acquire() as conn:
+                return await self._run(conn, method, args)
+        if isinstance(db, AttributedConnection):
+            # Recorded below, going through the wrapper would count the query twice.
+            db = db.connection
+
+        statement = self.registry.statement(db, self) if method != "execute" else None
+        start = time.perf_counter()
+        if statement is not None:
+            try:
+                result = await getattr(statement, method)(*args)
+            except (asyncpg.InvalidCachedStatementError, asyncpg.OutdatedSchemaCacheError):
+                # The schema changed under the statement, e.g. a column was added to a table it selects * from.
+                statement = await self.registry.reprepare(db, self)
+                if db.is_in_transaction():
+                    # The error aborted the transaction, only the caller can retry it.
+                    raise
+                result = await getattr(statement, method)(*args)
+        else:
+            result = await getattr(db, method)(self.sql, *args)
+        elapsed = time.perf_counter() - start
+
+        if method == "fetch":
+            rows = len(result)
+        elif method == "execute":
+            # e.g. "DELETE 3" or "INSERT 0 1"
+            last = result.rpartition(" ")[2]
+            rows = int(last) if last.isdigit() else 0
+        else:
+            rows = int(result is not None)
+        self.histogram.observe(elapsed, rows)
+        usage.record(elapsed=elapsed, rows=rows)
+        return result
+
+    async def fetch(self, db: Executor, *args: Any) -> List[asyncpg.Record]:
+        return await self._run(db, "fetch", args)
+
+    async def fetchrow(self, db: Executor, *args: Any) -> Optional[asyncpg.Record]:
+        return await self._run(db, "fetchrow", args)
+
+    async def fetchval(self, db: Executor, *args: Any) -> Any:
+        return await self._run(db, "fetchval", args)
+
+    async def execute(self, db: Executor, *args: Any) -> str:
+        return await self._run(db, "execute", args)
+
+
+class QueryRegistry:
+    """Every named query, and the statements prepared for them on each connection.
+
+    Pass :meth:`prepare_connection` as the pool's ``init``. Statements are
+    looked up by the connection's backend PID, which stays the same for
+    as long as the pool keeps the connection around.
+    """
+
+    def __init__(self):
+        self.queries: Dict[str, Query] = {}
+        self._statements: Dict[int, Dict[str, asyncpg.prepared_stmt.PreparedStatement]] = {}
+
+    def add(self, name: str, sql: str, *, prepare: bool = True) -> Query:
+        if name in self.queries:
+            raise ValueError(f"A query named {name!r} is already registered")
+        query = self.queries[name] = Query(self, name, sql, prepare=prepare)
+        return query
+
+    def statement(self, conn: asyncpg.Connection, query: Query) -> Optional[asyncpg.prepared_stmt.PreparedStatement]:
+        statements = self._statements.get(conn.get_server_pid())
+        return statements.get(query.name) if statements else None
+
+    async def reprepare(self, conn: asyncpg.Connection, query: Query) -> asyncpg.prepared_stmt.PreparedStatement:
+        """Prepares the query again on this connection, after the schema changed under the old statement."""
+        statement = await conn.prepare(query.sql)
+        self._statements.setdefault(conn.get_server_pid(), {})[query.name] = statement
+        log.info("Re-prepared query %s after a schema change", query.name)
+        return statement
+
+    async def prepare_connection(self, conn: asyncpg.Connection) -> None:
+        pid = conn.get_server_pid()
+        statements = self._statements[pid] = {}
+        conn.add_termination_listener(lambda _: self._statements.pop(pid, None))
+        for query in self.queries.values():
+            if not query.prepare:
+                continue
+            try:
+                statements[query.name] = await conn.prepare(query.sql)
+            except asyncpg.PostgresError as e:
+                # Falls back to asyncpg's implicit statement cache.
+                log.warning("Could not prepare query %s", query.name, exc_info=e)
+
+    def slowest(self, limit: int = 25) -> List[Query]:
+        queries = [q for q in self.queries.values() if q.histogram.count]
+        return sorted(queries, key=lambda q: q.histogram.percentile(0.95), reverse=True)[:limit]
+
+    def collect_metrics(self) -> Iterable[str]:
+        yield "# TYPE duckbot_query_duration_seconds histogram"
+        for query in self.queries.values():
+            histogram = query.histogram
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else bound
+                yield f'duckbot_query_duration_seconds_bucket{{query="{query.name}",le="{le}"}} {cumulative}'
+            yield f'duckbot_query_duration_seconds_sum{{query="{query.name}"}} {histogram.total}'
+            yield f'duckbot_query_duration_seconds_count{{query="{query.name}"}} {histogram.count}'
+        yield "# TYPE duckbot_query_rows_total counter"
+        for query in self.queries.values():
+            yield f'duckbot_query_rows_total{{query="{query.name}"}} {query.histogram.rows}'
+
+
+registry = QueryRegistry()
+
+# Hot queries, declared once and prepared on every connection. Statements run with execute never go
+# through the prepared statement, so those rely on asyncpg's implicit statement cache instead.
+GUILD_MUTED_ROLE = registry.add("guild_muted_role", "SELECT muted_id FROM guilds WHERE guild_id = $1")
+GUILD_MODLOG = registry.add("guild_modlog", "SELECT modlog FROM guilds WHERE guild_id = $1")
+GUILD_WELCOME_MESSAGE = registry.add("guild_welcome_message", "SELECT welcome_message FROM guilds WHERE guild_id = $1")
+DELETE_TEMPORARY_MUTE = registry.add(
+    "delete_temporary_mute", "DELETE FROM temporary_mutes WHERE (guild_id, member_id) = ($1, $2)", prepare=False
+)
+SET_COUNT_NUMBER = registry.add(
+    "set_count_number", "UPDATE count_settings SET current_number = $2 WHERE guild_id = $1", prepare=False
+)
+AFK_BY_USER = registry.add("afk_by_user", "SELECT * FROM afk WHERE user_id = $1")
+ECONOMY_ACCOUNT = registry.add("economy_account", "SELECT * FROM economy WHERE user_id = $1")
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+import aiosqlite
+
+from helpers.helper import LoggingEventsFlags
+
+if TYPE_CHECKING:
+    from helpers.bot_base import BaseDuck
+
+log = logging.getLogger("snapshot")
+
+SNAPSHOT_VERSION = 1
+DEFAULT_PATH = "cache_snapshot.sqlite"
+SNAPSHOT_INTERVAL = 600
+
+
+def _int_keys(data: Dict[str, Any], value: Callable[[Any], Any] = lambda v: v) -> Dict[int, Any]:
+    # JSON turns every key into a string, we want our snowflakes back.
+    return {int(k): value(v) for k, v in data.items()}
+
+
+class CacheSnapshot:
+    """Persists the bot's config caches to a local sqlite file.
+
+    The snapshot is only a warm start: everything in it is
+    reconciled against Postgres by ``BaseDuck.populate_cache``
+    once the bot is up, so a stale or missing file is harmless.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path: str = path or os.getenv("CACHE_SNAPSHOT_PATH") or DEFAULT_PATH
+
+    @staticmethod
+    def dump(bot: BaseDuck) -> Dict[str, Any]:
+        return {
+            "prefixes": {k: list(v) for k, v in bot.prefixes.items()},
+            "blacklist": bot.blacklist,
+            "plonks": {k: list(v) for k, v in bot.plonks.items()},
+            "welcome_channels": dict(bot.welcome_channels),
+            "counting_channels": {
+                k: {key: value for key, value in v.items() if key != "messages"} for k, v in bot.counting_channels.items()
+            },
+            "counting_rewards": {k: list(v) for k, v in bot.counting_rewards.items()},
+            "log_channels": {k: {s: getattr(v, s) for s in v.__slots__} for k, v in bot.log_channels.items()},
+            "guild_loggings": {k: v.value for k, v in bot.guild_loggings.items()},
+        }
+
+    @staticmethod
+    def restore(bot: BaseDuck, data: Dict[str, Any]) -> None:
+        bot.blacklist = _int_keys(data["blacklist"])
+        bot.plonks = _int_keys(data["plonks"], set)
+        bot.counting_rewards = _int_keys(data["counting_rewards"], set)
+        if bot.guild_config.lazy:
+            # A lazy store fetches whole guilds on demand, partial entries from here would never be completed.
+            return
+        bot.prefixes.reset(_int_keys(data["prefixes"]))
+        bot.welcome_channels.reset(_int_keys(data["welcome_channels"]))
+        bot.counting_channels.reset(
+            _int_keys(data["counting_channels"], lambda v: {**v, "last_message_id": None, "messages": deque(maxlen=100)})
+        )
+        bot.log_channels.reset(_int_keys(data["log_channels"], lambda v: bot.log_webhooks(**v)))
+        bot.guild_loggings.reset(_int_keys(data["guild_loggings"], lambda v: LoggingEventsFlags(v)))
+
+    async def save(self, bot: BaseDuck) -> None:
+        start = time.perf_counter()
+        data = self.dump(bot)
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshot (name TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+            await db.executemany(
+                "INSERT OR REPLACE INTO snapshot (name, version, data) VALUES (?, ?, ?)",
+                [(name, SNAPSHOT_VERSION, json.dumps(value)) for name, value in data.items()],
+            )
+            await db.commit()
+        log.info("Saved cache snapshot to %s in %.2fms", self.path, (time.perf_counter() - start) * 1000)
+
+    async def load(self, bot: BaseDuck) -> bool:
+        """Restores the caches from disk. Returns whether a usable snapshot was found."""
+        if not os.path.exists(self.path):
+            return False
+
+        start = time.perf_counter()
+        try:
+            async with aiosqlite.connect(self.path) as db:
+                async with db.execute("SELECT name, data FROM snapshot WHERE version = ?", (SNAPSHOT_VERSION,)) as cursor:
+                    data = {name: json.loads(value) async for name, value in cursor}
+            self.restore(bot, data)
+        except (aiosqlite.Error, ValueError, KeyError, TypeError) as e:
+            log.warning("Ignoring unusable cache snapshot at %s", self.path, exc_info=e)
+            return False
+
+        log.info("Loaded cache snapshot from %s in %.2fms", self.path, (time.perf_counter() - start) * 1000)
+        return True
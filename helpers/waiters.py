@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+import discord
+
+
+class _Waiter:
+    __slots__ = ('author_id', 'check', 'future')
+
+    def __init__(
+        self,
+        author_id: Optional[int],
+        check: Optional[Callable[[discord.Message], bool]],
+        future: asyncio.Future[discord.Message],
+    ):
+        self.author_id: Optional[int] = author_id
+        self.check: Optional[Callable[[discord.Message], bool]] = check
+        self.future: asyncio.Future[discord.Message] = future
+
+
+class MessageWaiters:
+    """A ``wait_for('message')`` replacement indexed by channel ID.
+
+    discord.py runs every pending ``check`` against every message, this
+    only looks at the waiters of the channel the message was sent in,
+    and skips the ``check`` entirely when the author does not match.
+    """
+
+    def __init__(self):
+        self._by_channel: Dict[int, List[_Waiter]] = {}
+
+    @property
+    def pending(self) -> int:
+        return sum(len(w) for w in self._by_channel.values())
+
+    @property
+    def channels(self) -> int:
+        return len(self._by_channel)
+
+    async def wait(
+        self,
+        channel_id: int,
+        *,
+        author_id: Optional[int] = None,
+        check: Optional[Callable[[discord.Message], bool]] = None,
+        timeout: Optional[float] = None,
+    ) -> discord.Message:
+        waiter = _Waiter(author_id, check, asyncio.get_running_loop().create_future())
+        self._by_channel.setdefault(channel_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter.future, timeout=timeout)
+        finally:
+            waiters = self._by_channel.get(channel_id)
+            if waiters is not None:
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not waiters:
+                    del self._by_channel[channel_id]
+
+    def resolve(self, message: discord.Message) -> None:
+        waiters = self._by_channel.get(message.channel.id)
+        if not waiters:
+            return
+
+        author_id = message.author.id
+        for waiter in list(waiters):
+            future = waiter.future
+            if future.done():
+                continue
+            if waiter.author_id is not None and waiter.author_id != author_id:
+                continue
+            if waiter.check is not None:
+                try:
+                    if not waiter.check(message):
+                        continue
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+            future.set_result(message)